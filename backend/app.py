@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 import os
 import logging
@@ -7,6 +7,7 @@ import uuid
 from typing import Dict, List, Optional, Any
 import json
 import time
+import math
 import sqlite3
 from contextlib import contextmanager
 
@@ -14,16 +15,21 @@ from services.resume_service import ResumeService
 from services.prediction_service import PredictionService
 from services.sop_service import SOPService
 from services.academic_api_service import AcademicAPIService
+from services.batch_service import ResumeBatchService
 from models.data_models import *
 from utils.config import Config
 from utils.logger import setup_logging
+from utils.metrics import metrics
+from utils.admission import AdmissionRejected, admission_control
+from utils.request_context import set_request_deadline
+from utils.text_diff import diff_text
 
 app = Flask(__name__)
 CORS(app, resources={
     r"/api/*": {
         "origins": ["http://localhost:3000", "http://localhost:3001"],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"]
+        "allow_headers": ["Content-Type", "Authorization", "X-Request-Deadline", "X-Request-Timeout"]
     }
 })
 
@@ -34,6 +40,35 @@ resume_service = ResumeService(config)
 prediction_service = PredictionService(config)
 sop_service = SOPService(config)
 academic_api_service = AcademicAPIService(config)
+batch_service = ResumeBatchService(config, resume_service)
+
+@app.before_request
+def apply_request_deadline():
+    """Honor the client's time budget: X-Request-Timeout (seconds from now) or
+    X-Request-Deadline (absolute Unix time in seconds or milliseconds)"""
+    now = time.time()
+    
+    def positive_seconds(header: str) -> float:
+        value = float(request.headers[header])
+        if not math.isfinite(value) or value <= 0:
+            raise ValueError(f"{header} must be a positive number")
+        return value
+    
+    try:
+        if request.headers.get('X-Request-Deadline'):
+            deadline = positive_seconds('X-Request-Deadline')
+            if deadline > 1e11:
+                deadline /= 1000.0
+        elif request.headers.get('X-Request-Timeout'):
+            deadline = now + positive_seconds('X-Request-Timeout')
+        elif config.DEFAULT_REQUEST_TIMEOUT > 0:
+            deadline = now + config.DEFAULT_REQUEST_TIMEOUT
+        else:
+            deadline = None
+    except ValueError:
+        return jsonify({"error": "Invalid X-Request-Deadline or X-Request-Timeout header"}), 400
+    
+    set_request_deadline(min(deadline, now + config.MAX_REQUEST_TIMEOUT) if deadline is not None else None)
 
 @app.route('/', methods=['GET'])
 def home():
@@ -81,8 +116,14 @@ def health_check():
     
     return jsonify(health_status), 200 if health_status["status"] != "unhealthy" else 503
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Process metrics in the Prometheus text exposition format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # Resume Agent Endpoints
 @app.route('/api/resume/ocr_resume', methods=['POST'])
+@admission_control(config, 'azure')
 def ocr_resume():
     """PDF text extraction via Azure Document Intelligence"""
     try:
@@ -99,11 +140,14 @@ def ocr_resume():
         result = resume_service.extract_text_from_pdf(file)
         return jsonify(result)
         
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"OCR processing failed: {str(e)}")
         return jsonify({"error": "OCR processing failed", "details": str(e)}), 500
 
 @app.route('/api/resume/analyze_resume', methods=['POST'])
+@admission_control(config, 'groq')
 def analyze_resume():
     """Comprehensive resume analysis with hybrid scoring"""
     try:
@@ -121,6 +165,43 @@ def analyze_resume():
         logger.error(f"Resume analysis failed: {str(e)}")
         return jsonify({"error": "Resume analysis failed", "details": str(e)}), 500
 
+@app.route('/api/resume/batch_analyze', methods=['POST'])
+def batch_analyze_resumes():
+    """Score a cohort of resumes, streaming one NDJSON record per resume"""
+    try:
+        if request.files:
+            files = [f for f in request.files.getlist('files') if f.filename]
+            if not files:
+                return jsonify({"error": "No files provided"}), 400
+            if any(not f.filename.lower().endswith('.pdf') for f in files):
+                return jsonify({"error": "Only PDF files are supported"}), 400
+            
+            items = [{"id": f.filename, "file": f} for f in files]
+            options = json.loads(request.form.get('options', '{}'))
+        else:
+            data = request.get_json()
+            if not data or not data.get('resumes'):
+                return jsonify({"error": "A list of resumes is required"}), 400
+            
+            items = [
+                resume if isinstance(resume, dict) else {"text": resume}
+                for resume in data['resumes']
+            ]
+            options = data.get('options', {})
+        
+        if len(items) > config.BATCH_MAX_ITEMS:
+            return jsonify({"error": f"Batch is limited to {config.BATCH_MAX_ITEMS} resumes"}), 400
+        
+        def generate():
+            for record in batch_service.score_stream(items, options):
+                yield json.dumps(record) + "\n"
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+    except Exception as e:
+        logger.error(f"Batch resume analysis failed: {str(e)}")
+        return jsonify({"error": "Batch resume analysis failed", "details": str(e)}), 500
+
 @app.route('/api/resume/health', methods=['GET'])
 def resume_health():
     """Resume service health check"""
@@ -195,6 +276,7 @@ def academic_health():
 
 # SOP Agent Endpoints
 @app.route('/api/sop/analyze', methods=['POST'])
+@admission_control(config, 'gemini')
 def analyze_sop():
     """Analyze Statement of Purpose"""
     try:
@@ -210,6 +292,7 @@ def analyze_sop():
         return jsonify({"error": "SOP analysis failed", "details": str(e)}), 500
 
 @app.route('/api/sop/enhance', methods=['POST'])
+@admission_control(config, 'gemini')
 def enhance_sop():
     """Enhance Statement of Purpose with AI suggestions"""
     try:
@@ -224,6 +307,28 @@ def enhance_sop():
         logger.error(f"SOP enhancement failed: {str(e)}")
         return jsonify({"error": "SOP enhancement failed", "details": str(e)}), 500
 
+@app.route('/api/sop/enhance/stream', methods=['POST'])
+@admission_control(config, 'gemini')
+def enhance_sop_stream():
+    """Enhance Statement of Purpose, streaming each enhanced section as a Server-Sent Event"""
+    data = request.get_json()
+    if not data or 'text' not in data:
+        return jsonify({"error": "SOP text is required"}), 400
+
+    def generate():
+        try:
+            for event, payload in sop_service.enhance_sop_stream(data['text'], data.get('context', {})):
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            logger.error(f"Streamed SOP enhancement failed: {str(e)}")
+            error = {"error": "SOP enhancement failed", "details": str(e)}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/sop/save', methods=['POST'])
 def save_sop():
     """Save SOP to database"""
@@ -239,6 +344,50 @@ def save_sop():
         logger.error(f"SOP save failed: {str(e)}")
         return jsonify({"error": "SOP save failed", "details": str(e)}), 500
 
+@app.route('/api/sop/save/bulk', methods=['POST'])
+def save_sops_bulk():
+    """Save many SOPs in one transaction"""
+    try:
+        data = request.get_json()
+        sops = data.get('sops') if isinstance(data, dict) else None
+        if not isinstance(sops, list) or not sops:
+            return jsonify({"error": "A non-empty 'sops' list is required"}), 400
+        if len(sops) > config.SOP_BULK_MAX_DOCUMENTS:
+            return jsonify({
+                "error": f"At most {config.SOP_BULK_MAX_DOCUMENTS} SOPs per request; use /api/sop/import for more"
+            }), 413
+        if not all(isinstance(sop, dict) for sop in sops):
+            return jsonify({"error": "Each SOP must be an object"}), 400
+        
+        return jsonify(sop_service.save_sops(sops))
+        
+    except Exception as e:
+        logger.error(f"Bulk SOP save failed: {str(e)}")
+        return jsonify({"error": "Bulk SOP save failed", "details": str(e)}), 500
+
+@app.route('/api/sop/import', methods=['POST'])
+def import_sops():
+    """Import SOPs from an NDJSON request body (one document per line)"""
+    try:
+        return jsonify(sop_service.import_sops(request.stream))
+        
+    except Exception as e:
+        logger.error(f"SOP import failed: {str(e)}")
+        return jsonify({"error": "SOP import failed", "details": str(e)}), 500
+
+@app.route('/api/sop/export', methods=['GET'])
+def export_sops():
+    """Stream stored SOPs as NDJSON, optionally for one user"""
+    documents = sop_service.export_sops(request.args.get('user_id'))
+    
+    def generate():
+        for document in documents:
+            yield json.dumps(document) + '\n'
+    
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['Content-Disposition'] = 'attachment; filename="sops.ndjson"'
+    return response
+
 @app.route('/api/sop/load/<sop_id>', methods=['GET'])
 def load_sop(sop_id):
     """Load SOP from database"""
@@ -253,13 +402,85 @@ def load_sop(sop_id):
         logger.error(f"SOP load failed: {str(e)}")
         return jsonify({"error": "SOP load failed", "details": str(e)}), 500
 
+@app.route('/api/sop/list/<user_id>', methods=['GET'])
+def list_sops(user_id):
+    """List a user's SOPs (summaries, newest first) a page at a time"""
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        return jsonify(sop_service.list_sops(user_id, limit, request.args.get('cursor')))
+        
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"SOP listing failed: {str(e)}")
+        return jsonify({"error": "SOP listing failed", "details": str(e)}), 500
+
+@app.route('/api/sop/search', methods=['GET'])
+def search_sops():
+    """Full-text search over stored SOPs"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "Query parameter 'q' is required"}), 400
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        return jsonify(sop_service.search_sops(
+            query, request.args.get('user_id'), request.args.get('program'), limit
+        ))
+        
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        logger.error(f"SOP search failed: {str(e)}")
+        return jsonify({"error": "SOP search failed", "details": str(e)}), 500
+
+@app.route('/api/sop/revisions/<sop_id>', methods=['GET'])
+def list_sop_revisions(sop_id):
+    """List an SOP's saved revisions (metadata only)"""
+    try:
+        return jsonify({"sop_id": sop_id, "revisions": sop_service.list_revisions(sop_id)})
+        
+    except Exception as e:
+        logger.error(f"SOP revision listing failed: {str(e)}")
+        return jsonify({"error": "SOP revision listing failed", "details": str(e)}), 500
+
+@app.route('/api/sop/revisions/<sop_id>/<int:revision>', methods=['GET'])
+def get_sop_revision(sop_id, revision):
+    """Load one saved revision of an SOP"""
+    try:
+        result = sop_service.get_revision(sop_id, revision)
+        if result:
+            return jsonify(result)
+        else:
+            return jsonify({"error": "SOP revision not found"}), 404
+        
+    except Exception as e:
+        logger.error(f"SOP revision load failed: {str(e)}")
+        return jsonify({"error": "SOP revision load failed", "details": str(e)}), 500
+
 @app.route('/api/sop/health', methods=['GET'])
 def sop_health():
     """SOP service health check"""
     return jsonify(sop_service.get_health())
 
+# Text diff (e.g. original vs enhanced resume from the model service)
+@app.route('/api/diff', methods=['POST'])
+def diff_texts():
+    """Word-level diff of an original and a revised text"""
+    data = request.get_json()
+    if not data or not isinstance(data.get('original'), str) or not isinstance(data.get('revised'), str):
+        return jsonify({"error": "'original' and 'revised' texts are required"}), 400
+    if len(data['original']) + len(data['revised']) > config.TEXT_DIFF_MAX_CHARS:
+        return jsonify({"error": f"Texts exceed {config.TEXT_DIFF_MAX_CHARS} characters"}), 413
+    
+    try:
+        return jsonify(diff_text(data['original'], data['revised']))
+    except Exception as e:
+        logger.error(f"Text diff failed: {str(e)}")
+        return jsonify({"error": "Text diff failed", "details": str(e)}), 500
+
 # Unified Analysis Endpoint (Orchestrator functionality)
 @app.route('/api/analyze', methods=['POST'])
+@admission_control(config, 'groq', 'gemini')
 def unified_analyze():
     """Main orchestration endpoint - coordinates between all services"""
     try:
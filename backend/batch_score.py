@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Batch resume scoring CLI
+
+Scores every resume (.txt or .pdf) given on the command line, or found in the
+given directories, and writes one NDJSON record per resume to stdout as soon
+as it completes.
+
+    python batch_score.py resumes/ --llm-enrichment > scores.ndjson
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+from werkzeug.datastructures import FileStorage
+
+from services.resume_service import ResumeService
+from services.batch_service import ResumeBatchService
+from utils.config import Config
+
+
+def _collect_paths(paths: List[str]) -> List[str]:
+    collected = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(('.txt', '.pdf')):
+                    collected.append(os.path.join(path, name))
+        else:
+            collected.append(path)
+    return collected
+
+
+def _load_item(path: str) -> Dict[str, Any]:
+    name = os.path.basename(path)
+    if path.lower().endswith('.pdf'):
+        return {"id": name, "file": FileStorage(stream=open(path, 'rb'), filename=name)}
+    with open(path, 'r', encoding='utf-8') as f:
+        return {"id": name, "text": f.read()}
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Score a cohort of resumes and stream NDJSON results.")
+    parser.add_argument("paths", nargs="+", help="Resume files (.txt/.pdf) or directories containing them.")
+    parser.add_argument("--llm-enrichment", action="store_true", help="Add Groq parse and insights to each result.")
+    parser.add_argument("--workers", type=int, help="Size of the local scoring process pool.")
+    args = parser.parse_args(argv)
+
+    config = Config()
+    if args.workers:
+        config.BATCH_WORKERS = args.workers
+
+    try:
+        items = [_load_item(path) for path in _collect_paths(args.paths)]
+        batch_service = ResumeBatchService(config, ResumeService(config))
+        for record in batch_service.score_stream(items, {"llm_enrichment": args.llm_enrichment}):
+            sys.stdout.write(json.dumps(record) + "\n")
+            sys.stdout.flush()
+        return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Micro-batching benchmark against a local stub Gemini server
+
+Starts an HTTP server speaking the Gemini REST generateContent API with a fixed
+per-call latency and a cap on concurrent calls (standing in for the provider's
+rate limit), then runs the same burst of concurrent SOP analyses with
+micro-batching off and on and reports wall time, latency percentiles and the
+number of upstream calls.
+
+    python benchmark_batching.py --requests 64 --concurrency 32 --latency 0.5
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+from utils.config import Config
+
+ANALYSIS = {
+    "key_themes": ["research", "motivation", "career"],
+    "strengths": ["clear goals"],
+    "weaknesses": ["few specifics"],
+    "suggestions": ["quantify outcomes"],
+    "sentiment_score": 0.7,
+    "overall_score": 78,
+    "academic_focus_score": 80,
+    "personal_narrative_score": 75,
+    "research_alignment_score": 77,
+    "career_clarity_score": 79,
+    "writing_quality_score": 81
+}
+
+
+class StubGemini(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency: float, per_document: float, max_concurrent: int):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.latency = latency
+        self.per_document = per_document
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        prompt = ''.join(part.get('text', '') for content in body.get('contents', []) for part in content.get('parts', []))
+        ids = [int(i) for i in re.findall(r'<document id="(\d+)"', prompt)]
+
+        with self.server.slots:
+            with self.server.lock:
+                self.server.calls += 1
+            time.sleep(self.server.latency + self.server.per_document * max(len(ids), 1))
+
+        answer = {"results": [{"id": i, **ANALYSIS} for i in ids]} if ids else ANALYSIS
+        payload = json.dumps({
+            "candidates": [{
+                "content": {"parts": [{"text": json.dumps(answer)}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0
+            }]
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _run(server: StubGemini, batching: bool, args) -> Dict[str, Any]:
+    # Imported late so the service picks up a fresh client per configuration
+    from services.sop_service import SOPService
+
+    config = Config()
+    config.GEMINI_API_KEY = 'stub'
+    config.GEMINI_API_ENDPOINT = f'http://127.0.0.1:{server.server_address[1]}'
+    config.GEMINI_TRANSPORT = 'rest'
+    config.LLM_CACHE_ENABLED = False
+    config.SEMANTIC_CACHE_ENABLED = False
+    config.CIRCUIT_BREAKER_ENABLED = False
+    config.UPSTREAM_CONCURRENCY['gemini'] = args.concurrency
+    config.UPSTREAM_MAX_QUEUE = args.requests
+    config.UPSTREAM_QUEUE_TIMEOUT = 600
+    config.LLM_MICRO_BATCH_ENABLED = batching
+    config.LLM_MICRO_BATCH_SIZE = args.batch_size
+    config.LLM_MICRO_BATCH_WAIT_MS = args.wait_ms
+    service = SOPService(config)
+
+    def analyze(i: int) -> float:
+        start = time.time()
+        sop = (f"Statement {i}. I am passionate about research in machine learning and its "
+               f"applications to healthcare, which grew out of project {i}. ") * 8
+        service._ai_analysis(sop, {"target_program": "MS Computer Science", "target_university": "Stanford"})
+        return time.time() - start
+
+    calls_before = server.calls
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies: List[float] = sorted(pool.map(analyze, range(args.requests)))
+    elapsed = time.time() - start
+    return {
+        "batching": batching,
+        "wall_seconds": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "p50_seconds": round(latencies[len(latencies) // 2], 3),
+        "p95_seconds": round(latencies[int(0.95 * (len(latencies) - 1))], 3),
+        "upstream_calls": server.calls - calls_before
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SOP analysis micro-batching against a stub LLM server")
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, default=32, help="concurrent analyses (and client slots)")
+    parser.add_argument('--latency', type=float, default=0.5, help="stub seconds per upstream call")
+    parser.add_argument('--per-document', type=float, default=0.02, help="stub extra seconds per document")
+    parser.add_argument('--upstream-limit', type=int, default=4, help="stub concurrent call limit (rate limit)")
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--wait-ms', type=float, default=10)
+    args = parser.parse_args()
+
+    server = StubGemini(args.latency, args.per_document, args.upstream_limit)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        for batching in (False, True):
+            print(json.dumps(_run(server, batching, args)))
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
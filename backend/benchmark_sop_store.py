@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+SOP store benchmark: save/load throughput under concurrent writers
+
+Runs the same workload against two stores on a fresh temporary database:
+
+    legacy   a new connection per operation in the default rollback journal,
+             SELECT-then-UPDATE/INSERT and no read cache (the previous store)
+    pooled   SOPService: per-thread WAL connections with a busy timeout,
+             BEGIN IMMEDIATE writes and the load_sop read-through cache
+
+Writer processes (standing in for gunicorn workers) save SOPs over a shared
+set of ids while reader threads load them, and the script reports operations
+per second, latency percentiles and failed operations for each store.
+
+    python benchmark_sop_store.py --writers 4 --readers 8 --duration 5
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+from utils.config import Config
+
+CONTENT = ("My passion for machine learning began during my undergraduate research on graph neural networks. "
+           "I want to pursue graduate study to deepen this work. ") * 20
+ANALYSIS = {"overall_score": 78, "strengths": ["clear goals"], "suggestions": ["quantify outcomes"]}
+
+
+class LegacyStore:
+    def __init__(self, path: str):
+        self.path = path
+        with sqlite3.connect(path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sop_documents (
+                    id TEXT PRIMARY KEY, user_id TEXT, title TEXT NOT NULL, content TEXT NOT NULL,
+                    target_program TEXT, target_university TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, analysis_data TEXT
+                )
+            ''')
+
+    def save_sop(self, sop: Dict[str, Any]):
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id FROM sop_documents WHERE id = ?', (sop['id'],))
+            if cursor.fetchone():
+                cursor.execute('UPDATE sop_documents SET title = ?, content = ?, analysis_data = ?, '
+                               'updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                               (sop['title'], sop['content'], json.dumps(sop['analysis']), sop['id']))
+            else:
+                cursor.execute('INSERT INTO sop_documents (id, user_id, title, content, analysis_data) '
+                               'VALUES (?, ?, ?, ?, ?)',
+                               (sop['id'], sop['user_id'], sop['title'], sop['content'],
+                                json.dumps(sop['analysis'])))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def load_sop(self, sop_id: str):
+        conn = sqlite3.connect(self.path)
+        try:
+            row = conn.execute('SELECT id, user_id, title, content, target_program, target_university, '
+                               'created_at, updated_at, analysis_data FROM sop_documents WHERE id = ?',
+                               (sop_id,)).fetchone()
+            return row and {"id": row[0], "content": row[3], "analysis": json.loads(row[8] or '{}')}
+        finally:
+            conn.close()
+
+
+def make_store(kind: str, path: str):
+    if kind == 'legacy':
+        return LegacyStore(path)
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    from services.sop_service import SOPService
+    return SOPService(Config())
+
+
+def run_ops(op: Callable[[], Any], deadline: float) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            op()
+            latencies.append(time.perf_counter() - started)
+        except Exception:
+            errors += 1
+    return {"latencies": latencies, "errors": errors}
+
+
+def writer(kind: str, path: str, ids: List[str], duration: float, results):
+    store = make_store(kind, path)
+    rng = random.Random(os.getpid())
+
+    def save():
+        store.save_sop({"id": rng.choice(ids), "user_id": "bench", "title": "SOP",
+                        "content": CONTENT + str(rng.random()), "analysis": ANALYSIS})
+
+    results.put(run_ops(save, time.monotonic() + duration))
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000 if ordered else 0.0
+
+
+def summarize(label: str, runs: List[Dict[str, Any]], duration: float):
+    latencies = [value for run in runs for value in run["latencies"]]
+    errors = sum(run["errors"] for run in runs)
+    print(f"  {label:<6} {len(latencies) / duration:>9.0f} ops/s   p50 {percentile(latencies, 0.5):7.2f} ms   "
+          f"p99 {percentile(latencies, 0.99):7.2f} ms   failed {errors}")
+
+
+def bench(kind: str, args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sops.db')
+        store = make_store(kind, path)
+        ids = [str(uuid.uuid4()) for _ in range(args.documents)]
+        for sop_id in ids:
+            store.save_sop({"id": sop_id, "user_id": "bench", "title": "SOP", "content": CONTENT,
+                            "analysis": ANALYSIS})
+
+        ctx = multiprocessing.get_context('fork')
+        results = ctx.Queue()
+        writers = [ctx.Process(target=writer, args=(kind, path, ids, args.duration, results))
+                   for _ in range(args.writers)]
+
+        reads: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + args.duration
+
+        def reader():
+            rng = random.Random()
+            reads.append(run_ops(lambda: store.load_sop(rng.choice(ids)), deadline))
+
+        readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+        for worker in writers + readers:
+            worker.start()
+        writes = [results.get() for _ in writers]
+        for worker in writers + readers:
+            worker.join()
+
+        print(f"{kind}:")
+        summarize('save', writes, args.duration)
+        summarize('load', reads, args.duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=4, help='writer processes')
+    parser.add_argument('--readers', type=int, default=8, help='reader threads')
+    parser.add_argument('--documents', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per store')
+    args = parser.parse_args()
+
+    print(f"{args.writers} writer processes, {args.readers} reader threads, "
+          f"{args.documents} documents, {args.duration:.0f}s per store\n")
+    for kind in ('legacy', 'pooled'):
+        bench(kind, args)
+
+
+if __name__ == '__main__':
+    main()
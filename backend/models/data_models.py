@@ -126,12 +126,15 @@ class SOPAnalysis(BaseModel):
     research_alignment_score: Optional[int] = None
     career_clarity_score: Optional[int] = None
     writing_quality_score: Optional[int] = None
+    text_metrics: Dict[str, Any] = Field(default_factory=dict)
 
 class SOPEnhancement(BaseModel):
     original_text: str
     enhanced_sections: Dict[str, str] = Field(default_factory=dict)
     suggestions: List[str] = Field(default_factory=list)
     improvement_areas: List[str] = Field(default_factory=list)
+    # Per section: the original text it rewrites plus utils.text_diff ops and stats
+    section_diffs: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
 
 class SOPDocument(BaseModel):
     id: str
@@ -0,0 +1,140 @@
+from typing import Dict, List, Optional, Any, Iterator
+import logging
+import time
+import uuid
+from datetime import datetime
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+
+from services.resume_service import ResumeService
+from utils.config import Config
+from utils.request_context import request_priority
+
+logger = logging.getLogger('unicompass.batch_service')
+
+# Per-process ResumeService used by the scoring pool workers
+_worker_service: Optional[ResumeService] = None
+
+
+def _init_worker(config: Config):
+    """Process pool initializer: build a local-only resume service once per worker"""
+    global _worker_service
+    _worker_service = ResumeService(config, init_clients=False)
+
+
+def _score_resume(resume_text: str) -> Dict[str, Any]:
+    """Local parsing and ATS scoring, executed inside a pool worker"""
+    return _worker_service.analyze_resume(resume_text, {})
+
+
+def _as_batch(fn, *args):
+    """Run an upstream stage at batch priority so interactive requests are admitted first"""
+    with request_priority('batch'):
+        return fn(*args)
+
+
+class ResumeBatchService:
+    """Cohort resume scoring: local parsing and ATS scoring on a process pool,
+    with optional LLM enrichment under a bounded concurrency limit"""
+
+    def __init__(self, config: Config, resume_service: ResumeService):
+        self.config = config
+        self.resume_service = resume_service
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.upstream_executor = ThreadPoolExecutor(
+            max_workers=config.BATCH_LLM_CONCURRENCY, thread_name_prefix='batch-upstream'
+        )
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Scoring pool, created lazily so each gunicorn worker owns its own"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.config.BATCH_WORKERS,
+                    initializer=_init_worker,
+                    initargs=(self.config,)
+                )
+                logger.info(f"Started resume scoring pool with {self.config.BATCH_WORKERS} workers")
+            return self._pool
+
+    def score_stream(self, items: List[Dict[str, Any]], options: Dict[str, Any] = {}) -> Iterator[Dict[str, Any]]:
+        """Score resumes and yield one record per resume as soon as it completes.
+
+        Each item is {"id": ..., "text": ...} or {"id": ..., "file": FileStorage}
+        for PDFs, which are OCR'd before scoring. A summary record is yielded last.
+        """
+        start_time = time.time()
+        batch_id = str(uuid.uuid4())
+        llm_enrichment = bool(options.get('llm_enrichment', False)) and self.resume_service.groq_client is not None
+
+        if len(items) > self.config.BATCH_MAX_ITEMS:
+            raise ValueError(f"Batch is limited to {self.config.BATCH_MAX_ITEMS} resumes")
+
+        logger.info(f"Starting resume batch {batch_id} with {len(items)} resumes (llm_enrichment={llm_enrichment})")
+
+        pending: Dict[Future, tuple] = {}
+        texts: Dict[int, str] = {}
+        succeeded = failed = 0
+
+        for index, item in enumerate(items):
+            item_id = str(item.get('id') or index) if isinstance(item, dict) else str(index)
+            if isinstance(item, dict) and item.get('file') is not None:
+                future = self.upstream_executor.submit(_as_batch, self.resume_service.extract_text_from_pdf, item['file'])
+                pending[future] = ('ocr', item_id, index)
+            elif isinstance(item, dict) and isinstance(item.get('text'), str) and item['text'].strip():
+                texts[index] = item['text']
+                pending[self.pool.submit(_score_resume, texts[index])] = ('score', item_id, index)
+            else:
+                # Rejected like an empty /api/resume/analyze request, not scored as an empty resume
+                failed += 1
+                yield self._record(item_id, index, error="Resume text is required")
+
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, item_id, index = pending.pop(future)
+
+                try:
+                    value = future.result()
+                except Exception as e:
+                    logger.warning(f"Batch {batch_id} item {item_id} failed at {stage}: {str(e)}")
+                    failed += 1
+                    yield self._record(item_id, index, error=f"{stage} failed: {str(e)}")
+                    continue
+
+                if stage == 'ocr':
+                    texts[index] = value['text']
+                    pending[self.pool.submit(_score_resume, value['text'])] = ('score', item_id, index)
+                elif stage == 'score' and llm_enrichment:
+                    future = self.upstream_executor.submit(
+                        _as_batch, self.resume_service.enrich_with_llm, value, texts[index], options
+                    )
+                    pending[future] = ('enrich', item_id, index)
+                else:
+                    succeeded += 1
+                    yield self._record(item_id, index, result=value)
+
+        processing_time = time.time() - start_time
+        logger.info(f"Completed resume batch {batch_id} in {processing_time:.2f}s ({succeeded} ok, {failed} failed)")
+
+        yield {
+            "type": "summary",
+            "batch_id": batch_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "total": len(items),
+            "succeeded": succeeded,
+            "failed": failed,
+            "llm_enrichment": llm_enrichment,
+            "processing_time": processing_time
+        }
+
+    def _record(self, item_id: str, index: int, result: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None) -> Dict[str, Any]:
+        record = {"type": "result", "id": item_id, "index": index, "success": error is None}
+        if error is None:
+            record["result"] = result
+        else:
+            record["error"] = error
+        return record
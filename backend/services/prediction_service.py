@@ -8,6 +8,7 @@ import numpy as np
 
 from models.data_models import *
 from utils.config import Config
+from utils.singleflight import coalesce
 from services.ml_prediction_service import MLPredictionService
 
 logger = logging.getLogger('unicompass.prediction_service')
@@ -30,6 +31,7 @@ class PredictionService:
             self.ml_service = None
             logger.warning("Falling back to mock prediction service")
     
+    @coalesce('prediction.predict')
     def predict_universities(self, profile_data: Dict[str, Any]) -> Dict[str, Any]:
         """Predict university admission probabilities based on academic profile"""
         start_time = time.time()
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import logging
 import time
 import uuid
@@ -7,43 +7,83 @@ import re
 import requests
 from groq import Groq
 from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
 from werkzeug.datastructures import FileStorage
 import tempfile
 import os
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
 from models.data_models import *
 from utils.config import Config
+from utils.singleflight import coalesce
+from utils.skill_taxonomy import get_skill_trie
+from utils.cache import TTLCache
+from utils.prompt_budget import prepare_chunks, fit_to_budget, map_chunks, estimate_tokens, exceeds_chunk_limit
+from utils.llm_cache import get_llm_cache, is_json_response
+from utils.near_duplicate import NearDuplicateCache
+from utils.admission import AdmissionRejected, upstream_slot
+from utils.resilience import get_provider_guard
+from utils.model_router import get_model_router
+from utils.upstream_clients import get_groq_client, get_document_analysis_client
+from utils.request_context import (
+    fresh_generation, is_fresh_generation, submit_in_context, time_budget, result_within_budget,
+    remaining_time, deadline_exceeded, mark_budget_exhausted, DeadlineExceeded
+)
 
 logger = logging.getLogger('unicompass.resume_service')
 
+# Headings that start a new resume section for incremental analysis
+SECTION_HEADINGS = {
+    'summary', 'professional summary', 'profile', 'objective', 'career objective', 'about me',
+    'experience', 'work experience', 'professional experience', 'employment', 'employment history',
+    'internships', 'internship', 'education', 'academic background', 'skills', 'technical skills',
+    'core competencies', 'projects', 'academic projects', 'personal projects', 'certifications',
+    'certificates', 'publications', 'research', 'research experience', 'awards', 'honors',
+    'achievements', 'awards and achievements', 'languages', 'extracurricular activities',
+    'leadership', 'volunteer experience', 'activities', 'interests', 'coursework', 'relevant coursework'
+}
+
+LIST_FIELDS = ('work_experience', 'education', 'skills', 'certifications', 'projects', 'languages')
+
 class ResumeService:
     """Comprehensive resume analysis service combining OCR, scoring, and AI enhancement"""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, init_clients: bool = True):
         self.config = config
-        self.groq_client = None
-        self.azure_client = None
-        
-        # Initialize Groq client
-        try:
-            if config.GROQ_API_KEY:
-                self.groq_client = Groq(api_key=config.GROQ_API_KEY)
-                logger.info("Groq client initialized successfully")
-        except Exception as e:
-            logger.warning(f"Failed to initialize Groq client: {str(e)}")
-        
-        # Initialize Azure Document Intelligence client
-        try:
-            if config.AZURE_DOC_INTELLIGENCE_KEY and config.AZURE_DOC_INTELLIGENCE_ENDPOINT:
-                credential = AzureKeyCredential(config.AZURE_DOC_INTELLIGENCE_KEY)
-                self.azure_client = DocumentAnalysisClient(
-                    endpoint=config.AZURE_DOC_INTELLIGENCE_ENDPOINT,
-                    credential=credential
-                )
-                logger.info("Azure Document Intelligence client initialized successfully")
-        except Exception as e:
-            logger.warning(f"Failed to initialize Azure client: {str(e)}")
+        self.init_clients = init_clients
+        self._groq_client = None
+        self._azure_client = None
+        self.skill_trie = get_skill_trie(config.SKILL_TAXONOMY_PATH)
+        self.llm_executor = ThreadPoolExecutor(max_workers=config.LLM_WORKERS, thread_name_prefix='resume-llm')
+        self.section_cache = TTLCache(max_size=config.SECTION_CACHE_SIZE, ttl=config.CACHE_TTL)
+        self.llm_cache = get_llm_cache(config)
+        self.near_duplicates = NearDuplicateCache(
+            capacity=config.SEMANTIC_CACHE_SIZE, threshold=config.SEMANTIC_CACHE_THRESHOLD
+        ) if config.SEMANTIC_CACHE_ENABLED else None
+    
+    # Upstream clients are pooled per process and resolved on use, so each
+    # forked gunicorn worker builds its own. Local-only instances (e.g. batch
+    # scoring workers) have none; assigning a client overrides the pool.
+    @property
+    def groq_client(self) -> Optional[Groq]:
+        if self._groq_client is None and self.init_clients:
+            return get_groq_client(self.config)
+        return self._groq_client
+    
+    @groq_client.setter
+    def groq_client(self, client: Optional[Groq]):
+        self._groq_client = client
+    
+    @property
+    def azure_client(self) -> Optional[DocumentAnalysisClient]:
+        if self._azure_client is None and self.init_clients:
+            return get_document_analysis_client(self.config)
+        return self._azure_client
+    
+    @azure_client.setter
+    def azure_client(self, client: Optional[DocumentAnalysisClient]):
+        self._azure_client = client
     
     def extract_text_from_pdf(self, file: FileStorage) -> Dict[str, Any]:
         """Extract text from PDF using Azure Document Intelligence"""
@@ -58,11 +98,14 @@ class ResumeService:
                 file.save(tmp_file.name)
                 
                 # Analyze document
-                with open(tmp_file.name, 'rb') as f:
+                with open(tmp_file.name, 'rb') as f, upstream_slot(self.config, 'azure'):
                     poller = self.azure_client.begin_analyze_document(
                         "prebuilt-document", document=f
                     )
-                    result = poller.result()
+                    result = poller.result(timeout=remaining_time())
+                    if not poller.done():
+                        mark_budget_exhausted()
+                        raise DeadlineExceeded("OCR did not finish within the request time budget")
                 
                 # Clean up temporary file
                 os.unlink(tmp_file.name)
@@ -83,10 +126,13 @@ class ResumeService:
                 "confidence": self._calculate_ocr_quality(result)
             }
             
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"OCR extraction failed: {str(e)}")
             raise Exception(f"OCR extraction failed: {str(e)}")
     
+    @coalesce('resume.analyze')
     def analyze_resume(self, resume_text: str, options: Dict[str, Any] = {}) -> Dict[str, Any]:
         """Comprehensive resume analysis with hybrid scoring"""
         start_time = time.time()
@@ -95,22 +141,16 @@ class ResumeService:
         logger.info(f"Starting resume analysis {request_id}")
         
         try:
-            # Parse resume with LLM if available
-            parsed_resume = self._parse_resume_with_llm(resume_text)
+            # Structured parse and AI insights from the LLM, if available
+            analysis_mode = options.get('analysis_mode', self.config.RESUME_ANALYSIS_MODE)
+            with fresh_generation(options.get('fresh', False)):
+                parsed_resume, ai_insights = self._run_llm_analysis(resume_text, analysis_mode)
             if not parsed_resume:
                 parsed_resume = self._parse_resume_traditional(resume_text)
             
             # Calculate ATS score
             ats_score = self._calculate_ats_score(resume_text, parsed_resume)
             
-            # Generate AI insights if available
-            ai_insights = None
-            if self.groq_client:
-                try:
-                    ai_insights = self._generate_ai_insights(resume_text, parsed_resume)
-                except Exception as e:
-                    logger.warning(f"AI insights generation failed: {str(e)}")
-            
             # Generate feedback
             feedback = self._generate_feedback(parsed_resume, ats_score, ai_insights)
             
@@ -127,17 +167,331 @@ class ResumeService:
             )
             
             logger.info(f"Completed resume analysis {request_id} in {processing_time:.2f}s")
-            return result.dict()
+            # Partial: the time budget ran out and some LLM work was replaced by local results.
+            # Truncated: the resume was too long and the LLM only saw its beginning.
+            truncated = ai_insights is not None and self._input_truncated(resume_text, analysis_mode)
+            return {**result.dict(), "partial": deadline_exceeded(), "truncated": truncated}
             
         except Exception as e:
             logger.error(f"Resume analysis failed: {str(e)}")
             raise Exception(f"Resume analysis failed: {str(e)}")
     
+    def enrich_with_llm(self, analysis: Dict[str, Any], resume_text: str, options: Dict[str, Any] = {}) -> Dict[str, Any]:
+        """Add LLM parse and insights to a locally computed analysis result"""
+        start_time = time.time()
+        
+        analysis_mode = options.get('analysis_mode', self.config.RESUME_ANALYSIS_MODE)
+        with fresh_generation(options.get('fresh', False)):
+            parsed_resume, ai_insights = self._run_llm_analysis(resume_text, analysis_mode)
+        if not parsed_resume:
+            parsed_resume = ParsedResume(**analysis['parsed_resume'])
+        
+        ats_score = self._calculate_ats_score(resume_text, parsed_resume)
+        feedback = self._generate_feedback(parsed_resume, ats_score, ai_insights)
+        
+        result = ResumeAnalysisResult(
+            request_id=analysis['request_id'],
+            timestamp=datetime.utcnow().isoformat(),
+            parsed_resume=parsed_resume,
+            ats_score=ats_score,
+            ai_insights=ai_insights,
+            feedback=feedback,
+            processing_time=analysis['processing_time'] + (time.time() - start_time)
+        )
+        truncated = ai_insights is not None and self._input_truncated(resume_text, analysis_mode)
+        return {**result.dict(), "truncated": truncated}
+    
+    def _input_truncated(self, resume_text: str, analysis_mode: str) -> bool:
+        """True when the resume is longer than LLM_MAX_CHUNKS budget-sized chunks, so
+        the chunked LLM calls only saw its beginning (incremental mode sends every section)"""
+        return analysis_mode != 'incremental' and exceeds_chunk_limit(
+            resume_text, self.config.LLM_INPUT_TOKEN_BUDGET, self.config.LLM_MAX_CHUNKS
+        )
+    
+    def _run_llm_analysis(self, resume_text: str, analysis_mode: str) -> Tuple[Optional[ParsedResume], Optional[Dict[str, Any]]]:
+        """LLM analysis, reusing the insights for a near-duplicate of a recently analyzed resume.
+
+        Only insights are reused: the parse carries the other submission's contact
+        details and text, so on a hit the caller parses this resume locally.
+        Approximate reuse is flagged in the insights and the exact analysis is
+        refreshed in the background for the next request.
+        """
+        if not self.groq_client:
+            return None, None
+        
+        # Incremental mode already reuses per-section results for edited resumes
+        if not self.near_duplicates or analysis_mode == 'incremental':
+            return self._compute_llm_analysis(resume_text, analysis_mode)
+        
+        # Key on the model that produces the insights, and pin that model for this analysis
+        model = self._routed_model(self._insights_caller(analysis_mode), resume_text)
+        namespace = f"resume.analyze|{model}|{analysis_mode}"
+        if not is_fresh_generation():
+            cached = self.near_duplicates.lookup(namespace, resume_text)
+            if cached:
+                ai_insights, similarity, exact = cached
+                if exact:
+                    return None, ai_insights
+                self.near_duplicates.schedule_refresh(
+                    namespace, resume_text, lambda: self._reusable_insights(self._compute_llm_analysis(resume_text, analysis_mode, model)[1])
+                )
+                return None, {**ai_insights, "approximate": True, "similarity": round(similarity, 3)}
+        
+        parsed_resume, ai_insights = self._compute_llm_analysis(resume_text, analysis_mode, model)
+        reusable = self._reusable_insights(ai_insights)
+        if reusable:
+            self.near_duplicates.store(namespace, resume_text, reusable)
+        return parsed_resume, ai_insights
+    
+    @staticmethod
+    def _reusable_insights(ai_insights: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The insights if they succeeded, otherwise None so failures are never reused"""
+        if not isinstance(ai_insights, dict) or 'error' in ai_insights:
+            return None
+        return ai_insights
+    
+    @staticmethod
+    def _insights_caller(analysis_mode: str) -> str:
+        """The routing caller whose call produces the insights in this mode"""
+        return 'resume.analyze' if analysis_mode == 'combined' else 'resume.insights'
+    
+    def _compute_llm_analysis(self, resume_text: str, analysis_mode: str,
+                              model: Optional[str] = None) -> Tuple[Optional[ParsedResume], Optional[Dict[str, Any]]]:
+        """Get the structured parse and AI insights in one LLM round trip.
+
+        "combined" asks for both in a single JSON-mode call, "parallel" issues
+        the parse and insights calls concurrently, "incremental" only sends
+        sections that changed since a previous analysis and "sequential" keeps
+        the original one-after-the-other behaviour. `model`, when given, is used
+        for the call that produces the insights instead of routing it.
+        """
+        if analysis_mode == 'combined':
+            return self._analyze_resume_with_llm(resume_text, model)
+        
+        if analysis_mode == 'incremental':
+            return self._analyze_resume_incremental(resume_text)
+        
+        if analysis_mode == 'parallel':
+            parse_future = submit_in_context(self.llm_executor, self._parse_resume_with_llm, resume_text)
+            insights_future = submit_in_context(self.llm_executor, self._generate_ai_insights, resume_text, None, model)
+            return result_within_budget(parse_future), result_within_budget(insights_future)
+        
+        parsed_resume = self._parse_resume_with_llm(resume_text)
+        return parsed_resume, self._generate_ai_insights(resume_text, parsed_resume, model)
+    
+    def _analyze_resume_with_llm(self, resume_text: str, model: Optional[str] = None) -> Tuple[Optional[ParsedResume], Optional[Dict[str, Any]]]:
+        """Parse the resume and generate insights with a single JSON-mode LLM call.
+        
+        Resumes over the per-call token budget are chunked; chunks are analyzed
+        concurrently and their parses and insights merged.
+        """
+        chunks = prepare_chunks(resume_text, self.config.LLM_INPUT_TOKEN_BUDGET, self.config.LLM_MAX_CHUNKS)
+        results = [data for data in map_chunks(lambda chunk: self._analyze_chunk_with_llm(chunk, model), chunks) if data]
+        if not results:
+            return None, None
+        
+        merged: Dict[str, Any] = {"contact_info": {}}
+        insights: Optional[Dict[str, Any]] = None
+        for data in results:
+            if isinstance(data.get('parsed_resume'), dict):
+                self._merge_parsed_section(merged, data['parsed_resume'])
+            
+            chunk_insights = data.get('insights')
+            if not isinstance(chunk_insights, dict):
+                continue
+            if insights is None:
+                insights = dict(chunk_insights)
+            elif isinstance(chunk_insights.get('areas_for_improvement'), list):
+                insights.setdefault('areas_for_improvement', []).extend(chunk_insights['areas_for_improvement'])
+        
+        has_parse = any(isinstance(data.get('parsed_resume'), dict) for data in results)
+        parsed_resume = self._convert_to_parsed_resume(merged, resume_text) if has_parse else None
+        return parsed_resume, insights
+    
+    def _analyze_chunk_with_llm(self, resume_text: str, model: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        try:
+            prompt = f"""
+            Analyze the following resume and return a single JSON object with exactly two keys:
+            
+            "parsed_resume": structured information extracted from the resume.
+                Include: contact_info, summary, work_experience, education, skills, certifications, projects, languages.
+            "insights": insights about the resume with the keys
+                overall_strength, industry_alignment, career_progression, unique_value_proposition,
+                competitive_advantages, areas_for_improvement (a list of strings).
+            
+            Resume:
+            {resume_text}
+            
+            Return only valid JSON.
+            """
+            
+            content = self._groq_chat('resume.analyze', prompt, json_mode=True, model=model)
+            
+            data = json.loads(content)
+            return data if isinstance(data, dict) else None
+            
+        except Exception as e:
+            logger.error(f"Combined LLM analysis failed: {str(e)}")
+            return None
+    
+    def _analyze_resume_incremental(self, resume_text: str) -> Tuple[Optional[ParsedResume], Optional[Dict[str, Any]]]:
+        """Analyze only sections whose hash is not cached, then reassemble the report"""
+        sections = self._split_sections(resume_text)
+        models = [self._routed_model('resume.section', body) for _, body in sections]
+        keys = [self._section_key(model, heading, body) for model, (heading, body) in zip(models, sections)]
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        futures = {}
+        for key, model, (heading, body) in zip(keys, models, sections):
+            if key in results or key in futures:
+                continue
+            cached = self.section_cache.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                futures[key] = submit_in_context(self.llm_executor, self._analyze_section_with_llm, heading, body, model)
+        
+        for key, future in futures.items():
+            section_result = result_within_budget(future)
+            if section_result is not None:
+                self.section_cache.set(key, section_result)
+            results[key] = section_result or {}
+        
+        logger.info(f"Incremental resume analysis: {len(sections)} sections, {len(futures)} re-analyzed")
+        
+        # Reassemble the parse and the insights in document order
+        merged: Dict[str, Any] = {"contact_info": {}}
+        insights: Dict[str, Any] = {"areas_for_improvement": [], "strengths": [], "sections": {}}
+        for key, (heading, _) in zip(keys, sections):
+            section_result = results.get(key, {})
+            self._merge_parsed_section(merged, section_result.get('parsed') or {})
+            
+            section_insights = section_result.get('insights') or {}
+            insights["sections"][heading] = section_insights
+            for field in ('areas_for_improvement', 'strengths'):
+                values = section_insights.get(field) or []
+                insights[field].extend(v for v in values if isinstance(v, str))
+        
+        insights["incremental"] = {
+            "sections": len(sections),
+            "reanalyzed": len(futures),
+            "reused": len(sections) - len(futures)
+        }
+        
+        return self._convert_to_parsed_resume(merged, resume_text), insights
+    
+    def _analyze_section_with_llm(self, heading: str, body: str, model: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Parse and critique a single resume section with one JSON-mode call"""
+        try:
+            prompt = f"""
+            The following is the "{heading}" section of a resume. Return a single JSON object with two keys:
+            
+            "parsed": the structured information in this section, using only the applicable keys among
+                contact_info, summary, work_experience, education, skills, certifications, projects, languages.
+            "insights": feedback on this section with the keys strengths and areas_for_improvement
+                (both lists of short strings).
+            
+            Section:
+            {fit_to_budget(body, self.config.LLM_INPUT_TOKEN_BUDGET)}
+            
+            Return only valid JSON.
+            """
+            
+            content = self._groq_chat('resume.section', prompt, json_mode=True, model=model)
+            
+            data = json.loads(content)
+            return data if isinstance(data, dict) else None
+            
+        except Exception as e:
+            logger.error(f"Section analysis failed for {heading}: {str(e)}")
+            return None
+    
+    def _groq_chat(self, caller: str, prompt: str, max_tokens: Optional[int] = None,
+                   temperature: Optional[float] = None, json_mode: bool = False,
+                   model: Optional[str] = None) -> str:
+        """Single Groq chat completion on the routed model (or `model` when the
+        caller already routed), behind the shared LLM response cache and circuit breaker"""
+        max_tokens = max_tokens or self.config.MAX_TOKENS
+        temperature = self.config.TEMPERATURE if temperature is None else temperature
+        router = get_model_router(self.config)
+        model = model or router.route(caller, 'groq', estimate_tokens(prompt), max_tokens)
+        
+        def call() -> str:
+            kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+            with router.timed('groq', model):
+                response = self.groq_client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=time_budget(self.config.LLM_READ_TIMEOUT, self.config.LLM_MIN_BUDGET),
+                    **kwargs
+                )
+            return response.choices[0].message.content
+        
+        return self.llm_cache.get_or_call(
+            caller, 'groq', model, temperature, [prompt, max_tokens, json_mode],
+            lambda: get_provider_guard(self.config, 'groq').call(call),
+            validate=is_json_response
+        )
+    
+    def _routed_model(self, caller: str, text: str) -> str:
+        """The Groq model the router picks for caller on text, for keying caches
+        on the model that actually produces the result"""
+        return get_model_router(self.config).route(caller, 'groq', estimate_tokens(text), self.config.MAX_TOKENS)
+    
+    def _split_sections(self, resume_text: str) -> List[Tuple[str, str]]:
+        """Split resume text into (heading, body) sections on recognised headings"""
+        sections: List[Tuple[str, List[str]]] = [("header", [])]
+        for line in resume_text.splitlines():
+            candidate = re.sub(r'[^a-z ]', '', line.strip().lower()).strip()
+            if candidate in SECTION_HEADINGS and len(line.strip()) < 40:
+                sections.append((candidate, []))
+            else:
+                sections[-1][1].append(line)
+        
+        return [
+            (heading, '\n'.join(lines).strip())
+            for heading, lines in sections
+            if '\n'.join(lines).strip()
+        ]
+    
+    def _section_key(self, model: str, heading: str, body: str) -> str:
+        normalized = ' '.join(body.split())
+        digest = hashlib.sha256(f"{model}|{heading}|{normalized}".encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _merge_parsed_section(self, merged: Dict[str, Any], parsed: Dict[str, Any]):
+        if isinstance(parsed.get('contact_info'), dict):
+            for field, value in parsed['contact_info'].items():
+                merged['contact_info'].setdefault(field, value)
+        
+        if isinstance(parsed.get('summary'), str) and not merged.get('summary'):
+            merged['summary'] = parsed['summary']
+        
+        for field in LIST_FIELDS:
+            values = parsed.get(field)
+            if isinstance(values, list):
+                merged.setdefault(field, []).extend(values)
+    
     def _parse_resume_with_llm(self, resume_text: str) -> Optional[ParsedResume]:
         """Parse resume using LLM for structured data extraction"""
         if not self.groq_client:
             return None
         
+        chunks = prepare_chunks(resume_text, self.config.LLM_INPUT_TOKEN_BUDGET, self.config.LLM_MAX_CHUNKS)
+        parts = [data for data in map_chunks(self._parse_chunk_with_llm, chunks) if data]
+        if not parts:
+            return None
+        
+        merged: Dict[str, Any] = {"contact_info": {}}
+        for data in parts:
+            self._merge_parsed_section(merged, data)
+        
+        # Convert to ParsedResume model
+        return self._convert_to_parsed_resume(merged, resume_text)
+    
+    def _parse_chunk_with_llm(self, resume_text: str) -> Optional[Dict[str, Any]]:
         try:
             prompt = f"""
             Parse the following resume and extract structured information in JSON format.
@@ -149,19 +503,10 @@ class ResumeService:
             Return only valid JSON.
             """
             
-            response = self.groq_client.chat.completions.create(
-                model=self.config.GROQ_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=self.config.MAX_TOKENS,
-                temperature=self.config.TEMPERATURE
-            )
-            
-            # Parse response and create ParsedResume object
-            import json
-            parsed_data = json.loads(response.choices[0].message.content)
+            content = self._groq_chat('resume.parse', prompt)
             
-            # Convert to ParsedResume model
-            return self._convert_to_parsed_resume(parsed_data, resume_text)
+            parsed_data = json.loads(content)
+            return parsed_data if isinstance(parsed_data, dict) else None
             
         except Exception as e:
             logger.error(f"LLM parsing failed: {str(e)}")
@@ -216,7 +561,8 @@ class ResumeService:
             }
         )
     
-    def _generate_ai_insights(self, resume_text: str, parsed_resume: ParsedResume) -> Dict[str, Any]:
+    def _generate_ai_insights(self, resume_text: str, parsed_resume: Optional[ParsedResume],
+                              model: Optional[str] = None) -> Dict[str, Any]:
         """Generate AI-powered insights about the resume"""
         try:
             prompt = f"""
@@ -228,20 +574,14 @@ class ResumeService:
             5. Competitive advantages
             6. Areas for improvement
             
-            Resume: {resume_text[:2000]}...
+            Resume: {fit_to_budget(resume_text, self.config.INSIGHTS_TOKEN_BUDGET)}
             
             Provide insights in JSON format.
             """
             
-            response = self.groq_client.chat.completions.create(
-                model=self.config.GROQ_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=1000,
-                temperature=0.3
-            )
+            content = self._groq_chat('resume.insights', prompt, max_tokens=1000, temperature=0.3, model=model)
             
-            import json
-            return json.loads(response.choices[0].message.content)
+            return json.loads(content)
             
         except Exception as e:
             logger.error(f"AI insights generation failed: {str(e)}")
@@ -384,14 +724,70 @@ class ResumeService:
         return []
     
     def _extract_skills(self, resume_text: str) -> List[Skill]:
-        """Extract skills (simplified implementation)"""
-        return []
+        """Extract canonical skills using the compiled skill taxonomy trie"""
+        return self.skill_trie.extract(resume_text)
     
     def _convert_to_parsed_resume(self, parsed_data: Dict, resume_text: str) -> ParsedResume:
-        """Convert parsed JSON to ParsedResume model"""
-        # Simplified conversion - would need full implementation
+        """Convert parsed JSON to ParsedResume model, skipping malformed entries"""
+        contact_data = parsed_data.get('contact_info')
+        contact_info = ContactInfo(**{
+            field: str(value) for field, value in (contact_data if isinstance(contact_data, dict) else {}).items()
+            if field in ContactInfo.model_fields and value
+        })
+        local_contact = self._extract_contact_info(resume_text)
+        contact_info.email = contact_info.email or local_contact.email
+        contact_info.phone = contact_info.phone or local_contact.phone
+        
+        def as_list(value) -> List[Any]:
+            """List fields as the LLM may return them: a list, a dict of category
+            lists (flattened) or a comma-separated string"""
+            if isinstance(value, list):
+                return value
+            if isinstance(value, dict):
+                flattened = []
+                for entry in value.values():
+                    flattened.extend(as_list(entry))
+                return flattened
+            if isinstance(value, str):
+                return [part.strip() for part in re.split(r'[,;\n]', value) if part.strip()]
+            return []
+        
+        def records(field: str) -> List[Any]:
+            value = parsed_data.get(field)
+            return value if isinstance(value, list) else []
+        
+        def convert_list(field: str, model):
+            items = []
+            for item in records(field):
+                try:
+                    items.append(model(**item))
+                except Exception:
+                    continue
+            return items
+        
+        # Canonicalize skills through the taxonomy, keeping the local extraction as a floor
+        skills = {skill.name: skill for skill in self._extract_skills(resume_text)}
+        for item in as_list(parsed_data.get('skills')):
+            name = item.get('name') if isinstance(item, dict) else item
+            if not isinstance(name, str) or not name.strip():
+                continue
+            matches = self._extract_skills(name)
+            for skill in matches or [Skill(name=name.strip(), category=SkillCategory.TECHNICAL)]:
+                skills.setdefault(skill.name, skill)
+        
+        summary = parsed_data.get('summary')
         return ParsedResume(
-            contact_info=ContactInfo(),
+            contact_info=contact_info,
+            summary=summary if isinstance(summary, str) else None,
+            work_experience=convert_list('work_experience', WorkExperience),
+            education=convert_list('education', Education),
+            skills=list(skills.values()),
+            certifications=[str(c) for c in as_list(parsed_data.get('certifications')) if isinstance(c, (str, int))],
+            projects=[p for p in records('projects') if isinstance(p, dict)],
+            languages=[
+                {key: str(value) for key, value in language.items()}
+                for language in records('languages') if isinstance(language, dict)
+            ],
             raw_text=resume_text
         )
     
@@ -442,9 +838,14 @@ class ResumeService:
         return {
             "service": "groq_llm",
             "status": "connected" if self.groq_client else "unavailable",
-            "model": self.config.GROQ_MODEL,
+            "models": get_model_router(self.config).tiers['groq'],
             "max_tokens": self.config.MAX_TOKENS,
-            "temperature": self.config.TEMPERATURE
+            "temperature": self.config.TEMPERATURE,
+            "analysis_mode": self.config.RESUME_ANALYSIS_MODE,
+            "cache": self.llm_cache.get_stats(),
+            "semantic_cache": self.near_duplicates.get_stats() if self.near_duplicates else {"enabled": False},
+            "resilience": get_provider_guard(self.config, 'groq').get_stats(),
+            "routing": get_model_router(self.config).get_stats()
         }
     
     def get_ocr_status(self) -> Dict[str, Any]:
@@ -1,15 +1,63 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
+import contextvars
 import logging
+import math
+import queue
+import threading
 import time
 import uuid
+import copy
 from datetime import datetime
 import sqlite3
 import json
+import zlib
+import base64
+import hashlib
+import re
+import numpy as np
 import google.generativeai as genai
 from contextlib import contextmanager
 
 from models.data_models import *
 from utils.config import Config
+from utils.cache import TTLCache
+from utils.sqlite_pool import SQLitePool
+from utils.singleflight import coalesce
+from utils.prompt_budget import (
+    prepare_chunks, map_chunks, iter_chunks, estimate_tokens, compact_text, exceeds_chunk_limit
+)
+from utils.micro_batcher import MicroBatcher
+from utils.json_stream import IncrementalJSONParser
+from utils.text_metrics import analyze_text
+from utils.text_diff import diff_text
+from utils.llm_cache import get_llm_cache, is_json_response
+from utils.near_duplicate import NearDuplicateCache
+from utils.minhash import MinHasher, LSHIndex
+from utils.resilience import get_provider_guard
+from utils.model_router import get_model_router
+from utils.upstream_clients import get_gemini_model, gemini_request_options
+from utils.request_context import (
+    DeadlineExceeded, fresh_generation, is_fresh_generation, deadline_exceeded, mark_budget_exhausted, remaining_time
+)
+
+SCORE_FIELDS = (
+    'overall_score', 'academic_focus_score', 'personal_narrative_score',
+    'research_alignment_score', 'career_clarity_score', 'writing_quality_score'
+)
+
+# Logical SOP sections, in document order, and the words that mark a body paragraph
+# as belonging to one (the first paragraph is the opening, the last the conclusion)
+SOP_SECTIONS = ('opening', 'academic_background', 'research_experience', 'future_goals', 'conclusion')
+SECTION_CUES = {
+    'academic_background': ('gpa', 'coursework', 'course', 'courses', 'degree', 'undergraduate', 'bachelor',
+                            'major', 'grades', 'curriculum', 'semester', 'graduated', 'academic'),
+    'research_experience': ('research', 'lab', 'laboratory', 'project', 'thesis', 'publication', 'paper',
+                            'experiment', 'internship', 'professor', 'published', 'investigated'),
+    'future_goals': ('goal', 'goals', 'future', 'career', 'aspire', 'plan', 'hope', 'long-term', 'aim',
+                     'pursue', 'contribute', 'after graduation'),
+}
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_EMPTY_SIGNATURE_VALUE = np.iinfo(np.uint32).max
 
 logger = logging.getLogger('unicompass.sop_service')
 
@@ -19,27 +67,57 @@ class SOPService:
     def __init__(self, config: Config):
         self.config = config
         self.db_path = config.DATABASE_URL.replace('sqlite:///', '')
-        
-        # Initialize Gemini client
-        try:
-            if config.GEMINI_API_KEY:
-                genai.configure(api_key=config.GEMINI_API_KEY)
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
-                logger.info("Gemini AI client initialized successfully")
-            else:
-                self.model = None
-                logger.warning("Gemini API key not provided")
-        except Exception as e:
-            logger.error(f"Failed to initialize Gemini client: {str(e)}")
-            self.model = None
+        self.model_name = config.GEMINI_MODEL
+        self.llm_cache = get_llm_cache(config)
+        self.near_duplicates = NearDuplicateCache(
+            capacity=config.SEMANTIC_CACHE_SIZE, threshold=config.SEMANTIC_CACHE_THRESHOLD
+        ) if config.SEMANTIC_CACHE_ENABLED else None
+        self._model = None
+        self.analysis_batcher = MicroBatcher(
+            'sop.analyze',
+            self._analyze_batch,
+            max_batch=config.LLM_MICRO_BATCH_SIZE,
+            max_wait=config.LLM_MICRO_BATCH_WAIT_MS / 1000,
+            max_weight=config.LLM_INPUT_TOKEN_BUDGET,
+            weigh=lambda item: estimate_tokens(item["text"])
+        ) if config.LLM_MICRO_BATCH_ENABLED else None
+        self.paragraph_cache = TTLCache(max_size=config.SOP_PARAGRAPH_CACHE_SIZE, ttl=config.CACHE_TTL)
+        self.db_pool = SQLitePool(
+            self.db_path,
+            busy_timeout_ms=config.SQLITE_BUSY_TIMEOUT_MS,
+            synchronous=config.SQLITE_SYNCHRONOUS,
+            statement_cache=config.SQLITE_STATEMENT_CACHE
+        )
+        # Read-through cache for load_sop; see _check_sop_cache for cross-worker invalidation
+        self.sop_cache = TTLCache(max_size=config.SOP_CACHE_SIZE, ttl=config.CACHE_TTL)
+        self._sop_cache_generation = 0
+        self._sop_cache_lock = threading.Lock()
+        self._sop_changes_seen = 0
+        self._db_local = threading.local()
+        self.search_enabled = False
+        self.similarity_hasher = MinHasher(num_perm=128)
+        self._lsh = LSHIndex(num_perm=128, bands=32)  # band hashing only; buckets live in sop_lsh_bands
         
         # Initialize database
         self._init_database()
+        if config.SOP_SIMILARITY_ENABLED:
+            threading.Thread(target=self._backfill_similarity_index, name='sop-similarity-backfill', daemon=True).start()
+    
+    @property
+    def model(self) -> Optional[genai.GenerativeModel]:
+        """Gemini model from the per-process client pool (assigning one overrides it)"""
+        if self._model is None:
+            return get_gemini_model(self.config, self.model_name)
+        return self._model
+    
+    @model.setter
+    def model(self, model: Optional[genai.GenerativeModel]):
+        self._model = model
     
     def _init_database(self):
         """Initialize SQLite database for SOP storage"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.db_pool.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS sop_documents (
@@ -54,20 +132,172 @@ class SOPService:
                         analysis_data TEXT
                     )
                 ''')
-                conn.commit()
+                # Per-user listing walks this index newest-first (see list_sops)
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_sop_documents_user_updated
+                    ON sop_documents (user_id, updated_at, id)
+                ''')
+                # Revision history: zlib-compressed snapshots of content and analysis, one per
+                # distinct save (content_hash skips saves that change neither)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sop_revisions (
+                        sop_id TEXT NOT NULL,
+                        revision INTEGER NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        content_hash TEXT NOT NULL,
+                        content_size INTEGER NOT NULL,
+                        content BLOB NOT NULL,
+                        analysis BLOB,
+                        PRIMARY KEY (sop_id, revision)
+                    ) WITHOUT ROWID
+                ''')
+                # Near-duplicate detection: each SOP's MinHash signature and its LSH band
+                # buckets, so a query looks up 32 buckets instead of scanning the archive
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sop_signatures (
+                        sop_id TEXT PRIMARY KEY,
+                        signature BLOB NOT NULL
+                    ) WITHOUT ROWID
+                ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sop_lsh_bands (
+                        band INTEGER NOT NULL,
+                        bucket INTEGER NOT NULL,
+                        sop_id TEXT NOT NULL,
+                        PRIMARY KEY (band, bucket, sop_id)
+                    ) WITHOUT ROWID
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_sop_lsh_bands_sop ON sop_lsh_bands (sop_id)')
+                # Ids saved, in commit order, so other workers can evict just those from their caches
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS sop_changes (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        sop_id TEXT NOT NULL
+                    )
+                ''')
+                self._sop_changes_seen = cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM sop_changes').fetchone()[0]
                 logger.info("SOP database initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize database: {str(e)}")
+        
+        # Full-text index over the searchable columns, kept in sync by triggers.
+        # External content: the text itself lives only in sop_documents, read through
+        # a view keyed on sop_search_ids.doc_id. That is an INTEGER PRIMARY KEY, so
+        # unlike the implicit rowid of the TEXT-keyed documents table it survives VACUUM.
+        try:
+            with self.db_pool.transaction() as conn:
+                existing = conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE name = 'sop_documents_fts'"
+                ).fetchone()
+                if existing and "content_rowid='rowid'" in existing[0]:
+                    # Indexes built on the implicit rowid are dropped and rebuilt below
+                    for trigger in ('insert', 'delete', 'update'):
+                        conn.execute(f'DROP TRIGGER IF EXISTS sop_documents_fts_{trigger}')
+                    conn.execute('DROP TABLE sop_documents_fts')
+                    existing = None
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS sop_search_ids (
+                        doc_id INTEGER PRIMARY KEY,
+                        sop_id TEXT NOT NULL UNIQUE
+                    )
+                ''')
+                conn.execute('''
+                    CREATE VIEW IF NOT EXISTS sop_documents_search AS
+                    SELECT m.doc_id, d.title, d.content, d.target_program, d.target_university
+                    FROM sop_search_ids m JOIN sop_documents d ON d.id = m.sop_id
+                ''')
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS sop_documents_fts USING fts5(
+                        title, content, target_program, target_university,
+                        content='sop_documents_search', content_rowid='doc_id', tokenize='porter unicode61'
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS sop_documents_fts_insert AFTER INSERT ON sop_documents BEGIN
+                        INSERT OR IGNORE INTO sop_search_ids (sop_id) VALUES (new.id);
+                        INSERT INTO sop_documents_fts (rowid, title, content, target_program, target_university)
+                        SELECT doc_id, new.title, new.content, new.target_program, new.target_university
+                        FROM sop_search_ids WHERE sop_id = new.id;
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS sop_documents_fts_delete AFTER DELETE ON sop_documents BEGIN
+                        INSERT INTO sop_documents_fts
+                        (sop_documents_fts, rowid, title, content, target_program, target_university)
+                        SELECT 'delete', doc_id, old.title, old.content, old.target_program, old.target_university
+                        FROM sop_search_ids WHERE sop_id = old.id;
+                        DELETE FROM sop_search_ids WHERE sop_id = old.id;
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS sop_documents_fts_update
+                    AFTER UPDATE OF title, content, target_program, target_university ON sop_documents BEGIN
+                        INSERT INTO sop_documents_fts
+                        (sop_documents_fts, rowid, title, content, target_program, target_university)
+                        SELECT 'delete', doc_id, old.title, old.content, old.target_program, old.target_university
+                        FROM sop_search_ids WHERE sop_id = old.id;
+                        INSERT INTO sop_documents_fts (rowid, title, content, target_program, target_university)
+                        SELECT doc_id, new.title, new.content, new.target_program, new.target_university
+                        FROM sop_search_ids WHERE sop_id = new.id;
+                    END
+                ''')
+                if not existing:
+                    # Index documents stored before search existed (or before the re-keying)
+                    conn.execute('INSERT OR IGNORE INTO sop_search_ids (sop_id) SELECT id FROM sop_documents')
+                    conn.execute("INSERT INTO sop_documents_fts (sop_documents_fts) VALUES ('rebuild')")
+            self.search_enabled = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SOP full-text search unavailable: {str(e)}")
     
     @contextmanager
     def get_db_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            yield conn
-        finally:
-            conn.close()
+        """This thread's pooled connection (autocommit; use db_pool.transaction() for writes)"""
+        yield self.db_pool.connection()
+    
+    def _check_sop_cache(self):
+        """Evict the documents other workers saved since this process last looked.
+
+        Saves append their ids to sop_changes; the process remembers the last
+        sequence number it applied and evicts only the ids after it (everything,
+        if the log was pruned past that point). The log is only read when this
+        thread's data_version shows another connection has committed since its
+        previous look.
+        """
+        conn = self.db_pool.connection()
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if getattr(self._db_local, 'seen', None) == (conn, version):
+            return
+        
+        with self._sop_cache_lock:
+            changes = conn.execute(
+                'SELECT seq, sop_id FROM sop_changes WHERE seq > ? ORDER BY seq', (self._sop_changes_seen,)
+            ).fetchall()
+            if changes:
+                self._sop_cache_generation += 1
+                if changes[0][0] != self._sop_changes_seen + 1:
+                    self.sop_cache.clear()
+                else:
+                    for _, sop_id in changes:
+                        self.sop_cache.delete(sop_id)
+                self._sop_changes_seen = changes[-1][0]
+        self._db_local.seen = (conn, version)
+    
+    def _log_sop_changes(self, conn, sop_ids: List[str]):
+        """Append saved ids to sop_changes, keeping the newest _SOP_CHANGE_LOG_SIZE
+        (runs inside the saving transaction)"""
+        conn.executemany('INSERT INTO sop_changes (sop_id) VALUES (?)', [(sop_id,) for sop_id in sop_ids])
+        conn.execute(
+            'DELETE FROM sop_changes WHERE seq <= (SELECT MAX(seq) FROM sop_changes) - ?',
+            (self._SOP_CHANGE_LOG_SIZE,)
+        )
+    
+    def _invalidate_sop_cache(self, sop_ids: Iterable[str]):
+        with self._sop_cache_lock:
+            self._sop_cache_generation += 1
+            for sop_id in sop_ids:
+                self.sop_cache.delete(sop_id)
     
+    @coalesce('sop.analyze')
     def analyze_sop(self, sop_text: str, options: Dict[str, Any] = {}) -> Dict[str, Any]:
         """Analyze Statement of Purpose for quality and improvement areas"""
         start_time = time.time()
@@ -83,16 +313,27 @@ class SOPService:
             ai_analysis = None
             if self.model:
                 try:
-                    ai_analysis = self._ai_analysis(sop_text, options)
+                    with fresh_generation(options.get('fresh', False)):
+                        ai_analysis = self._ai_analysis(sop_text, options)
                 except Exception as e:
                     logger.warning(f"AI analysis failed: {str(e)}")
             
+            # Near-copies of stored SOPs (templates, other applicants' statements)
+            similar = None
+            if self.config.SOP_SIMILARITY_ENABLED:
+                try:
+                    similar = self.find_similar_sops(
+                        sop_text, options.get('sop_id'), options.get('user_id'), bool(options.get('include_own_sops'))
+                    )
+                except Exception as e:
+                    logger.warning(f"SOP similarity lookup failed: {str(e)}")
+            
             # Combine analyses
             analysis = SOPAnalysis(
                 word_count=basic_analysis['word_count'],
                 paragraph_count=basic_analysis['paragraph_count'],
                 readability_score=basic_analysis.get('readability_score'),
-                sentiment_score=ai_analysis.get('sentiment_score') if ai_analysis else None,
+                sentiment_score=ai_analysis.get('sentiment_score') if ai_analysis else basic_analysis['sentiment_score'],
                 key_themes=ai_analysis.get('key_themes', []) if ai_analysis else [],
                 strengths=ai_analysis.get('strengths', []) if ai_analysis else basic_analysis.get('strengths', []),
                 weaknesses=ai_analysis.get('weaknesses', []) if ai_analysis else basic_analysis.get('weaknesses', []),
@@ -102,7 +343,8 @@ class SOPService:
                 personal_narrative_score=ai_analysis.get('personal_narrative_score') if ai_analysis else None,
                 research_alignment_score=ai_analysis.get('research_alignment_score') if ai_analysis else None,
                 career_clarity_score=ai_analysis.get('career_clarity_score') if ai_analysis else None,
-                writing_quality_score=ai_analysis.get('writing_quality_score') if ai_analysis else None
+                writing_quality_score=ai_analysis.get('writing_quality_score') if ai_analysis else None,
+                text_metrics=basic_analysis['text_metrics']
             )
             
             processing_time = time.time() - start_time
@@ -112,8 +354,18 @@ class SOPService:
                 "timestamp": datetime.utcnow().isoformat(),
                 "analysis": analysis.dict(),
                 "processing_time": processing_time,
-                "ai_enhanced": ai_analysis is not None
+                "ai_enhanced": ai_analysis is not None,
+                "approximate": bool(ai_analysis and ai_analysis.get('approximate')),
+                "partial": deadline_exceeded(),
+                # Paragraph-level (incremental) analysis sends every paragraph, never a cut text
+                "truncated": bool(ai_analysis and not ai_analysis.get('incremental')) and self._input_truncated(sop_text)
             }
+            if result["approximate"]:
+                result["similarity"] = ai_analysis.get('similarity')
+            if ai_analysis and ai_analysis.get('incremental'):
+                result["incremental"] = ai_analysis['incremental']
+            if similar is not None:
+                result["similar_documents"] = similar
             
             logger.info(f"Completed SOP analysis {request_id} in {processing_time:.2f}s")
             return result
@@ -122,6 +374,7 @@ class SOPService:
             logger.error(f"SOP analysis failed: {str(e)}")
             raise Exception(f"SOP analysis failed: {str(e)}")
     
+    @coalesce('sop.enhance')
     def enhance_sop(self, sop_text: str, context: Dict[str, Any] = {}) -> Dict[str, Any]:
         """Enhance SOP with AI suggestions"""
         start_time = time.time()
@@ -134,7 +387,8 @@ class SOPService:
         
         try:
             # Generate enhancement suggestions
-            enhancement = self._generate_enhancement(sop_text, context)
+            with fresh_generation(context.get('fresh', False)):
+                enhancement = self._generate_enhancement(sop_text, context)
             
             processing_time = time.time() - start_time
             
@@ -142,7 +396,9 @@ class SOPService:
                 "request_id": request_id,
                 "timestamp": datetime.utcnow().isoformat(),
                 "enhancement": enhancement.dict(),
-                "processing_time": processing_time
+                "processing_time": processing_time,
+                "partial": deadline_exceeded(),
+                "truncated": self._input_truncated(sop_text)
             }
             
             logger.info(f"Completed SOP enhancement {request_id} in {processing_time:.2f}s")
@@ -152,57 +408,172 @@ class SOPService:
             logger.error(f"SOP enhancement failed: {str(e)}")
             raise Exception(f"SOP enhancement failed: {str(e)}")
     
+    def enhance_sop_stream(self, sop_text: str, context: Dict[str, Any] = {}) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Enhance SOP, yielding each enhanced section as soon as Gemini has written it.
+        
+        Yields ("section", {"section", "text"}) events, then one ("enhancement", result)
+        event with the validated enhancement in the shape enhance_sop returns; the
+        final event is authoritative. In "sections" mode each section is emitted
+        when its own call finishes; SOPs enhanced in several chunks emit their
+        merged sections once all chunks are done.
+        """
+        start_time = time.time()
+        request_id = str(uuid.uuid4())
+        
+        logger.info(f"Starting streamed SOP enhancement {request_id}")
+        
+        if not self.model:
+            raise Exception("Gemini AI client not available for enhancement")
+        
+        with fresh_generation(context.get('fresh', False)):
+            jobs = self._section_jobs(sop_text, context)
+            chunks = prepare_chunks(sop_text, self.config.LLM_INPUT_TOKEN_BUDGET, self.config.LLM_MAX_CHUNKS)
+            if jobs:
+                # Sections are relayed in the order their calls finish
+                sections, enhance_section = jobs
+                results: List[Optional[Dict[str, Any]]] = [None] * len(sections)
+                for index, data in iter_chunks(enhance_section, sections):
+                    results[index] = data
+                    for section, text in (data or {}).get('enhanced_sections', {}).items():
+                        yield "section", {"section": section, "text": text}
+                enhancement = self._merge_enhancements(sop_text, [data for data in results if data])
+            elif len(chunks) > 1:
+                enhancement = self._generate_enhancement(sop_text, context)
+                for section, text in enhancement.enhanced_sections.items():
+                    yield "section", {"section": section, "text": text}
+            else:
+                data = yield from self._stream_enhancement(chunks[0], context)
+                enhancement = self._merge_enhancements(sop_text, [data] if data else [])
+        
+        processing_time = time.time() - start_time
+        logger.info(f"Completed streamed SOP enhancement {request_id} in {processing_time:.2f}s")
+        yield "enhancement", {
+            "request_id": request_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "enhancement": enhancement.dict(),
+            "processing_time": processing_time,
+            "partial": deadline_exceeded(),
+            "truncated": self._input_truncated(sop_text)
+        }
+    
+    def _input_truncated(self, sop_text: str) -> bool:
+        """True when the SOP is longer than LLM_MAX_CHUNKS budget-sized chunks, so
+        chunked analysis and enhancement only saw its beginning"""
+        return exceeds_chunk_limit(sop_text, self.config.LLM_INPUT_TOKEN_BUDGET, self.config.LLM_MAX_CHUNKS)
+    
+    # Single-statement upsert: creation and update can't race between workers.
+    # user_id and created_at are kept from the first save.
+    _UPSERT_SQL = '''
+        INSERT INTO sop_documents
+        (id, user_id, title, content, target_program, target_university, created_at, updated_at, analysis_data)
+        VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, CURRENT_TIMESTAMP), ?)
+        ON CONFLICT(id) DO UPDATE SET
+            title = excluded.title,
+            content = excluded.content,
+            target_program = excluded.target_program,
+            target_university = excluded.target_university,
+            updated_at = excluded.updated_at,
+            analysis_data = excluded.analysis_data
+    '''
+    _REVISION_SQL = '''
+        INSERT INTO sop_revisions (sop_id, revision, created_at, content_hash, content_size, content, analysis)
+        SELECT :sop_id, COALESCE(MAX(revision), 0) + 1, COALESCE(:created_at, CURRENT_TIMESTAMP),
+               :content_hash, :content_size, :content, :analysis
+        FROM sop_revisions WHERE sop_id = :sop_id
+        HAVING COALESCE((
+            SELECT content_hash FROM sop_revisions WHERE sop_id = :sop_id ORDER BY revision DESC LIMIT 1
+        ), '') != :content_hash
+    '''
+    _PRUNE_REVISIONS_SQL = '''
+        DELETE FROM sop_revisions WHERE sop_id = :sop_id AND revision <= (
+            SELECT MAX(revision) FROM sop_revisions WHERE sop_id = :sop_id
+        ) - :keep
+    '''
+    _SOP_CHANGE_LOG_SIZE = 10000
+    _SOP_COLUMNS = (
+        'id, user_id, title, content, target_program, target_university, created_at, updated_at, analysis_data'
+    )
+    
+    def _sop_row(self, sop_data: Dict[str, Any], keep_timestamps: bool = False) -> Tuple:
+        """Parameters for _UPSERT_SQL; imports keep the archive's timestamps"""
+        return (
+            sop_data.get('id') or str(uuid.uuid4()),
+            sop_data.get('user_id'),
+            sop_data.get('title', ''),
+            sop_data.get('content', ''),
+            sop_data.get('target_program'),
+            sop_data.get('target_university'),
+            sop_data.get('created_at') if keep_timestamps else None,
+            sop_data.get('updated_at') if keep_timestamps else None,
+            self._compress_json(sop_data.get('analysis', {}))
+        )
+    
+    @staticmethod
+    def _compress_json(value: Any) -> bytes:
+        return zlib.compress(json.dumps(value).encode('utf-8'), 6)
+    
+    @staticmethod
+    def _decompress_json(blob: Any) -> Any:
+        """Stored analysis: a zlib blob, or JSON text in rows saved before compression"""
+        if not blob:
+            return {}
+        if isinstance(blob, bytes):
+            blob = zlib.decompress(blob)
+        return json.loads(blob)
+    
+    def _record_revisions(self, conn, rows: List[Tuple]):
+        """Append a compressed snapshot of each saved row to sop_revisions, keeping the
+        newest SOP_MAX_REVISIONS per SOP (runs inside the saving transaction)"""
+        revisions = []
+        for row in rows:
+            content = row[3].encode('utf-8')
+            revisions.append({
+                "sop_id": row[0],
+                "created_at": row[7],
+                "content_hash": hashlib.sha256(content + b'\0' + row[8]).hexdigest()[:32],
+                "content_size": len(content),
+                "content": zlib.compress(content, 6),
+                "analysis": row[8]
+            })
+        conn.executemany(self._REVISION_SQL, revisions)
+        conn.executemany(self._PRUNE_REVISIONS_SQL, [
+            {"sop_id": sop_id, "keep": self.config.SOP_MAX_REVISIONS} for sop_id in {row[0] for row in rows}
+        ])
+    
+    @staticmethod
+    def _row_to_sop(row: Tuple) -> Dict[str, Any]:
+        return {
+            "id": row[0],
+            "user_id": row[1],
+            "title": row[2],
+            "content": row[3],
+            "target_program": row[4],
+            "target_university": row[5],
+            "created_at": row[6],
+            "updated_at": row[7],
+            "analysis": SOPService._decompress_json(row[8])
+        }
+    
     def save_sop(self, sop_data: Dict[str, Any]) -> Dict[str, Any]:
         """Save SOP to database"""
         try:
-            sop_id = sop_data.get('id') or str(uuid.uuid4())
+            row = self._sop_row(sop_data)
+            sop_id = row[0]
+            signatures = self._signature_rows([row])
             
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Check if SOP exists
-                cursor.execute('SELECT id FROM sop_documents WHERE id = ?', (sop_id,))
-                exists = cursor.fetchone()
-                
-                if exists:
-                    # Update existing SOP
-                    cursor.execute('''
-                        UPDATE sop_documents 
-                        SET title = ?, content = ?, target_program = ?, target_university = ?,
-                            updated_at = CURRENT_TIMESTAMP, analysis_data = ?
-                        WHERE id = ?
-                    ''', (
-                        sop_data.get('title', ''),
-                        sop_data.get('content', ''),
-                        sop_data.get('target_program'),
-                        sop_data.get('target_university'),
-                        json.dumps(sop_data.get('analysis', {})),
-                        sop_id
-                    ))
-                    action = "updated"
-                else:
-                    # Insert new SOP
-                    cursor.execute('''
-                        INSERT INTO sop_documents 
-                        (id, user_id, title, content, target_program, target_university, analysis_data)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        sop_id,
-                        sop_data.get('user_id'),
-                        sop_data.get('title', ''),
-                        sop_data.get('content', ''),
-                        sop_data.get('target_program'),
-                        sop_data.get('target_university'),
-                        json.dumps(sop_data.get('analysis', {}))
-                    ))
-                    action = "created"
-                
-                conn.commit()
+            with self.db_pool.transaction() as conn:
+                # Checked under the write lock, so no other writer can create the row in between
+                created = conn.execute('SELECT 1 FROM sop_documents WHERE id = ?', (sop_id,)).fetchone() is None
+                conn.execute(self._UPSERT_SQL, row)
+                self._record_revisions(conn, [row])
+                self._index_signatures(conn, signatures)
+                self._log_sop_changes(conn, [sop_id])
+            self._invalidate_sop_cache([sop_id])
             
             return {
                 "success": True,
                 "sop_id": sop_id,
-                "action": action,
+                "action": "created" if created else "updated",
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -210,47 +581,360 @@ class SOPService:
             logger.error(f"Failed to save SOP: {str(e)}")
             raise Exception(f"Failed to save SOP: {str(e)}")
     
-    def load_sop(self, sop_id: str) -> Optional[Dict[str, Any]]:
-        """Load SOP from database"""
+    def save_sops(self, sops: List[Dict[str, Any]], keep_timestamps: bool = False) -> Dict[str, Any]:
+        """Save many SOPs in one transaction (all or nothing)"""
         try:
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT id, user_id, title, content, target_program, target_university,
-                           created_at, updated_at, analysis_data
-                    FROM sop_documents WHERE id = ?
-                ''', (sop_id,))
-                
-                row = cursor.fetchone()
-                if not row:
-                    return None
-                
-                sop_doc = {
+            rows = [self._sop_row(sop_data, keep_timestamps) for sop_data in sops]
+            signatures = self._signature_rows(rows)
+            with self.db_pool.transaction() as conn:
+                conn.executemany(self._UPSERT_SQL, rows)
+                self._record_revisions(conn, rows)
+                self._index_signatures(conn, signatures)
+                self._log_sop_changes(conn, [row[0] for row in rows])
+            self._invalidate_sop_cache(row[0] for row in rows)
+            
+            return {
+                "success": True,
+                "saved": len(rows),
+                "sop_ids": [row[0] for row in rows],
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to save {len(sops)} SOPs: {str(e)}")
+            raise Exception(f"Failed to save SOPs: {str(e)}")
+    
+    def import_sops(self, lines: Iterable[Any]) -> Dict[str, Any]:
+        """Import an NDJSON stream of SOP documents (one JSON object per line), as
+        exported by export_sops. Lines are saved in transactions of
+        SOP_IMPORT_BATCH_SIZE, so memory stays flat however long the stream is;
+        malformed lines are skipped and reported by line number."""
+        batch: List[Dict[str, Any]] = []
+        imported = 0
+        errors: List[Dict[str, Any]] = []
+        
+        def flush():
+            nonlocal imported
+            if batch:
+                imported += self.save_sops(batch, keep_timestamps=True)["saved"]
+                batch.clear()
+        
+        for number, line in enumerate(lines, 1):
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if not line.strip():
+                continue
+            try:
+                sop_data = json.loads(line)
+                if not isinstance(sop_data, dict) or not sop_data.get('content'):
+                    raise ValueError("expected an object with content")
+            except ValueError as e:
+                errors.append({"line": number, "error": str(e)})
+                continue
+            batch.append(sop_data)
+            if len(batch) >= self.config.SOP_IMPORT_BATCH_SIZE:
+                flush()
+        flush()
+        
+        return {
+            "success": True,
+            "imported": imported,
+            "failed": len(errors),
+            "errors": errors[:100],
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    def export_sops(self, user_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield stored SOPs in id order, reading SOP_IMPORT_BATCH_SIZE rows per
+        query so no read transaction stays open while the caller streams them"""
+        conn = self.db_pool.connection()
+        last_id = ''
+        while True:
+            rows = conn.execute(
+                f'SELECT {self._SOP_COLUMNS} FROM sop_documents '
+                'WHERE id > ? AND (? IS NULL OR user_id = ?) ORDER BY id LIMIT ?',
+                (last_id, user_id, user_id, self.config.SOP_IMPORT_BATCH_SIZE)
+            ).fetchall()
+            for row in rows:
+                yield self._row_to_sop(row)
+            if len(rows) < self.config.SOP_IMPORT_BATCH_SIZE:
+                return
+            last_id = rows[-1][0]
+    
+    @staticmethod
+    def _encode_cursor(updated_at: str, sop_id: str) -> str:
+        return base64.urlsafe_b64encode(json.dumps([updated_at, sop_id]).encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, str]:
+        try:
+            updated_at, sop_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            return str(updated_at), str(sop_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
+    def list_sops(self, user_id: str, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """A page of a user's SOPs, most recently updated first, without content or analysis.
+        
+        Keyset pagination: `cursor` is the (updated_at, id) of the last row of the
+        previous page, so each page is one range scan of idx_sop_documents_user_updated
+        however deep it is. Raises ValueError for a malformed cursor.
+        """
+        query = '''
+            SELECT id, title, target_program, target_university, created_at, updated_at
+            FROM sop_documents WHERE user_id = ?
+        '''
+        params: List[Any] = [user_id]
+        if cursor:
+            query += ' AND (updated_at, id) < (?, ?)'
+            params.extend(self._decode_cursor(cursor))
+        query += ' ORDER BY updated_at DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+        
+        with self.get_db_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        page = rows[:limit]
+        return {
+            "sops": [
+                {
+                    "id": row[0],
+                    "title": row[1],
+                    "target_program": row[2],
+                    "target_university": row[3],
+                    "created_at": row[4],
+                    "updated_at": row[5]
+                }
+                for row in page
+            ],
+            "next_cursor": self._encode_cursor(page[-1][5], page[-1][0]) if len(rows) > limit else None
+        }
+    
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        """FTS5 query matching every word and "quoted phrase" of free text, with
+        query syntax characters neutralised by quoting each term"""
+        terms = []
+        for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+            term = (phrase or word).replace('"', ' ').strip()
+            if term:
+                terms.append(f'"{term}"')
+        return ' '.join(terms)
+    
+    def search_sops(self, query: str, user_id: Optional[str] = None, target_program: Optional[str] = None,
+                    limit: int = 20) -> Dict[str, Any]:
+        """Rank stored SOPs against a free-text query (BM25, title and program matches
+        weighted above body text), with a highlighted snippet of the best passage"""
+        if not self.search_enabled:
+            raise RuntimeError("Full-text search is not available (SQLite built without FTS5)")
+        match = self._fts_query(query)
+        if not match:
+            return {"query": query, "results": []}
+        
+        with self.get_db_connection() as conn:
+            rows = conn.execute('''
+                SELECT d.id, d.user_id, d.title, d.target_program, d.target_university, d.updated_at,
+                       snippet(sop_documents_fts, 1, '<mark>', '</mark>', '…', 24),
+                       bm25(sop_documents_fts, 4.0, 1.0, 2.0, 2.0) AS rank
+                FROM sop_documents_fts
+                JOIN sop_search_ids m ON m.doc_id = sop_documents_fts.rowid
+                JOIN sop_documents d ON d.id = m.sop_id
+                WHERE sop_documents_fts MATCH ?
+                  AND (? IS NULL OR d.user_id = ?)
+                  AND (? IS NULL OR d.target_program = ? COLLATE NOCASE)
+                ORDER BY rank LIMIT ?
+            ''', (match, user_id, user_id, target_program, target_program, limit)).fetchall()
+        
+        return {
+            "query": query,
+            "results": [
+                {
                     "id": row[0],
                     "user_id": row[1],
                     "title": row[2],
-                    "content": row[3],
-                    "target_program": row[4],
-                    "target_university": row[5],
-                    "created_at": row[6],
-                    "updated_at": row[7],
-                    "analysis": json.loads(row[8]) if row[8] else {}
+                    "target_program": row[3],
+                    "target_university": row[4],
+                    "updated_at": row[5],
+                    "snippet": row[6],
+                    "score": round(-row[7], 4)
                 }
-                
-                return sop_doc
+                for row in rows
+            ]
+        }
+    
+    def _minhash(self, text: str) -> Optional[np.ndarray]:
+        signature = self.similarity_hasher.signature(text)
+        # A text without words hashes to all-max; it would match every other empty text
+        return None if (signature == _EMPTY_SIGNATURE_VALUE).all() else signature
+    
+    def _signature_rows(self, rows: List[Tuple]) -> List[Tuple[str, Optional[bytes], List[int]]]:
+        """(sop_id, signature, band buckets) for saved rows, computed before the write
+        transaction starts; SOPs too short to shingle get no signature"""
+        prepared = []
+        for row in rows:
+            signature = self._minhash(row[3])
+            if signature is None:
+                prepared.append((row[0], None, []))
+                continue
+            prepared.append((
+                row[0],
+                signature.astype(np.uint32).tobytes(),
+                [int.from_bytes(bucket, 'little', signed=True) for bucket in self._lsh.band_hashes(signature)]
+            ))
+        return prepared
+    
+    def _index_signatures(self, conn, prepared: List[Tuple[str, Optional[bytes], List[int]]]):
+        """Replace the similarity index entries of saved SOPs (inside the saving transaction)"""
+        conn.executemany('DELETE FROM sop_lsh_bands WHERE sop_id = ?', [(sop_id,) for sop_id, _, _ in prepared])
+        conn.executemany('DELETE FROM sop_signatures WHERE sop_id = ?', [(sop_id,) for sop_id, _, _ in prepared])
+        indexed = [entry for entry in prepared if entry[1] is not None]
+        conn.executemany('INSERT INTO sop_signatures (sop_id, signature) VALUES (?, ?)',
+                         [(sop_id, signature) for sop_id, signature, _ in indexed])
+        conn.executemany('INSERT OR IGNORE INTO sop_lsh_bands (band, bucket, sop_id) VALUES (?, ?, ?)', [
+            (band, bucket, sop_id) for sop_id, _, buckets in indexed for band, bucket in enumerate(buckets)
+        ])
+    
+    def _backfill_similarity_index(self):
+        """Index SOPs stored before the similarity index existed, a batch at a time"""
+        last_id = ''
+        try:
+            while True:
+                with self.get_db_connection() as conn:
+                    rows = conn.execute(f'''
+                        SELECT {self._SOP_COLUMNS} FROM sop_documents d
+                        WHERE id > ? AND NOT EXISTS (SELECT 1 FROM sop_signatures s WHERE s.sop_id = d.id)
+                        ORDER BY id LIMIT ?
+                    ''', (last_id, self.config.SOP_IMPORT_BATCH_SIZE)).fetchall()
+                prepared = [entry for entry in self._signature_rows(rows) if entry[1] is not None]
+                if prepared:
+                    with self.db_pool.transaction() as conn:
+                        self._index_signatures(conn, prepared)
+                if len(rows) < self.config.SOP_IMPORT_BATCH_SIZE:
+                    return
+                last_id = rows[-1][0]
+        except Exception as e:
+            logger.warning(f"SOP similarity backfill stopped: {str(e)}")
+    
+    def find_similar_sops(self, sop_text: str, exclude_id: Optional[str] = None,
+                          user_id: Optional[str] = None, include_own: bool = False) -> List[Dict[str, Any]]:
+        """Stored SOPs whose estimated Jaccard similarity (3-word shingles) to sop_text is
+        at least SOP_SIMILARITY_THRESHOLD, most similar first.
+        
+        Candidates are the SOPs sharing an LSH band bucket with the text, ranked by how
+        many they share, so the cost depends on the number of near matches rather than
+        the size of the archive. The document itself (`exclude_id`) and, unless
+        `include_own`, the other SOPs of its owner (`user_id`, or the stored owner of
+        `exclude_id`) are left out, since re-analyzing a saved draft is not copying;
+        with `include_own` they are kept and marked `same_user`.
+        """
+        signature = self._minhash(sop_text)
+        if signature is None:
+            return []
+        buckets = [int.from_bytes(bucket, 'little', signed=True) for bucket in self._lsh.band_hashes(signature)]
+        
+        with self.get_db_connection() as conn:
+            if user_id is None and exclude_id:
+                owner_row = conn.execute('SELECT user_id FROM sop_documents WHERE id = ?', (exclude_id,)).fetchone()
+                user_id = owner_row[0] if owner_row else None
+            excluded_owner = None if include_own else user_id
+            candidates = conn.execute(f'''
+                WITH query (band, bucket) AS (VALUES {', '.join('(?, ?)' for _ in buckets)})
+                SELECT b.sop_id FROM query JOIN sop_lsh_bands b ON b.band = query.band AND b.bucket = query.bucket
+                JOIN sop_documents d ON d.id = b.sop_id
+                WHERE b.sop_id != ? AND (? IS NULL OR d.user_id IS NOT ?)
+                GROUP BY b.sop_id ORDER BY COUNT(*) DESC LIMIT ?
+            ''', [value for pair in enumerate(buckets) for value in pair]
+                + [exclude_id or '', excluded_owner, excluded_owner, 200]).fetchall()
+            if not candidates:
+                return []
+            rows = conn.execute(f'''
+                SELECT s.sop_id, s.signature, d.user_id
+                FROM sop_signatures s JOIN sop_documents d ON d.id = s.sop_id
+                WHERE s.sop_id IN ({', '.join('?' for _ in candidates)})
+            ''', [row[0] for row in candidates]).fetchall()
+        
+        matches = []
+        for sop_id, stored, owner in rows:
+            similarity = MinHasher.similarity(signature, np.frombuffer(stored, dtype=np.uint32).astype(np.uint64))
+            if similarity >= self.config.SOP_SIMILARITY_THRESHOLD:
+                matches.append({
+                    "sop_id": sop_id,
+                    "similarity": round(similarity, 3),
+                    "same_user": user_id is not None and owner == user_id
+                })
+        matches.sort(key=lambda match: match["similarity"], reverse=True)
+        return matches[:self.config.SOP_SIMILARITY_MAX_RESULTS]
+    
+    def list_revisions(self, sop_id: str) -> List[Dict[str, Any]]:
+        """Revision metadata for an SOP, newest first; nothing is decompressed"""
+        with self.get_db_connection() as conn:
+            rows = conn.execute('''
+                SELECT revision, created_at, content_size, length(content) + COALESCE(length(analysis), 0)
+                FROM sop_revisions WHERE sop_id = ? ORDER BY revision DESC
+            ''', (sop_id,)).fetchall()
+        return [
+            {"revision": row[0], "created_at": row[1], "content_size": row[2], "stored_size": row[3]}
+            for row in rows
+        ]
+    
+    def get_revision(self, sop_id: str, revision: int) -> Optional[Dict[str, Any]]:
+        """One revision's content and analysis, decompressed"""
+        with self.get_db_connection() as conn:
+            row = conn.execute('''
+                SELECT revision, created_at, content, analysis
+                FROM sop_revisions WHERE sop_id = ? AND revision = ?
+            ''', (sop_id, revision)).fetchone()
+        if not row:
+            return None
+        return {
+            "sop_id": sop_id,
+            "revision": row[0],
+            "created_at": row[1],
+            "content": zlib.decompress(row[2]).decode('utf-8'),
+            "analysis": self._decompress_json(row[3])
+        }
+    
+    def load_sop(self, sop_id: str) -> Optional[Dict[str, Any]]:
+        """Load SOP from database (read-through cache, invalidated on save)"""
+        try:
+            self._check_sop_cache()
+            cached = self.sop_cache.get(sop_id)
+            if cached is not None:
+                return copy.deepcopy(cached)
+            generation = self._sop_cache_generation
+            
+            with self.get_db_connection() as conn:
+                row = conn.execute(
+                    f'SELECT {self._SOP_COLUMNS} FROM sop_documents WHERE id = ?', (sop_id,)
+                ).fetchone()
+                if not row:
+                    return None
+                sop_doc = self._row_to_sop(row)
+            
+            # A save that landed while we were reading bumps the generation; don't cache the old row
+            with self._sop_cache_lock:
+                if generation == self._sop_cache_generation:
+                    self.sop_cache.set(sop_id, copy.deepcopy(sop_doc))
+            return sop_doc
                 
         except Exception as e:
             logger.error(f"Failed to load SOP {sop_id}: {str(e)}")
             raise Exception(f"Failed to load SOP: {str(e)}")
     
     def _basic_text_analysis(self, sop_text: str) -> Dict[str, Any]:
-        """Perform basic text analysis without AI"""
+        """Perform basic text analysis without AI (local linguistic metrics, a few milliseconds)"""
         words = sop_text.split()
         paragraphs = sop_text.split('\n\n')
+        metrics = analyze_text(sop_text)
         
         analysis = {
             "word_count": len(words),
             "paragraph_count": len([p for p in paragraphs if p.strip()]),
+            "readability_score": (
+                min(max(metrics["readability"]["flesch_reading_ease"], 0.0), 100.0) if metrics["readability"] else None
+            ),
+            "sentiment_score": metrics["sentiment"],
+            "text_metrics": metrics,
             "strengths": [],
             "weaknesses": [],
             "suggestions": []
@@ -273,25 +957,276 @@ class SOPService:
             analysis["weaknesses"].append("Too many paragraphs")
             analysis["suggestions"].append("Consolidate into 4-5 focused paragraphs")
         
-        # Check for common keywords
-        important_keywords = ['research', 'experience', 'goal', 'passion', 'skill', 'project']
-        found_keywords = [word for word in important_keywords if word.lower() in sop_text.lower()]
+        if not metrics["sentence_count"]:
+            return analysis
         
-        if len(found_keywords) >= 4:
+        # Topic coverage
+        coverage = metrics["keyword_coverage"]
+        if len(coverage["covered"]) >= 5:
             analysis["strengths"].append("Contains relevant academic keywords")
         else:
             analysis["weaknesses"].append("Lacks important academic keywords")
-            analysis["suggestions"].append("Include more keywords about research, goals, and experience")
+            missing = ', '.join(topic.replace('_', ' ') for topic in coverage["missing"][:3])
+            analysis["suggestions"].append(f"Include more about {missing}")
+        
+        # Readability and style
+        grade = metrics["readability"]["flesch_kincaid_grade"]
+        if grade > 18:
+            analysis["weaknesses"].append(f"Dense prose (grade level {grade})")
+            analysis["suggestions"].append("Break up long sentences and prefer plain words")
+        elif grade >= 10:
+            analysis["strengths"].append(f"Readable academic register (grade level {grade})")
+        
+        if metrics["sentence_length"]["long_sentence_ratio"] > 0.25:
+            analysis["weaknesses"].append("Many sentences are over 30 words")
+            analysis["suggestions"].append("Split long sentences so each makes one point")
+        
+        if metrics["passive_voice_ratio"] > 0.25:
+            analysis["weaknesses"].append("Frequent passive voice")
+            analysis["suggestions"].append("Use active voice to make your role in each achievement clear")
+        
+        repetition = metrics["repetition"]
+        if repetition["overused_words"]:
+            overused = ', '.join(f'"{item["word"]}"' for item in repetition["overused_words"][:3])
+            analysis["suggestions"].append(f"Vary your wording; {overused} recur often")
+        if repetition["repeated_openers"]:
+            analysis["suggestions"].append(
+                f"Vary sentence openings (many start with \"{repetition['repeated_openers'][0].capitalize()}\")"
+            )
         
         return analysis
     
     def _ai_analysis(self, sop_text: str, options: Dict[str, Any]) -> Dict[str, Any]:
-        """Perform AI-powered analysis using Gemini"""
+        """Perform AI-powered analysis using Gemini.
+        
+        A near-duplicate of a recently analyzed SOP (same target program and
+        university) reuses that analysis, flagged approximate, while the exact
+        analysis is refreshed in the background. Incremental analysis (for
+        editor autosaves) only sends new or edited paragraphs to Gemini.
+        """
+        if options.get('incremental', self.config.SOP_ANALYSIS_MODE == 'incremental'):
+            return self._incremental_analysis(sop_text, options) or self._fallback_analysis(sop_text)
+        
+        if not self.near_duplicates:
+            return self._model_analysis(sop_text, options) or self._fallback_analysis(sop_text)
+        
+        namespace = f"sop.analyze|{self.model_name}|{options.get('target_program')}|{options.get('target_university')}"
+        if not is_fresh_generation():
+            cached = self.near_duplicates.lookup(namespace, sop_text)
+            if cached:
+                analysis, similarity, exact = cached
+                if exact:
+                    return dict(analysis)
+                self.near_duplicates.schedule_refresh(namespace, sop_text, lambda: self._model_analysis(sop_text, options))
+                return {**analysis, "approximate": True, "similarity": round(similarity, 3)}
+        
+        analysis = self._model_analysis(sop_text, options)
+        if analysis is None:
+            return self._fallback_analysis(sop_text)
+        self.near_duplicates.store(namespace, sop_text, analysis)
+        return analysis
+    
+    def _incremental_analysis(self, sop_text: str, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Analyze only paragraphs whose hash is not cached, then aggregate every
+        paragraph's observations into the overall analysis locally"""
+        paragraphs = [p.strip() for p in re.split(r'\n\s*\n', sop_text) if p.strip()]
+        if len(paragraphs) == 1 and '\n' in paragraphs[0]:
+            paragraphs = [line.strip() for line in paragraphs[0].splitlines() if line.strip()]
+        if not paragraphs:
+            return None
+        
+        keys = [self._paragraph_key(paragraph, options) for paragraph in paragraphs]
+        observations: Dict[str, Optional[Dict[str, Any]]] = {}
+        changed: List[Tuple[str, str]] = []
+        for key, paragraph in zip(keys, paragraphs):
+            if key in observations:
+                continue
+            cached = None if is_fresh_generation() else self.paragraph_cache.get(key)
+            observations[key] = cached
+            if cached is None:
+                changed.append((key, paragraph))
+        
+        # One call per budget-sized group of changed paragraphs
+        groups: List[List[Tuple[str, str]]] = [[]]
+        for key, paragraph in changed:
+            if groups[-1] and estimate_tokens(' '.join(p for _, p in groups[-1] + [(key, paragraph)])) > self.config.LLM_INPUT_TOKEN_BUDGET:
+                groups.append([])
+            groups[-1].append((key, paragraph))
+        if changed:
+            for group, results in zip(groups, map_chunks(lambda group: self._observe_paragraphs(group, options), groups)):
+                for (key, _), observation in zip(group, results or [None] * len(group)):
+                    if observation is not None:
+                        self.paragraph_cache.set(key, observation)
+                    observations[key] = observation
+        
+        logger.info(f"Incremental SOP analysis: {len(paragraphs)} paragraphs, {len(changed)} re-analyzed")
+        
+        weighted = [(observations[key], len(paragraph.split())) for key, paragraph in zip(keys, paragraphs)]
+        weighted = [(observation, words) for observation, words in weighted if observation]
+        if not weighted:
+            return None
+        
+        analysis = self._aggregate_observations(weighted)
+        analysis["incremental"] = {
+            "paragraphs": len(paragraphs),
+            "reanalyzed": len(changed),
+            "reused": len(paragraphs) - len(changed)
+        }
+        return analysis
+    
+    def _paragraph_key(self, paragraph: str, options: Dict[str, Any]) -> str:
+        normalized = ' '.join(paragraph.split())
+        material = f"{self.model_name}|{options.get('target_program')}|{options.get('target_university')}|{normalized}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def _observe_paragraphs(self, group: List[Tuple[str, str]], options: Dict[str, Any]) -> Optional[List[Optional[Dict[str, Any]]]]:
+        """AI observations for a group of paragraphs in one call, or None if the call fails"""
+        target_program = options.get('target_program', 'graduate program')
+        target_university = options.get('target_university', 'university')
+        paragraphs = "\n\n".join(f'<paragraph id="{i}">\n{text}\n</paragraph>' for i, (_, text) in enumerate(group))
+        dimensions = ', '.join(field for field in SCORE_FIELDS if field != 'overall_score')
+        
+        prompt = f"""
+        You are an expert academic advisor reviewing paragraphs of a Statement of Purpose for a {target_program}
+        application to {target_university}. Assess each paragraph on its own.
+        
+        Provide ONLY a valid JSON response with exactly one entry per paragraph:
+        {{
+            "paragraphs": [
+                {{
+                    "id": 0,
+                    "themes": ["theme1", "theme2"],
+                    "strengths": ["strength1"],
+                    "weaknesses": ["weakness1"],
+                    "suggestions": ["suggestion1"],
+                    "sentiment_score": 0.7,
+                    "scores": {{"academic_focus_score": 80, "research_alignment_score": null}}
+                }}
+            ]
+        }}
+        
+        Lists hold at most 3 short items. sentiment_score is on a 0-1 scale. "scores" holds 0-100 values
+        for {dimensions}; use null for a dimension the paragraph does not address, but always score
+        writing_quality_score.
+        
+        {paragraphs}
+        
+        Respond ONLY with valid JSON, no additional text or markdown.
+        """
+        
+        try:
+            data = self._parse_json_response(self._gemini_generate('sop.paragraphs', prompt))
+        except Exception as e:
+            logger.error(f"Paragraph analysis failed: {str(e)}")
+            return None
+        if not data or not isinstance(data.get('paragraphs'), list):
+            return None
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(group)
+        for position, entry in enumerate(data['paragraphs']):
+            if not isinstance(entry, dict):
+                continue
+            index = entry.get('id', position)
+            if not isinstance(index, int) or not 0 <= index < len(group):
+                continue
+            results[index] = self._paragraph_observation(entry)
+        return results
+    
+    @staticmethod
+    def _paragraph_observation(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """One paragraph's observation from the model's entry, or None if the entry
+        is malformed (a list field that is not a list, a non-numeric sentiment)"""
+        def is_number(value: Any) -> bool:
+            return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+        
+        observation: Dict[str, Any] = {}
+        for field in ('themes', 'strengths', 'weaknesses', 'suggestions'):
+            items = entry.get(field)
+            if items is None:
+                items = []
+            if not isinstance(items, list):
+                return None
+            observation[field] = [item for item in items if isinstance(item, str)][:3]
+        
+        sentiment = entry.get('sentiment_score')
+        if sentiment is None:
+            sentiment = 0.5
+        if not is_number(sentiment):
+            return None
+        observation["sentiment_score"] = min(max(float(sentiment), 0.0), 1.0)
+        
+        scores = entry.get('scores')
+        if scores is not None and not isinstance(scores, dict):
+            return None
+        observation["scores"] = {
+            field: min(max(int(value), 0), 100)
+            for field, value in (scores or {}).items()
+            if field in SCORE_FIELDS and is_number(value)
+        }
+        return observation
+    
+    def _aggregate_observations(self, weighted: List[Tuple[Dict[str, Any], int]]) -> Dict[str, Any]:
+        """Combine per-paragraph observations, weighted by paragraph length.
+        
+        Each score averages the paragraphs that address its dimension; a
+        dimension no paragraph addresses scores low, since the SOP omits it.
+        """
+        def interleave(field: str, limit: int = 5) -> List[str]:
+            merged: List[str] = []
+            for i in range(max(len(o[field]) for o, _ in weighted)):
+                for observation, _ in weighted:
+                    if i < len(observation[field]) and observation[field][i] not in merged:
+                        merged.append(observation[field][i])
+            return merged[:limit]
+        
+        total_words = sum(words for _, words in weighted) or 1
+        analysis: Dict[str, Any] = {
+            "key_themes": interleave('themes'),
+            "strengths": interleave('strengths'),
+            "weaknesses": interleave('weaknesses'),
+            "suggestions": interleave('suggestions'),
+            "sentiment_score": sum(o["sentiment_score"] * words for o, words in weighted) / total_words
+        }
+        for field in SCORE_FIELDS:
+            if field == 'overall_score':
+                continue
+            scored = [(o["scores"][field], words) for o, words in weighted if field in o["scores"]]
+            scored_words = sum(words for _, words in scored)
+            analysis[field] = round(sum(score * words for score, words in scored) / scored_words) if scored_words else 40
+        dimensions = [analysis[field] for field in SCORE_FIELDS if field != 'overall_score']
+        analysis["overall_score"] = round(sum(dimensions) / len(dimensions))
+        return analysis
+    
+    def _model_analysis(self, sop_text: str, options: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Gemini analysis, or None if every call failed.
+        
+        SOPs over the per-call token budget are analyzed chunk by chunk
+        concurrently and the chunk analyses reduced into one result.
+        """
+        chunks = prepare_chunks(sop_text, self.config.LLM_INPUT_TOKEN_BUDGET, self.config.LLM_MAX_CHUNKS)
+        analyses = [
+            analysis for analysis in map_chunks(lambda chunk: self._ai_analysis_chunk(chunk, options, len(chunks)), chunks)
+            if analysis
+        ]
+        
+        if not analyses:
+            return None
+        if len(analyses) == 1:
+            return analyses[0]
+        return self._reduce_analyses(analyses)
+    
+    def _ai_analysis_chunk(self, sop_text: str, options: Dict[str, Any], total_chunks: int = 1) -> Optional[Dict[str, Any]]:
+        """Analyze one budget-sized piece of an SOP, returning None if the AI call fails"""
         target_program = options.get('target_program', 'graduate program')
         target_university = options.get('target_university', 'university')
+        excerpt_note = (
+            f"This is one of {total_chunks} consecutive excerpts of a longer statement; assess it on its own merits."
+            if total_chunks > 1 else ""
+        )
         
         prompt = f"""
         You are an expert academic advisor analyzing a Statement of Purpose for a {target_program} application to {target_university}.
+        {excerpt_note}
         
         Analyze the following Statement of Purpose and provide ONLY a valid JSON response with this exact structure:
         {{
@@ -328,8 +1263,10 @@ class SOPService:
         """
         
         try:
-            response = self.model.generate_content(prompt)
-            analysis_text = response.text.strip()
+            batch_item = {
+                "text": sop_text, "program": target_program, "university": target_university, "note": excerpt_note
+            }
+            analysis_text = self._gemini_generate('sop.analyze', prompt, batch_item).strip()
             
             # Clean up the response to ensure it's valid JSON
             if analysis_text.startswith('```json'):
@@ -363,47 +1300,320 @@ class SOPService:
             except json.JSONDecodeError as e:
                 logger.error(f"Failed to parse AI response as JSON: {str(e)}")
                 logger.error(f"Raw response: {analysis_text}")
-                return self._fallback_analysis(sop_text)
+                return None
             
         except Exception as e:
             logger.error(f"AI analysis failed: {str(e)}")
-            return self._fallback_analysis(sop_text)
+            return None
     
-    def _fallback_analysis(self, sop_text: str) -> Dict[str, Any]:
-        """Provide fallback analysis when AI fails"""
-        words = sop_text.split()
-        word_count = len(words)
+    def _analyze_batch(self, items: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Analyze several SOPs with one multi-document prompt.
+        
+        Returns each document's analysis as a JSON string, or None for documents
+        missing or malformed in the response (those are retried on their own).
+        A lone document is sent with its own single-document call.
+        """
+        if len(items) == 1:
+            return [items[0]["call"]()]
+        
+        documents = "\n\n".join(
+            f'<document id="{i}" program="{item["program"]}" university="{item["university"]}">\n'
+            f'{item["note"]}\n{item["text"]}\n</document>'
+            for i, item in enumerate(items)
+        )
+        prompt = f"""
+        You are an expert academic advisor. Below are {len(items)} independent Statements of Purpose, each
+        applying to the program and university named on its document tag. Analyze every document on its
+        own, without comparing them.
+        
+        Provide ONLY a valid JSON response with exactly one entry per document, in document order:
+        {{
+            "results": [
+                {{
+                    "id": 0,
+                    "key_themes": ["theme1", "theme2", "theme3"],
+                    "strengths": ["strength1", "strength2", "strength3"],
+                    "weaknesses": ["weakness1", "weakness2", "weakness3"],
+                    "suggestions": ["suggestion1", "suggestion2", "suggestion3"],
+                    "sentiment_score": 0.8,
+                    "overall_score": 85,
+                    "academic_focus_score": 90,
+                    "personal_narrative_score": 80,
+                    "research_alignment_score": 85,
+                    "career_clarity_score": 88,
+                    "writing_quality_score": 87
+                }}
+            ]
+        }}
+        
+        Lists hold 3-5 specific items. sentiment_score is on a 0-1 scale, the other scores on 0-100:
+        overall quality, academic readiness, personal story and motivation, articulation of research
+        interests, clarity of future goals, and grammar, structure and clarity respectively.
+        
+        {documents}
+        
+        Respond ONLY with valid JSON, no additional text or markdown.
+        """
+        
+        results: List[Optional[str]] = [None] * len(items)
+        try:
+            response = self._gemini_generate('sop.analyze.batch', prompt).strip()
+        except Exception as e:
+            logger.warning(f"Batch analysis of {len(items)} documents failed: {str(e)}")
+            return results
         
-        # Basic sentiment analysis
-        positive_words = ['passion', 'excited', 'enthusiastic', 'motivated', 'dedicated', 'committed', 'eager', 'inspire', 'dream']
-        sentiment_count = sum(1 for word in words if word.lower() in positive_words)
-        sentiment_score = min(sentiment_count / 20.0, 1.0)
+        if response.startswith('```json'):
+            response = response[7:]
+        if response.endswith('```'):
+            response = response[:-3]
+        
+        try:
+            entries = json.loads(response.strip()).get("results", [])
+        except (json.JSONDecodeError, AttributeError):
+            logger.warning(f"Unparseable batch analysis response for {len(items)} documents")
+            return results
+        
+        for position, entry in enumerate(entries if isinstance(entries, list) else []):
+            if not isinstance(entry, dict):
+                continue
+            index = entry.pop("id", position)
+            if isinstance(index, int) and 0 <= index < len(items) and all(f in entry for f in SCORE_FIELDS):
+                results[index] = json.dumps(entry)
+        return results
+    
+    def _reduce_analyses(self, analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-chunk analyses: average the scores, interleave the findings"""
+        def interleave(field: str) -> List[str]:
+            merged = []
+            for i in range(max(len(a[field]) for a in analyses)):
+                for analysis in analyses:
+                    if i < len(analysis[field]) and analysis[field][i] not in merged:
+                        merged.append(analysis[field][i])
+            return merged[:5]
+        
+        reduced = {field: interleave(field) for field in ('key_themes', 'strengths', 'weaknesses', 'suggestions')}
+        reduced["sentiment_score"] = sum(a["sentiment_score"] for a in analyses) / len(analyses)
+        for field in SCORE_FIELDS:
+            reduced[field] = round(sum(a[field] for a in analyses) / len(analyses))
+        return reduced
+    
+    def _fallback_analysis(self, sop_text: str) -> Dict[str, Any]:
+        """Provide fallback analysis when AI fails, scored from local linguistic metrics"""
+        metrics = analyze_text(sop_text)
+        word_count = metrics["word_count"]
+        covered = set(metrics["keyword_coverage"].get("covered", []))
         
         # Basic scoring
         base_score = 60
         if 400 <= word_count <= 800:
             base_score += 10
-        if 'research' in sop_text.lower():
+        if 'research' in covered:
             base_score += 10
-        if 'university' in sop_text.lower():
+        if 'program_fit' in covered:
             base_score += 5
-            
+        
+        # Writing quality: readable register, active voice, varied sentences
+        writing_quality = base_score
+        if metrics["sentence_count"]:
+            writing_quality += 5 if 30 <= metrics["readability"]["flesch_reading_ease"] <= 65 else -5
+            writing_quality -= round(20 * metrics["passive_voice_ratio"] + 20 * metrics["sentence_length"]["long_sentence_ratio"])
+        
+        themes = {
+            "research": "Research experience", "academics": "Academic background", "goals": "Career goals",
+            "motivation": "Personal motivation", "experience": "Practical experience", "skills": "Technical skills"
+        }
         return {
-            "key_themes": ["Academic interests", "Career goals", "Personal motivation"],
+            "key_themes": [theme for topic, theme in themes.items() if topic in covered][:5] or ["Academic interests"],
             "strengths": ["Shows motivation", "Relevant academic background"],
             "weaknesses": ["Could be more specific", "Needs stronger conclusion"],
             "suggestions": ["Add more concrete examples", "Strengthen research discussion"],
-            "sentiment_score": sentiment_score,
+            "sentiment_score": metrics["sentiment"],
             "overall_score": min(base_score, 100),
-            "academic_focus_score": base_score - 5,
-            "personal_narrative_score": base_score - 10,
-            "research_alignment_score": base_score - 8,
-            "career_clarity_score": base_score - 5,
-            "writing_quality_score": base_score
+            "academic_focus_score": base_score - (0 if 'academics' in covered else 10),
+            "personal_narrative_score": base_score - (5 if 'motivation' in covered else 15),
+            "research_alignment_score": base_score - (3 if 'research' in covered else 13),
+            "career_clarity_score": base_score - (0 if 'goals' in covered else 10),
+            "writing_quality_score": min(max(writing_quality, 0), 100)
         }
     
     def _generate_enhancement(self, sop_text: str, context: Dict[str, Any]) -> SOPEnhancement:
-        """Generate enhancement suggestions using AI"""
+        """Generate enhancement suggestions using AI.
+        
+        SOPs over the per-call token budget are enhanced chunk by chunk
+        concurrently and the enhanced sections concatenated in order. In
+        "sections" mode each logical section is enhanced by its own concurrent
+        call, sharing a local outline of the whole statement.
+        """
+        jobs = self._section_jobs(sop_text, context)
+        if jobs:
+            sections, enhance_section = jobs
+            return self._merge_enhancements(sop_text, [data for data in map_chunks(enhance_section, sections) if data])
+        
+        chunks = prepare_chunks(sop_text, self.config.LLM_INPUT_TOKEN_BUDGET, self.config.LLM_MAX_CHUNKS)
+        results = [data for data in map_chunks(lambda chunk: self._enhance_chunk(chunk, context), chunks) if data]
+        return self._merge_enhancements(sop_text, results)
+    
+    def _section_jobs(self, sop_text: str, context: Dict[str, Any]):
+        """For "sections" mode: the SOP's logical sections and the function enhancing
+        one of them, or None when the SOP is too short or over budget to split"""
+        if self.config.SOP_ENHANCEMENT_MODE != 'sections':
+            return None
+        text = compact_text(sop_text)
+        if estimate_tokens(text) > self.config.LLM_INPUT_TOKEN_BUDGET:
+            return None
+        sections = self._segment_sop(text)
+        if len(sections) < 2:
+            return None
+        summary = self._context_summary(sections, context)
+        return sections, lambda section: self._enhance_section(section, summary, context)
+    
+    def _segment_sop(self, sop_text: str) -> List[Tuple[str, str]]:
+        """Split an SOP into (section, text) pairs in SOP_SECTIONS order.
+        
+        The first paragraph is the opening and the last the conclusion; body
+        paragraphs go to the section whose cue words they mention most, staying
+        with the previous paragraph's section on a tie. A statement without
+        paragraph breaks is split into up to five runs of sentences.
+        """
+        paragraphs = [p.strip() for p in re.split(r'\n\s*\n', sop_text) if p.strip()]
+        if len(paragraphs) < 3:
+            sentences = [s for s in _SENTENCE_END.split(' '.join(paragraphs)) if s.strip()]
+            parts = min(len(SOP_SECTIONS), len(sentences))
+            if parts < 3:
+                return [('opening', sop_text.strip())] if sop_text.strip() else []
+            size = -(-len(sentences) // parts)
+            paragraphs = [' '.join(sentences[i:i + size]) for i in range(0, len(sentences), size)]
+        
+        labels = ['opening']
+        for paragraph in paragraphs[1:-1]:
+            words = re.findall(r"[a-z\-]+", paragraph.lower())
+            scores = {
+                section: sum(words.count(cue) for cue in cues if ' ' not in cue)
+                + sum(paragraph.lower().count(cue) for cue in cues if ' ' in cue)
+                for section, cues in SECTION_CUES.items()
+            }
+            best = max(scores, key=scores.get)
+            previous = labels[-1] if labels[-1] in SECTION_CUES else 'academic_background'
+            labels.append(best if scores[best] > scores[previous] else previous)
+        labels.append('conclusion')
+        
+        grouped: Dict[str, List[str]] = {}
+        for label, paragraph in zip(labels, paragraphs):
+            grouped.setdefault(label, []).append(paragraph)
+        return [(section, '\n\n'.join(grouped[section])) for section in SOP_SECTIONS if section in grouped]
+    
+    def _context_summary(self, sections: List[Tuple[str, str]], context: Dict[str, Any]) -> str:
+        """Local outline of the whole SOP shared by every per-section call, so
+        each rewrite stays consistent with the rest of the statement"""
+        target_program = context.get('target_program', 'graduate program')
+        target_university = context.get('target_university', 'university')
+        lines = [f"Applicant to the {target_program} at {target_university}. Outline of the full statement:"]
+        for section, text in sections:
+            lead = _SENTENCE_END.split(text.strip(), 1)[0]
+            lines.append(f"- {section.replace('_', ' ')}: {lead[:240]}")
+        return '\n'.join(lines)
+    
+    def _enhance_section(self, section: Tuple[str, str], summary: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Enhance one logical section, returning it in the shape of a full
+        enhancement response, or None if the AI call fails"""
+        name, text = section
+        prompt = f"""
+        You are an expert academic writing consultant improving one section of a Statement of Purpose.
+        
+        {summary}
+        
+        Rewrite only the {name.replace('_', ' ')} section below. Keep the applicant's authentic voice and
+        facts, make it specific and concrete, use active voice and an academic tone, and keep it
+        consistent with the outline above.
+        
+        Provide ONLY a valid JSON response with this exact structure:
+        {{
+            "enhanced_text": "The rewritten section...",
+            "suggestions": ["Specific suggestion 1", "Specific suggestion 2"],
+            "improvement_areas": ["Area 1", "Area 2"]
+        }}
+        
+        Section ({name}):
+        {text}
+        
+        Respond ONLY with valid JSON, no additional text or markdown.
+        """
+        
+        try:
+            data = self._parse_json_response(self._gemini_generate('sop.enhance.section', prompt))
+        except Exception as e:
+            logger.error(f"Enhancement of section {name} failed: {str(e)}")
+            return None
+        if not data or not isinstance(data.get('enhanced_text'), str):
+            return None
+        return {
+            "enhanced_sections": {name: data['enhanced_text']},
+            "suggestions": [item for item in data.get('suggestions', []) if isinstance(item, str)],
+            "improvement_areas": [item for item in data.get('improvement_areas', []) if isinstance(item, str)]
+        }
+    
+    def _stream_enhancement(self, sop_text: str, context: Dict[str, Any]):
+        """Stream one enhancement call, yielding a section event per completed
+        enhanced_sections entry; returns the parsed response or None on failure"""
+        parser = IncrementalJSONParser(['enhanced_sections'])
+        try:
+            for piece in self._gemini_stream('sop.enhance', self._enhancement_prompt(sop_text, context)):
+                for section, text in parser.feed(piece):
+                    if isinstance(text, str) and text.strip():
+                        yield "section", {"section": section, "text": text}
+            data = parser.result()
+            return data if isinstance(data, dict) else None
+        except Exception as e:
+            logger.error(f"Streamed enhancement failed: {str(e)}")
+            return None
+    
+    def _merge_enhancements(self, sop_text: str, results: List[Dict[str, Any]]) -> SOPEnhancement:
+        """Validate and combine per-chunk enhancement responses, concatenating sections in order"""
+        if not results:
+            return self._fallback_enhancement(sop_text)
+        
+        enhanced_sections: Dict[str, str] = {}
+        suggestions: List[str] = []
+        improvement_areas: List[str] = []
+        for data in results:
+            for section, text in (data.get('enhanced_sections') or {}).items():
+                if isinstance(text, str) and text.strip():
+                    enhanced_sections[section] = f"{enhanced_sections[section]}\n\n{text}" if section in enhanced_sections else text
+            suggestions.extend(item for item in data.get('suggestions', []) if item not in suggestions)
+            improvement_areas.extend(item for item in data.get('improvement_areas', []) if item not in improvement_areas)
+        
+        return SOPEnhancement(
+            original_text=sop_text,
+            enhanced_sections=enhanced_sections,
+            suggestions=suggestions[:5],
+            improvement_areas=improvement_areas[:5],
+            section_diffs=self._section_diffs(sop_text, enhanced_sections)
+        )
+    
+    def _section_diffs(self, sop_text: str, enhanced_sections: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Word-level diff of each enhanced section against the part of the original it
+        rewrites: the locally segmented section of the same name, else the original
+        paragraph sharing the most words with it"""
+        segments = dict(self._segment_sop(sop_text))
+        paragraphs = [(p.strip(), set(p.lower().split())) for p in re.split(r'\n\s*\n', sop_text) if p.strip()]
+        diffs = {}
+        for section, text in enhanced_sections.items():
+            original = segments.get(section)
+            if original is None and paragraphs:
+                words = set(text.lower().split())
+                original = max(paragraphs, key=lambda p: len(words & p[1]) / (len(words | p[1]) or 1))[0]
+            diffs[section] = {"original": original or '', **diff_text(original or '', text)}
+        return diffs
+    
+    def _enhance_chunk(self, sop_text: str, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Enhance one budget-sized piece of an SOP, returning None if the AI call fails"""
+        try:
+            return self._parse_json_response(self._gemini_generate('sop.enhance', self._enhancement_prompt(sop_text, context)))
+        except Exception as e:
+            logger.error(f"Enhancement generation failed: {str(e)}")
+            return None
+    
+    def _enhancement_prompt(self, sop_text: str, context: Dict[str, Any]) -> str:
         target_program = context.get('target_program', 'graduate program')
         target_university = context.get('target_university', 'university')
         
@@ -448,36 +1658,107 @@ class SOPService:
         
         Respond ONLY with valid JSON, no additional text or markdown.
         """
+        return prompt
+    
+    def _parse_json_response(self, response_text: str) -> Optional[Dict[str, Any]]:
+        """Parse a Gemini JSON response, returning None if it is not a JSON object"""
+        response_text = response_text.strip()
+        
+        # Clean up the response
+        if response_text.startswith('```json'):
+            response_text = response_text[7:]
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]
+        
+        response_text = response_text.strip()
         
         try:
-            response = self.model.generate_content(prompt)
-            enhancement_text = response.text.strip()
-            
-            # Clean up the response
-            if enhancement_text.startswith('```json'):
-                enhancement_text = enhancement_text[7:]
-            if enhancement_text.endswith('```'):
-                enhancement_text = enhancement_text[:-3]
-            
-            enhancement_text = enhancement_text.strip()
+            data = json.loads(response_text)
+            return data if isinstance(data, dict) else None
             
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse AI response JSON: {str(e)}")
+            return None
+    
+    def _gemini_generate(self, caller: str, prompt: str, batch_item: Optional[Dict[str, Any]] = None) -> str:
+        """Single Gemini generation on the routed model, behind the shared LLM
+        response cache and circuit breaker.
+        
+        With micro-batching on, a cache miss carrying a batch_item joins the next
+        multi-document analysis batch and only makes its own call if the batch
+        has no valid answer for it.
+        """
+        router = get_model_router(self.config)
+        model_name = router.route(caller, 'gemini', estimate_tokens(prompt))
+        
+        def call() -> str:
+            # An assigned model overrides routing
+            model = self._model or get_gemini_model(self.config, model_name)
+            with router.timed('gemini', model_name):
+                return model.generate_content(prompt, request_options=gemini_request_options(self.config)).text
+        
+        def guarded_call() -> str:
+            return get_provider_guard(self.config, 'gemini').call(call)
+        
+        def batched_call() -> str:
+            response = self.analysis_batcher.submit({**batch_item, "call": guarded_call})
+            return guarded_call() if response is None else response
+        
+        use_batch = batch_item is not None and self.analysis_batcher is not None
+        return self.llm_cache.get_or_call(
+            caller, 'gemini', model_name, None, prompt,
+            batched_call if use_batch else guarded_call,
+            validate=is_json_response
+        )
+    
+    def _gemini_stream(self, caller: str, prompt: str) -> Iterator[str]:
+        """Streamed Gemini generation, yielding text as it is generated.
+        
+        The call runs on a worker thread behind the same response cache, routing,
+        concurrency limit and circuit breaker as _gemini_generate (without
+        hedging); a cached response is yielded whole.
+        """
+        router = get_model_router(self.config)
+        model_name = router.route(caller, 'gemini', estimate_tokens(prompt))
+        pieces: queue.Queue = queue.Queue()
+        streamed = threading.Event()
+        
+        def call() -> str:
+            model = self._model or get_gemini_model(self.config, model_name)
+            parts = []
+            with router.timed('gemini', model_name):
+                response = model.generate_content(prompt, stream=True, request_options=gemini_request_options(self.config))
+                for chunk in response:
+                    parts.append(chunk.text)
+                    streamed.set()
+                    pieces.put(chunk.text)
+            return ''.join(parts)
+        
+        def produce():
             try:
-                enhancement_data = json.loads(enhancement_text)
-                
-                return SOPEnhancement(
-                    original_text=sop_text,
-                    enhanced_sections=enhancement_data.get('enhanced_sections', {}),
-                    suggestions=enhancement_data.get('suggestions', [])[:5],
-                    improvement_areas=enhancement_data.get('improvement_areas', [])[:5]
+                response = self.llm_cache.get_or_call(
+                    caller, 'gemini', model_name, None, prompt,
+                    lambda: get_provider_guard(self.config, 'gemini').call(call, hedge=False),
+                    validate=is_json_response
                 )
-                
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse enhancement JSON: {str(e)}")
-                return self._fallback_enhancement(sop_text)
-            
-        except Exception as e:
-            logger.error(f"Enhancement generation failed: {str(e)}")
-            return self._fallback_enhancement(sop_text)
+                if not streamed.is_set():
+                    pieces.put(response)
+                pieces.put(None)
+            except Exception as e:
+                pieces.put(e)
+        
+        threading.Thread(target=contextvars.copy_context().run, args=(produce,), daemon=True).start()
+        while True:
+            try:
+                piece = pieces.get(timeout=remaining_time())
+            except queue.Empty:
+                mark_budget_exhausted()
+                raise DeadlineExceeded(f"{caller} stream outlived the request time budget")
+            if piece is None:
+                return
+            if isinstance(piece, Exception):
+                raise piece
+            yield piece
     
     def _fallback_enhancement(self, sop_text: str) -> SOPEnhancement:
         """Provide fallback enhancement when AI fails"""
@@ -517,7 +1798,10 @@ class SOPService:
         
         # Check Gemini client
         if self.model:
-            status["dependencies"]["gemini_ai"] = "connected"
+            gemini_circuit = get_provider_guard(self.config, 'gemini').breaker.state
+            status["dependencies"]["gemini_ai"] = "connected" if gemini_circuit == 'closed' else f"circuit_{gemini_circuit}"
+            if gemini_circuit == 'open':
+                status["status"] = "degraded"
         else:
             status["dependencies"]["gemini_ai"] = "unavailable"
             status["status"] = "degraded"
@@ -529,7 +1813,11 @@ class SOPService:
                 cursor.execute('SELECT COUNT(*) FROM sop_documents')
                 count = cursor.fetchone()[0]
                 status["dependencies"]["database"] = "connected"
-                status["stats"] = {"total_sops": count}
+                status["stats"] = {
+                    "total_sops": count,
+                    "database": self.db_pool.get_stats(),
+                    "sop_cache": self.sop_cache.stats()
+                }
         except Exception as e:
             status["dependencies"]["database"] = "unavailable"
             status["status"] = "degraded"
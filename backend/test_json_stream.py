@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental JSON scanner used by streamed SOP enhancement (utils/json_stream.py)
+"""
+
+import json
+import random
+
+from utils.json_stream import IncrementalJSONParser
+
+DOCUMENT = {
+    "enhanced_sections": {
+        "introduction": "I first met \"graph\" theory in a {curly} lab, \\ not a [bracketed] one.",
+        "research": "Über-robust, naïve: 量子 computing → tensors\nnew line",
+        "goals": "",
+        "nested": {"kept": [1, 2.5, -3e2, True, None, {"deep": "value"}]},
+        "count": 12,
+        "flag": False,
+        "nothing": None,
+        "list": ["a", "b,c", "d}"]
+    },
+    "improvement_summary": {"changes": ["tightened", "clarified"], "score": 0.82},
+    "overall_score": 91
+}
+
+FENCED = "```json\n" + json.dumps(DOCUMENT, ensure_ascii=False, indent=2) + "\n```\n"
+
+
+def feed_in_chunks(text, parser, rng):
+    members = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 12)
+        members.extend(parser.feed(text[position:position + size]))
+        position += size
+    return members
+
+
+def test_random_chunk_sizes():
+    """Members and result() do not depend on how the document is split"""
+    rng = random.Random(3)
+    expected = list(DOCUMENT["enhanced_sections"].items())
+    for _ in range(300):
+        parser = IncrementalJSONParser(['enhanced_sections'])
+        members = feed_in_chunks(FENCED, parser, rng)
+        assert members == expected
+        assert parser.complete
+        assert parser.result() == DOCUMENT
+
+
+def test_single_characters_and_whole_document():
+    for chunks in (list(FENCED), [FENCED]):
+        parser = IncrementalJSONParser(['enhanced_sections'])
+        members = [member for chunk in chunks for member in parser.feed(chunk)]
+        assert members == list(DOCUMENT["enhanced_sections"].items())
+        assert parser.result() == DOCUMENT
+
+
+def test_members_arrive_before_the_document_completes():
+    text = json.dumps(DOCUMENT)
+    cut = text.index('"research"')
+    parser = IncrementalJSONParser(['enhanced_sections'])
+    assert parser.feed(text[:cut]) == [("introduction", DOCUMENT["enhanced_sections"]["introduction"])]
+    assert not parser.complete
+
+
+def test_nested_path():
+    parser = IncrementalJSONParser(['improvement_summary'])
+    members = feed_in_chunks(FENCED, parser, random.Random(5))
+    assert members == list(DOCUMENT["improvement_summary"].items())
+
+
+def test_incomplete_document():
+    parser = IncrementalJSONParser(['enhanced_sections'])
+    parser.feed(FENCED[:len(FENCED) // 2])
+    assert not parser.complete
+    try:
+        parser.result()
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("result() of an incomplete document should raise ValueError")
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            test()
+            print(f"✅ {name}")
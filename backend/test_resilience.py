@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the provider guard (utils/resilience.py): hedging under the concurrency limit
+and the circuit breaker's half-open probe
+"""
+
+import threading
+import time
+
+from utils.admission import get_limiter
+from utils.config import Config
+from utils.request_context import DeadlineExceeded, request_deadline, time_budget
+from utils.resilience import CircuitBreaker, ProviderGuard
+
+
+def make_guard(provider, max_concurrent=8, hedge=True):
+    """Guard for a provider name of its own, with hedging after 10ms"""
+    config = Config()
+    config.UPSTREAM_CONCURRENCY = {**config.UPSTREAM_CONCURRENCY, provider: max_concurrent}
+    config.LLM_HEDGE_ENABLED = hedge
+    config.LLM_HEDGE_MIN_DELAY = 0.01
+    guard = ProviderGuard(provider, config)
+    guard._latencies.extend([0.01] * config.LLM_HEDGE_MIN_SAMPLES)
+    return guard
+
+
+class Upstream:
+    """Fake upstream call; `behaviours` says what the n-th request does"""
+
+    def __init__(self, *behaviours):
+        self.behaviours = list(behaviours)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            behaviour = self.behaviours[min(self.requests, len(self.behaviours) - 1)]
+            self.requests += 1
+        kind, seconds = behaviour
+        time.sleep(seconds)
+        if kind == 'fail':
+            raise RuntimeError("upstream error")
+        if kind == 'timeout':
+            time_budget(60)  # as the client's timeout does once the budget is spent
+        return kind
+
+
+def test_hedge_takes_its_own_slot():
+    guard = make_guard('test-hedge-slot', max_concurrent=2)
+    upstream = Upstream(('primary', 0.2), ('backup', 0.02))
+    assert guard.call(upstream) == 'backup'
+    assert upstream.requests == 2
+    time.sleep(0.3)
+    assert get_limiter(guard.config, guard.provider).get_stats()["in_flight"] == 0
+
+
+def test_no_hedge_without_a_free_slot():
+    """With the caller holding the only slot, the backup is skipped rather than exceeding the limit"""
+    guard = make_guard('test-hedge-full', max_concurrent=1)
+    upstream = Upstream(('primary', 0.1), ('backup', 0.0))
+    assert guard.call(upstream) == 'primary'
+    assert upstream.requests == 1
+
+
+def test_failed_first_finisher_respects_deadline():
+    """When one request fails, waiting on the other is still bounded by the request deadline"""
+    guard = make_guard('test-hedge-deadline')
+    upstream = Upstream(('primary', 2.0), ('fail', 0.0))
+    started = time.time()
+    with request_deadline(time.time() + 0.3):
+        try:
+            guard.call(upstream)
+        except DeadlineExceeded:
+            pass
+        else:
+            raise AssertionError("the hedged call should stop at the deadline")
+    assert time.time() - started < 1.0
+
+
+def test_probe_past_its_deadline_is_released():
+    """A half-open probe that runs out of request budget neither re-opens the
+    circuit nor keeps it stuck: the next call becomes the probe"""
+    guard = make_guard('test-probe-deadline', hedge=False)
+    guard.breaker._transition(CircuitBreaker.OPEN)
+    guard.breaker._opened_at = time.time() - guard.breaker.open_seconds
+
+    with request_deadline(time.time() + 0.05):
+        try:
+            guard.call(Upstream(('timeout', 0.1)))
+        except DeadlineExceeded:
+            pass
+        else:
+            raise AssertionError("the probe should run out of budget")
+    assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+
+    assert guard.call(Upstream(('ok', 0.0))) == 'ok'
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            test()
+            print(f"✅ {name}")
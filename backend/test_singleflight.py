@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for request coalescing (utils/singleflight.py)
+"""
+
+import threading
+import time
+
+from utils.request_context import mark_budget_exhausted, request_deadline
+from utils.singleflight import SingleFlight
+
+
+def run_coalesced(group, leader_fn, follower_fn, follower_deadline=None):
+    """Start a leader, join one follower while it is in flight, return both results"""
+    results = {}
+    started = threading.Event()
+
+    def leader():
+        def fn():
+            started.set()
+            time.sleep(0.1)
+            return leader_fn()
+        result = group.do('key', fn)
+        if isinstance(result, dict):
+            result["request_id"] = "leader"  # the leader decorates its own response
+        results["leader"] = result
+
+    def follower():
+        started.wait()
+        with request_deadline(follower_deadline):
+            results["follower"] = group.do('key', follower_fn)
+
+    threads = [threading.Thread(target=leader), threading.Thread(target=follower)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_leader_changes_do_not_reach_followers():
+    group = SingleFlight('test.copy')
+    results = run_coalesced(group, lambda: {"score": 80}, lambda: {"score": 0})
+    assert results["leader"] == {"score": 80, "request_id": "leader"}
+    assert results["follower"] == {"score": 80}
+
+
+def test_partial_result_is_not_shared():
+    """A leader cut short by its own deadline doesn't hand its degraded result to followers"""
+    group = SingleFlight('test.partial')
+
+    def degraded():
+        mark_budget_exhausted()
+        return {"score": 50, "partial": True}
+
+    with request_deadline(time.time() + 60):
+        results = run_coalesced(group, degraded, lambda: {"score": 80, "partial": False},
+                                follower_deadline=time.time() + 60)
+    assert results["leader"]["partial"] is True
+    assert results["follower"] == {"score": 80, "partial": False}
+
+
+def test_errors_are_shared():
+    group = SingleFlight('test.error')
+
+    def failing():
+        raise RuntimeError("upstream error")
+
+    errors = []
+
+    def call(delay):
+        time.sleep(delay)
+        try:
+            group.do('key', lambda: (time.sleep(0.1), failing()))
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call, args=(delay,)) for delay in (0, 0.02)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == ["upstream error", "upstream error"]
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            test()
+            print(f"✅ {name}")
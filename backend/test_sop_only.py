@@ -6,9 +6,12 @@ import os
 import logging
 from datetime import datetime
 
+from utils.config import Config
+
 # Simple mock services to avoid dependencies
-class MockConfig:
+class MockConfig(Config):
     def __init__(self):
+        super().__init__()
         self.DATABASE_URL = "sqlite:///test.db"
         self.GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', None)
 
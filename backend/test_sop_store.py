@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite SOP store: keyset paging of a user's SOPs, revision history
+and near-copy detection
+"""
+
+import os
+import tempfile
+
+from services.sop_service import SOPService
+from utils.config import Config
+
+
+def make_service() -> SOPService:
+    """SOPService on a fresh temporary database"""
+    config = Config()
+    config.DATABASE_URL = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'sops.db')}"
+    config.SOP_SIMILARITY_ENABLED = False
+    return SOPService(config)
+
+
+def sop(sop_id, user_id='alice', updated_at='2024-01-01 00:00:00', content='My statement of purpose.'):
+    return {"id": sop_id, "user_id": user_id, "title": f"SOP {sop_id}", "content": content,
+            "created_at": updated_at, "updated_at": updated_at}
+
+
+def all_pages(service, user_id, limit):
+    ids, cursor = [], None
+    while True:
+        page = service.list_sops(user_id, limit=limit, cursor=cursor)
+        ids.extend(entry["id"] for entry in page["sops"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_keyset_paging_visits_every_sop_once():
+    """Pages follow (updated_at, id) descending, ties included, with no gaps or repeats"""
+    service = make_service()
+    documents = [sop(f"doc-{i:02d}", updated_at=f"2024-01-{1 + i % 4:02d} 00:00:00") for i in range(23)]
+    documents.append(sop("other", user_id='bob'))
+    service.save_sops(documents, keep_timestamps=True)
+
+    expected = [d["id"] for d in sorted(documents[:-1], key=lambda d: (d["updated_at"], d["id"]), reverse=True)]
+    for limit in (1, 3, 5, 23, 50):
+        assert all_pages(service, 'alice', limit) == expected
+    assert all_pages(service, 'bob', 5) == ["other"]
+    assert service.list_sops('nobody')["sops"] == []
+
+
+def test_last_full_page_has_no_cursor():
+    service = make_service()
+    service.save_sops([sop(f"doc-{i}") for i in range(4)], keep_timestamps=True)
+    first = service.list_sops('alice', limit=2)
+    assert first["next_cursor"] is not None
+    second = service.list_sops('alice', limit=2, cursor=first["next_cursor"])
+    assert len(second["sops"]) == 2 and second["next_cursor"] is None
+    assert "content" not in second["sops"][0]
+
+
+def test_updates_while_paging_do_not_repeat_or_skip_older_sops():
+    """A SOP saved mid-walk moves to the front; the rest of the walk is unaffected"""
+    service = make_service()
+    service.save_sops([sop(f"doc-{i:02d}", updated_at=f"2024-01-{1 + i:02d} 00:00:00") for i in range(10)],
+                      keep_timestamps=True)
+    first = service.list_sops('alice', limit=4)
+    assert [entry["id"] for entry in first["sops"]] == ["doc-09", "doc-08", "doc-07", "doc-06"]
+
+    service.save_sop(sop("doc-02", content="Revised draft."))
+    rest = []
+    cursor = first["next_cursor"]
+    while cursor:
+        page = service.list_sops('alice', limit=4, cursor=cursor)
+        rest.extend(entry["id"] for entry in page["sops"])
+        cursor = page["next_cursor"]
+    assert rest == ["doc-05", "doc-04", "doc-03", "doc-01", "doc-00"]
+    assert all_pages(service, 'alice', 4)[0] == "doc-02"
+
+
+def test_malformed_cursor():
+    service = make_service()
+    for cursor in ("not-a-cursor", "bnVsbA", "W10"):
+        try:
+            service.list_sops('alice', cursor=cursor)
+        except ValueError:
+            continue
+        raise AssertionError(f"cursor {cursor!r} should be rejected")
+
+
+def test_save_reports_created_after_an_update():
+    """A new SOP saved right after an update on the same connection is reported as created"""
+    service = make_service()
+    assert service.save_sop(sop("a"))["action"] == "created"
+    assert service.save_sop(sop("a", content="Revised."))["action"] == "updated"
+    assert service.save_sop(sop("b"))["action"] == "created"
+    assert service.save_sop(sop("c"))["action"] == "created"
+    assert service.save_sop(sop("b", content="Revised."))["action"] == "updated"
+
+
+def test_unchanged_saves_add_no_revision():
+    """Only saves that change the content or analysis are recorded"""
+    service = make_service()
+    service.save_sop({"id": "doc", "title": "SOP", "content": "First draft.", "analysis": {"score": 1}})
+    service.save_sop({"id": "doc", "title": "Renamed", "content": "First draft.", "analysis": {"score": 1}})
+    assert [r["revision"] for r in service.list_revisions("doc")] == [1]
+
+    service.save_sop({"id": "doc", "title": "SOP", "content": "First draft.", "analysis": {"score": 2}})
+    service.save_sop({"id": "doc", "title": "SOP", "content": "Second draft.", "analysis": {"score": 2}})
+    service.save_sops([{"id": "doc", "title": "SOP", "content": "Second draft.", "analysis": {"score": 2}}])
+    assert [r["revision"] for r in service.list_revisions("doc")] == [3, 2, 1]
+
+    # Returning to an earlier text is a new revision, not a duplicate of the latest
+    service.save_sop({"id": "doc", "title": "SOP", "content": "First draft.", "analysis": {"score": 1}})
+    assert [r["revision"] for r in service.list_revisions("doc")] == [4, 3, 2, 1]
+
+    revision = service.get_revision("doc", 3)
+    assert revision["content"] == "Second draft." and revision["analysis"] == {"score": 2}
+    assert service.get_revision("doc", 9) is None
+
+
+def test_revisions_are_pruned_to_the_newest():
+    service = make_service()
+    service.config.SOP_MAX_REVISIONS = 3
+    for i in range(6):
+        service.save_sop({"id": "doc", "title": "SOP", "content": f"Draft {i}."})
+    assert [r["revision"] for r in service.list_revisions("doc")] == [6, 5, 4]
+    assert service.get_revision("doc", 4)["content"] == "Draft 3."
+
+
+def test_similar_sops_leave_out_the_applicants_own_drafts():
+    service = make_service()
+    service.config.SOP_SIMILARITY_ENABLED = True
+    text = ("My passion for machine learning began during undergraduate research on graph neural "
+            "networks, and I want to pursue graduate study to deepen that work. ") * 5
+    service.save_sop(sop("mine", user_id='alice', content=text))
+    service.save_sop(sop("draft", user_id='alice', content=text + " One more sentence."))
+    service.save_sop(sop("copy", user_id='bob', content=text + " A different ending."))
+
+    assert [m["sop_id"] for m in service.find_similar_sops(text, exclude_id="mine")] == ["copy"]
+    assert [m["sop_id"] for m in service.find_similar_sops(text, user_id='alice')] == ["copy"]
+    own = service.find_similar_sops(text, exclude_id="mine", include_own=True)
+    assert sorted((m["sop_id"], m["same_user"]) for m in own) == [("copy", False), ("draft", True)]
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the word-level diff engine (utils/text_diff.py)
+"""
+
+import random
+
+from utils.text_diff import apply_ops, diff_text, tokenize
+
+ORIGINAL = ("My passion for machine learning began during my undergraduate research on graph "
+            "neural networks. I want to pursue graduate study to deepen this work, and I hope "
+            "to contribute to open-source tools that make these methods easier to use.")
+REVISED = ("My interest in machine learning began during my undergraduate research on graph "
+           "neural networks at Delft. I want to pursue a PhD to deepen this work, and I hope "
+           "to build open-source tools that make these methods easier to use.\n\nThank you.")
+
+
+def test_round_trip():
+    """apply_ops(original, ops) rebuilds the revised text"""
+    result = diff_text(ORIGINAL, REVISED)
+    assert apply_ops(ORIGINAL, result["ops"]) == REVISED
+    assert 0 < result["stats"]["similarity"] < 1
+    assert result["stats"]["inserted_words"] and result["stats"]["deleted_words"]
+
+
+def test_round_trip_random_edits():
+    """Round trip holds for random word insertions, deletions and substitutions"""
+    rng = random.Random(7)
+    words = tokenize(ORIGINAL)
+    vocabulary = [token for token in words if token.strip()] + ["robotics", ",", "\n", "  "]
+    for _ in range(200):
+        revised = list(words)
+        for _ in range(rng.randint(1, 12)):
+            position = rng.randrange(len(revised) + 1)
+            action = rng.choice(('insert', 'delete', 'replace'))
+            if action == 'insert' or not revised:
+                revised.insert(position, rng.choice(vocabulary))
+            elif action == 'delete':
+                del revised[min(position, len(revised) - 1)]
+            else:
+                revised[min(position, len(revised) - 1)] = rng.choice(vocabulary)
+        revised_text = ''.join(revised)
+        assert apply_ops(ORIGINAL, diff_text(ORIGINAL, revised_text)["ops"]) == revised_text
+
+
+def test_identical_text():
+    result = diff_text(ORIGINAL, ORIGINAL)
+    assert result["ops"] == [['=', len(ORIGINAL)]]
+    assert result["stats"]["similarity"] == 1.0
+
+
+def test_empty_side():
+    """An empty original is one insertion; an empty revision is one deletion"""
+    inserted = diff_text("", REVISED)
+    assert inserted["ops"] == [['+', REVISED]]
+    assert apply_ops("", inserted["ops"]) == REVISED
+
+    deleted = diff_text(ORIGINAL, "")
+    assert deleted["ops"] == [['-', len(ORIGINAL)]]
+    assert apply_ops(ORIGINAL, deleted["ops"]) == ""
+    assert deleted["stats"]["similarity"] == 0.0
+
+    assert diff_text("", "") == {"ops": [], "stats": {
+        "inserted_words": 0, "deleted_words": 0, "unchanged_words": 0, "similarity": 1.0
+    }}
+
+
+def test_unrelated_text_hits_edit_cost_cap():
+    """Past max_edit_cost the changed region is reported as one replacement"""
+    rng = random.Random(11)
+    original = ' '.join(f"alpha{rng.randrange(50)} shared" for _ in range(150)) + " first"
+    revised = ' '.join(f"beta{rng.randrange(50)} shared" for _ in range(150)) + " second"
+
+    # Uncapped, the shared words are aligned
+    assert diff_text(original, revised)["stats"]["unchanged_words"] == 150
+
+    result = diff_text(original, revised, max_edit_cost=20)
+    assert result["ops"] == [['-', len(original)], ['+', revised]]
+    assert apply_ops(original, result["ops"]) == revised
+    assert result["stats"]["unchanged_words"] == 0
+
+    # A cap the edit fits under still aligns word by word
+    small = diff_text("one two three four", "one two 3 four", max_edit_cost=20)
+    assert small["ops"] == [['=', 8], ['-', 5], ['+', '3'], ['=', 5]]
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            test()
+            print(f"✅ {name}")
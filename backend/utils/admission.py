@@ -0,0 +1,203 @@
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional
+
+from flask import jsonify
+
+from utils.config import Config
+from utils.metrics import metrics
+from utils.request_context import get_deadline, get_request_priority
+
+# Lower rank is admitted first
+PRIORITY_RANKS = {'interactive': 0, 'batch': 1}
+
+queue_depth = metrics.gauge(
+    'unicompass_upstream_queue_depth', 'Calls waiting for an upstream concurrency slot', ('provider',)
+)
+in_flight = metrics.gauge(
+    'unicompass_upstream_in_flight', 'Upstream calls holding a concurrency slot', ('provider',)
+)
+queue_wait = metrics.histogram(
+    'unicompass_upstream_queue_wait_seconds', 'Time spent waiting for an upstream concurrency slot',
+    ('provider', 'priority')
+)
+admission_rejections = metrics.counter(
+    'unicompass_upstream_rejections_total', 'Upstream calls rejected by admission control', ('provider', 'reason')
+)
+
+
+class AdmissionRejected(Exception):
+    """An upstream call was refused because the provider's wait queue is full or too slow"""
+
+    def __init__(self, provider: str, retry_after: int, reason: str = 'queue_full'):
+        super().__init__(f"{provider} is at capacity ({reason}); retry after {retry_after}s")
+        self.provider = provider
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class ConcurrencyLimiter:
+    """Concurrency limit for one provider with a bounded, priority-ordered wait queue.
+
+    Up to `max_concurrent` calls run at once. Further calls wait in a queue of
+    at most `max_queue` entries, interactive before batch and FIFO within a
+    class; a call that cannot queue, or waits longer than `queue_timeout`
+    or its request's deadline, is rejected with AdmissionRejected.
+    """
+
+    def __init__(self, provider: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.provider = provider
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiters = []  # heap of (rank, sequence)
+        self._sequence = itertools.count()
+        self._hold_times = deque(maxlen=100)
+
+    def saturated(self) -> bool:
+        """True when a new call would be rejected without waiting"""
+        with self._cond:
+            return len(self._waiters) >= self.max_queue
+
+    def retry_after(self) -> int:
+        """Seconds until a queued call would likely be admitted, from recent hold times"""
+        with self._cond:
+            average_hold = sum(self._hold_times) / len(self._hold_times) if self._hold_times else 1.0
+            backlog = len(self._waiters) + 1
+        return max(1, math.ceil(average_hold * backlog / self.max_concurrent))
+
+    def _wait_turn(self, priority: str, start: float):
+        """Queue until this call is first in line with a free slot; returns a rejection reason on timeout"""
+        entry = (PRIORITY_RANKS.get(priority, 0), next(self._sequence))
+        heapq.heappush(self._waiters, entry)
+        queue_depth.set(len(self._waiters), provider=self.provider)
+        request_deadline = get_deadline()
+        deadline = min(start + self.queue_timeout, request_deadline or float('inf'))
+
+        while self._active >= self.max_concurrent or self._waiters[0] != entry:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                queue_depth.set(len(self._waiters), provider=self.provider)
+                self._cond.notify_all()
+                return 'deadline' if request_deadline and deadline == request_deadline else 'queue_timeout'
+            self._cond.wait(remaining)
+
+        heapq.heappop(self._waiters)
+        queue_depth.set(len(self._waiters), provider=self.provider)
+        # The next waiter may be admissible too if more than one slot is free
+        self._cond.notify_all()
+        return None
+
+    @contextmanager
+    def slot(self, priority: str = 'interactive'):
+        start = time.time()
+        rejection = None
+        with self._cond:
+            if self._active >= self.max_concurrent or self._waiters:
+                rejection = 'queue_full' if len(self._waiters) >= self.max_queue else self._wait_turn(priority, start)
+            if rejection is None:
+                self._active += 1
+                in_flight.set(self._active, provider=self.provider)
+        if rejection:
+            admission_rejections.inc(provider=self.provider, reason=rejection)
+            raise AdmissionRejected(self.provider, self.retry_after(), rejection)
+
+        queue_wait.observe(time.time() - start, provider=self.provider, priority=priority)
+        acquired = time.time()
+        try:
+            yield
+        finally:
+            self.release(acquired)
+    
+    def try_acquire(self) -> Optional[float]:
+        """Take a slot only if one is free with nobody queued, without waiting;
+        returns the acquisition time to pass to release(), or None"""
+        with self._cond:
+            if self._active >= self.max_concurrent or self._waiters:
+                return None
+            self._active += 1
+            in_flight.set(self._active, provider=self.provider)
+        return time.time()
+    
+    def release(self, acquired: float):
+        with self._cond:
+            self._active -= 1
+            self._hold_times.append(time.time() - acquired)
+            in_flight.set(self._active, provider=self.provider)
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"in_flight": self._active, "queued": len(self._waiters), "max_concurrent": self.max_concurrent}
+
+
+_limiters: Dict[str, ConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _limiters_lock
+    _limiters.clear()
+    _limiters_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_limiter(config: Config, provider: str) -> ConcurrencyLimiter:
+    """Process-wide limiter for a provider ('groq', 'gemini' or 'azure')"""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = ConcurrencyLimiter(
+                provider,
+                max_concurrent=config.UPSTREAM_CONCURRENCY.get(provider, 8),
+                max_queue=config.UPSTREAM_MAX_QUEUE,
+                queue_timeout=config.UPSTREAM_QUEUE_TIMEOUT
+            )
+        return _limiters[provider]
+
+
+@contextmanager
+def upstream_slot(config: Config, provider: str):
+    """Hold one of the provider's concurrency slots at the current request priority"""
+    with get_limiter(config, provider).slot(get_request_priority()):
+        yield
+
+
+def rejected_response(error: AdmissionRejected):
+    """429 response telling the client when to retry"""
+    response = jsonify({"error": "Upstream capacity exhausted, please retry", "details": str(error),
+                        "retry_after": error.retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def admission_control(config: Config, *providers: str):
+    """Route decorator answering 429 immediately while any provider's wait queue is full"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            for provider in providers:
+                limiter = get_limiter(config, provider)
+                if limiter.saturated():
+                    admission_rejections.inc(provider=provider, reason='shed')
+                    return rejected_response(AdmissionRejected(provider, limiter.retry_after()))
+            try:
+                return view(*args, **kwargs)
+            except AdmissionRejected as e:
+                return rejected_response(e)
+        return wrapper
+    return decorator
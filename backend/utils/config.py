@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 import logging
 
@@ -16,9 +17,102 @@ class Config:
         # Groq API (used for LLM functionality)
         self.GROQ_API_KEY = os.getenv('OPENAI_API_KEY', os.getenv('GROQ_API_KEY', ''))
         self.GROQ_MODEL = os.getenv('OPENAI_MODEL', 'llama3-8b-8192')
+        self.GROQ_FAST_MODEL = os.getenv('GROQ_FAST_MODEL', self.GROQ_MODEL)
+        self.GROQ_LARGE_MODEL = os.getenv('GROQ_LARGE_MODEL', self.GROQ_MODEL)
         self.MAX_TOKENS = int(os.getenv('MAX_TOKENS', 2000))
         self.TEMPERATURE = float(os.getenv('TEMPERATURE', 0.3))
         
+        # Resume LLM analysis: "combined" (one JSON-mode call), "parallel",
+        # "incremental" (per-section, cached by section hash) or "sequential"
+        self.RESUME_ANALYSIS_MODE = os.getenv('RESUME_ANALYSIS_MODE', 'combined')
+        self.SECTION_CACHE_SIZE = int(os.getenv('SECTION_CACHE_SIZE', 4096))
+        self.LLM_WORKERS = int(os.getenv('LLM_WORKERS', 8))
+        
+        # Prompt token budgets: user text above LLM_INPUT_TOKEN_BUDGET is split into
+        # at most LLM_MAX_CHUNKS chunks processed concurrently (map-reduce)
+        self.LLM_INPUT_TOKEN_BUDGET = int(os.getenv('LLM_INPUT_TOKEN_BUDGET', 3000))
+        self.LLM_MAX_CHUNKS = int(os.getenv('LLM_MAX_CHUNKS', 6))
+        
+        # Micro-batching: while a Gemini SOP analysis is in flight, further analyses
+        # collect for up to LLM_MICRO_BATCH_WAIT_MS and go out as one multi-document
+        # prompt (at most LLM_MICRO_BATCH_SIZE documents, LLM_INPUT_TOKEN_BUDGET tokens)
+        self.LLM_MICRO_BATCH_ENABLED = os.getenv('LLM_MICRO_BATCH_ENABLED', 'false').lower() == 'true'
+        self.LLM_MICRO_BATCH_SIZE = int(os.getenv('LLM_MICRO_BATCH_SIZE', 8))
+        self.LLM_MICRO_BATCH_WAIT_MS = float(os.getenv('LLM_MICRO_BATCH_WAIT_MS', 10))
+        
+        # SOP enhancement: "single" (one call rewriting every section) or "sections"
+        # (one concurrent call per logical section, sharing an outline of the SOP)
+        self.SOP_ENHANCEMENT_MODE = os.getenv('SOP_ENHANCEMENT_MODE', 'single')
+        
+        # SOP analysis: "full" (the whole SOP per call) or "incremental" (per-paragraph
+        # observations cached by paragraph hash; only new or edited paragraphs are
+        # sent to Gemini). Requests can also opt in with options.incremental
+        self.SOP_ANALYSIS_MODE = os.getenv('SOP_ANALYSIS_MODE', 'full')
+        self.SOP_PARAGRAPH_CACHE_SIZE = int(os.getenv('SOP_PARAGRAPH_CACHE_SIZE', 8192))
+        self.INSIGHTS_TOKEN_BUDGET = int(os.getenv('INSIGHTS_TOKEN_BUDGET', 1500))
+        
+        # Upstream HTTP clients: pooled per process with keep-alive and explicit timeouts (seconds)
+        self.LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', 5))
+        self.LLM_READ_TIMEOUT = float(os.getenv('LLM_READ_TIMEOUT', 60))
+        self.AZURE_READ_TIMEOUT = float(os.getenv('AZURE_READ_TIMEOUT', 120))
+        self.LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', 2))
+        self.UPSTREAM_POOL_SIZE = int(os.getenv('UPSTREAM_POOL_SIZE', 20))
+        self.UPSTREAM_KEEPALIVE = float(os.getenv('UPSTREAM_KEEPALIVE', 60))
+        self.GEMINI_TRANSPORT = os.getenv('GEMINI_TRANSPORT', 'rest')  # "rest" or "grpc"
+        
+        # LLM provider resilience: circuit breakers over a sliding window and
+        # optional hedged requests after the provider's recent p95 latency
+        self.CIRCUIT_BREAKER_ENABLED = os.getenv('CIRCUIT_BREAKER_ENABLED', 'true').lower() == 'true'
+        self.CIRCUIT_WINDOW_SECONDS = float(os.getenv('CIRCUIT_WINDOW_SECONDS', 60))
+        self.CIRCUIT_MIN_CALLS = int(os.getenv('CIRCUIT_MIN_CALLS', 5))
+        self.CIRCUIT_FAILURE_RATE = float(os.getenv('CIRCUIT_FAILURE_RATE', 0.5))
+        self.CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv('CIRCUIT_SLOW_CALL_SECONDS', 20))
+        self.CIRCUIT_SLOW_CALL_RATE = float(os.getenv('CIRCUIT_SLOW_CALL_RATE', 0.8))
+        self.CIRCUIT_OPEN_SECONDS = float(os.getenv('CIRCUIT_OPEN_SECONDS', 30))
+        self.LLM_HEDGE_ENABLED = os.getenv('LLM_HEDGE_ENABLED', 'false').lower() == 'true'
+        self.LLM_HEDGE_MIN_DELAY = float(os.getenv('LLM_HEDGE_MIN_DELAY', 1.0))
+        self.LLM_HEDGE_MIN_SAMPLES = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', 20))
+        
+        # Upstream admission control: concurrent calls per provider, then a bounded
+        # priority queue (interactive before batch); overflow is answered with 429
+        self.UPSTREAM_CONCURRENCY = {
+            'groq': int(os.getenv('GROQ_MAX_CONCURRENCY', 8)),
+            'gemini': int(os.getenv('GEMINI_MAX_CONCURRENCY', 8)),
+            'azure': int(os.getenv('AZURE_MAX_CONCURRENCY', 4))
+        }
+        self.UPSTREAM_MAX_QUEUE = int(os.getenv('UPSTREAM_MAX_QUEUE', 32))
+        self.UPSTREAM_QUEUE_TIMEOUT = float(os.getenv('UPSTREAM_QUEUE_TIMEOUT', 10))
+        
+        # Request coalescing: identical concurrent analyze/enhance/predict calls share
+        # one execution; with a lock directory, workers also serialize on file locks
+        self.SINGLEFLIGHT_ENABLED = os.getenv('SINGLEFLIGHT_ENABLED', 'true').lower() == 'true'
+        self.SINGLEFLIGHT_LOCK_DIR = os.getenv('SINGLEFLIGHT_LOCK_DIR', '')
+        self.SINGLEFLIGHT_LOCK_TIMEOUT = float(os.getenv('SINGLEFLIGHT_LOCK_TIMEOUT', 30))
+        
+        # Request time budgets (X-Request-Timeout / X-Request-Deadline headers); the
+        # remaining budget caps upstream timeouts, and steps with less than
+        # LLM_MIN_BUDGET seconds left are skipped in favour of local fallbacks
+        self.DEFAULT_REQUEST_TIMEOUT = float(os.getenv('DEFAULT_REQUEST_TIMEOUT', 0))  # 0 = no deadline
+        self.MAX_REQUEST_TIMEOUT = float(os.getenv('MAX_REQUEST_TIMEOUT', 300))
+        self.LLM_MIN_BUDGET = float(os.getenv('LLM_MIN_BUDGET', 0.5))
+        
+        # Model routing: each call picks a model tier (fast/default/large) from its
+        # caller's policy, the input size, its latency SLO and observed p95 latency.
+        # LLM_ROUTING_POLICY (JSON) overrides per-caller policies, e.g.
+        # {"sop.enhance": {"tiers": ["large", "default"], "slo": 30}}
+        self.LLM_ROUTING_POLICY = json.loads(os.getenv('LLM_ROUTING_POLICY', '') or '{}')
+        self.LLM_ROUTING_MIN_SAMPLES = int(os.getenv('LLM_ROUTING_MIN_SAMPLES', 10))
+        self.LLM_DEFAULT_CONTEXT_TOKENS = int(os.getenv('LLM_DEFAULT_CONTEXT_TOKENS', 32768))
+        self.LLM_MODEL_CONTEXT_TOKENS = {
+            'llama3-8b-8192': 8192,
+            'llama3-70b-8192': 8192,
+            'llama-3.1-8b-instant': 131072,
+            'llama-3.3-70b-versatile': 131072,
+            'gemini-1.5-flash': 1048576,
+            'gemini-1.5-pro': 2097152,
+            **json.loads(os.getenv('LLM_MODEL_CONTEXT_TOKENS', '') or '{}')
+        }
+        
         # Azure Document Intelligence
         self.AZURE_DOC_INTELLIGENCE_KEY = os.getenv('DOCUMENTINTELLIGENCE_API_KEY', '')
         self.AZURE_DOC_INTELLIGENCE_ENDPOINT = os.getenv(
@@ -28,18 +122,60 @@ class Config:
         
         # Gemini API (for SOP agent)
         self.GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+        self.GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+        self.GEMINI_LARGE_MODEL = os.getenv('GEMINI_LARGE_MODEL', self.GEMINI_MODEL)
+        self.GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT', '')  # e.g. a local stub server for benchmarks
         
         # Database
         self.DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///unicompass.db')
+        # SQLite connections are kept per thread in WAL mode; writers wait up to
+        # the busy timeout for the lock instead of failing with "database is locked"
+        self.SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+        self.SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+        self.SQLITE_STATEMENT_CACHE = int(os.getenv('SQLITE_STATEMENT_CACHE', 128))
+        self.SOP_CACHE_SIZE = int(os.getenv('SOP_CACHE_SIZE', 1024))
+        # Bulk SOP saves are one transaction; NDJSON imports commit every batch
+        self.SOP_BULK_MAX_DOCUMENTS = int(os.getenv('SOP_BULK_MAX_DOCUMENTS', 1000))
+        self.SOP_IMPORT_BATCH_SIZE = int(os.getenv('SOP_IMPORT_BATCH_SIZE', 500))
+        # Compressed revisions kept per SOP (older ones are pruned on save)
+        self.SOP_MAX_REVISIONS = int(os.getenv('SOP_MAX_REVISIONS', 50))
         
         # Cache settings
         self.CACHE_SIZE = int(os.getenv('CACHE_SIZE', 128))
         self.CACHE_TTL = int(os.getenv('CACHE_TTL', 3600))  # 1 hour
         
+        # Skill taxonomy (optional JSON file extending the built-in taxonomy)
+        self.SKILL_TAXONOMY_PATH = os.getenv('SKILL_TAXONOMY_PATH', '')
+        
+        # Batch resume scoring
+        self.BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', os.cpu_count() or 2))
+        self.BATCH_LLM_CONCURRENCY = int(os.getenv('BATCH_LLM_CONCURRENCY', 4))
+        self.BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', 500))
+        
+        # Persistent LLM response cache shared by all agents
+        self.LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+        self.LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', 'llm_cache.db')
+        self.LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', 7 * 24 * 3600))  # 1 week
+        self.LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 20000))
+        self.LLM_CACHE_MAX_MB = int(os.getenv('LLM_CACHE_MAX_MB', 200))
+        
+        # Near-duplicate (MinHash) reuse of SOP and resume LLM analyses
+        self.SEMANTIC_CACHE_ENABLED = os.getenv('SEMANTIC_CACHE_ENABLED', 'true').lower() == 'true'
+        self.SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.9))
+        self.SEMANTIC_CACHE_SIZE = int(os.getenv('SEMANTIC_CACHE_SIZE', 2048))
+        
+        # Near-copy detection against stored SOPs (persistent MinHash-LSH index)
+        self.SOP_SIMILARITY_ENABLED = os.getenv('SOP_SIMILARITY_ENABLED', 'true').lower() == 'true'
+        self.SOP_SIMILARITY_THRESHOLD = float(os.getenv('SOP_SIMILARITY_THRESHOLD', 0.5))
+        self.SOP_SIMILARITY_MAX_RESULTS = int(os.getenv('SOP_SIMILARITY_MAX_RESULTS', 5))
+        
         # File upload settings
         self.MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 16 * 1024 * 1024))  # 16MB
         self.UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', '/tmp/uploads')
         
+        # Text diff: largest combined original + revised input accepted by /api/diff
+        self.TEXT_DIFF_MAX_CHARS = int(os.getenv('TEXT_DIFF_MAX_CHARS', 200000))
+        
         # Scoring weights
         self.SCORING_WEIGHTS = {
             'keywords': 40,
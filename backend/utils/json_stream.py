@@ -0,0 +1,108 @@
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+_WHITESPACE = ' \t\r\n'
+
+
+class _Frame:
+    __slots__ = ('kind', 'key', 'start', 'member_key', 'expect_key')
+
+    def __init__(self, kind: str, key: Optional[str], start: int):
+        self.kind = kind  # 'object' or 'array'
+        self.key = key  # member name in the parent object
+        self.start = start
+        self.member_key: Optional[str] = None
+        self.expect_key = kind == 'object'
+
+
+class IncrementalJSONParser:
+    """Incremental scanner over a JSON document arriving in pieces.
+
+    `feed()` returns the (name, value) members of the object at `path` that
+    became complete with that piece, so e.g. each entry of
+    {"enhanced_sections": {...}} is available as soon as its closing quote
+    arrives. Text before the first '{' (such as a markdown fence) is skipped.
+    """
+
+    def __init__(self, path: Sequence[str]):
+        self.path = tuple(path)
+        self._text = ''
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._root_start: Optional[int] = None
+        self._root_end: Optional[int] = None
+        self._string_start: Optional[int] = None
+        self._escape = False
+        self._primitive_start: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        return self._root_end is not None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        members: List[Tuple[str, Any]] = []
+        self._text += chunk
+        text = self._text
+        while self._pos < len(text) and not self.complete:
+            i, c = self._pos, text[self._pos]
+            self._pos += 1
+
+            if self._string_start is not None:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    raw, self._string_start = text[self._string_start:i + 1], None
+                    frame = self._stack[-1]
+                    if frame.kind == 'object' and frame.expect_key:
+                        frame.member_key = json.loads(raw)
+                    else:
+                        self._value_done(raw, members)
+                continue
+
+            if self._root_start is None:
+                if c == '{':
+                    self._root_start = i
+                    self._stack.append(_Frame('object', None, i))
+                continue
+
+            if self._primitive_start is not None and (c in _WHITESPACE or c in ',]}'):
+                raw, self._primitive_start = text[self._primitive_start:i], None
+                self._value_done(raw, members)
+
+            if c in _WHITESPACE:
+                continue
+            frame = self._stack[-1]
+            if c == '"':
+                self._string_start = i
+            elif c in '{[':
+                key = frame.member_key if frame.kind == 'object' else None
+                self._stack.append(_Frame('object' if c == '{' else 'array', key, i))
+            elif c in '}]':
+                finished = self._stack.pop()
+                if not self._stack:
+                    self._root_end = i + 1
+                else:
+                    self._value_done(text[finished.start:i + 1], members)
+            elif c == ':':
+                frame.expect_key = False
+            elif c == ',':
+                frame.expect_key = frame.kind == 'object'
+            elif self._primitive_start is None:
+                self._primitive_start = i
+        return members
+
+    def _value_done(self, raw: str, members: List[Tuple[str, Any]]):
+        frame = self._stack[-1]
+        if frame.kind == 'object' and tuple(f.key for f in self._stack[1:]) == self.path:
+            try:
+                members.append((frame.member_key, json.loads(raw)))
+            except json.JSONDecodeError:
+                pass
+
+    def result(self) -> Any:
+        """The whole document, once complete (raises ValueError otherwise)"""
+        if not self.complete:
+            raise ValueError("JSON document is incomplete")
+        return json.loads(self._text[self._root_start:self._root_end])
@@ -0,0 +1,206 @@
+import hashlib
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils.config import Config
+from utils.metrics import metrics
+from utils.request_context import is_fresh_generation
+
+logger = logging.getLogger('unicompass.llm_cache')
+
+cache_requests = metrics.counter(
+    'unicompass_llm_cache_requests_total', 'LLM response cache lookups', ('caller', 'result')
+)
+
+# Expired entries are purged and size limits enforced every N writes
+PRUNE_INTERVAL = 50
+
+
+def normalize_prompt(prompt: Any) -> str:
+    """Canonical form of a prompt (string or chat messages) for cache keying"""
+    if not isinstance(prompt, str):
+        prompt = json.dumps(prompt, sort_keys=True, ensure_ascii=False)
+    return ' '.join(prompt.split())
+
+
+def make_cache_key(provider: str, model: str, temperature: Optional[float], prompt: Any) -> str:
+    material = f"{provider}|{model}|{temperature}|{normalize_prompt(prompt)}"
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def is_json_response(text: str) -> bool:
+    """True if text parses as JSON once optional markdown code fences are removed"""
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[-1] if '\n' in text else text[3:]
+    if text.endswith('```'):
+        text = text[:-3]
+    try:
+        json.loads(text)
+        return True
+    except ValueError:
+        return False
+
+
+class LLMCache:
+    """Persistent LLM response cache shared by every agent in the process.
+
+    Entries live in SQLite keyed by provider, model, temperature and the
+    normalized prompt hash, with a TTL and entry/byte limits enforced by
+    least-recently-used eviction.
+    """
+
+    def __init__(self, path: str, ttl: int = 86400, max_entries: int = 10000, max_bytes: int = 100 * 1024 * 1024,
+                 enabled: bool = True):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._local = threading.local()
+        self._writes = itertools.count(1)  # next() is atomic, so concurrent writers never skip a prune
+
+        if self.enabled:
+            try:
+                self._init_database()
+            except Exception as e:
+                logger.error(f"Failed to initialize LLM cache at {path}: {str(e)}")
+                self.enabled = False
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process (connections must not cross a fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_database(self):
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                caller TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)')
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connection()
+            now = time.time()
+            row = conn.execute(
+                'SELECT response FROM llm_cache WHERE key = ? AND expires_at > ?', (key, now)
+            ).fetchone()
+            if row:
+                conn.execute('UPDATE llm_cache SET last_access = ? WHERE key = ?', (now, key))
+                return row[0]
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {str(e)}")
+        return None
+
+    def set(self, key: str, response: str, provider: str, model: str, caller: str):
+        if not self.enabled:
+            return
+        try:
+            conn = self._connection()
+            now = time.time()
+            conn.execute('''
+                INSERT OR REPLACE INTO llm_cache
+                (key, provider, model, caller, response, size, created_at, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (key, provider, model, caller, response, len(response.encode('utf-8')), now, now + self.ttl, now))
+
+            if next(self._writes) % PRUNE_INTERVAL == 0:
+                self.prune()
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {str(e)}")
+
+    def prune(self):
+        """Drop expired entries, then evict least recently used ones over the size limits"""
+        conn = self._connection()
+        conn.execute('DELETE FROM llm_cache WHERE expires_at <= ?', (time.time(),))
+
+        count, total_bytes = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache').fetchone()
+        while count > self.max_entries or total_bytes > self.max_bytes:
+            excess = max(count - self.max_entries, 1)
+            conn.execute('''
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_access LIMIT ?
+                )
+            ''', (excess,))
+            count, total_bytes = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache').fetchone()
+
+    def get_or_call(self, caller: str, provider: str, model: str, temperature: Optional[float], prompt: Any,
+                    call: Callable[[], str], validate: Optional[Callable[[str], bool]] = None) -> str:
+        """Return the cached response for this prompt, or call the LLM and cache a valid result.
+
+        The cache is skipped (but refreshed) when the request asked for a fresh generation.
+        """
+        key = make_cache_key(provider, model, temperature, prompt)
+
+        if is_fresh_generation():
+            cache_requests.inc(caller=caller, result='bypass')
+        else:
+            cached = self.get(key)
+            if cached is not None:
+                cache_requests.inc(caller=caller, result='hit')
+                return cached
+            cache_requests.inc(caller=caller, result='miss')
+
+        response = call()
+        if response and (validate is None or validate(response)):
+            self.set(key, response, provider, model, caller)
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"enabled": self.enabled, "path": self.path, "callers": {}}
+        for (caller, result), count in cache_requests.values().items():
+            stats["callers"].setdefault(caller, {"hit": 0, "miss": 0, "bypass": 0})[result] = int(count)
+
+        if self.enabled:
+            try:
+                count, total_bytes = self._connection().execute(
+                    'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache'
+                ).fetchone()
+                stats.update({"entries": count, "bytes": total_bytes})
+            except Exception as e:
+                stats["error"] = str(e)
+        return stats
+
+
+_shared_cache: Optional[LLMCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_llm_cache(config: Config) -> LLMCache:
+    """Process-wide LLM cache shared by all services"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMCache(
+                path=config.LLM_CACHE_PATH,
+                ttl=config.LLM_CACHE_TTL,
+                max_entries=config.LLM_CACHE_MAX_ENTRIES,
+                max_bytes=config.LLM_CACHE_MAX_MB * 1024 * 1024,
+                enabled=config.LLM_CACHE_ENABLED
+            )
+        return _shared_cache
@@ -0,0 +1,111 @@
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, List, Optional, Sequence
+
+from utils.metrics import metrics
+from utils.request_context import DeadlineExceeded, mark_budget_exhausted, remaining_time
+
+logger = logging.getLogger('unicompass.micro_batcher')
+
+batch_sizes = metrics.histogram(
+    'unicompass_micro_batch_size', 'Items sent per micro-batch', ('batcher',),
+    buckets=(1, 2, 4, 8, 16, 32)
+)
+batch_items = metrics.counter(
+    'unicompass_micro_batch_items_total', 'Micro-batched items by outcome', ('batcher', 'outcome')
+)
+
+
+class _Batch:
+    __slots__ = ('items', 'futures', 'weight', 'sealed')
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.futures: List[Future] = []
+        self.weight = 0
+        self.sealed = threading.Event()
+
+
+class MicroBatcher:
+    """Groups concurrent submissions into one call to `send_batch`.
+
+    While no batch is in flight a submission is sent straight away; under load
+    (a batch already in flight) submissions collect for up to `max_wait`
+    seconds, `max_batch` items or `max_weight` total weight, whichever comes
+    first. The thread that opened a batch sends it and every submitter gets its
+    own entry of the returned list. Waiting is bounded by the request deadline.
+    """
+
+    def __init__(self, name: str, send_batch: Callable[[List[Any]], Sequence[Any]], max_batch: int = 8,
+                 max_wait: float = 0.01, max_weight: Optional[int] = None,
+                 weigh: Optional[Callable[[Any], int]] = None):
+        self.name = name
+        self.send_batch = send_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_weight = max_weight
+        self.weigh = weigh or (lambda item: 1)
+        self._open: Optional[_Batch] = None
+        self._sending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Any:
+        future: Future = Future()
+        weight = self.weigh(item)
+        with self._lock:
+            batch = self._open
+            if batch is not None and self.max_weight and batch.weight + weight > self.max_weight:
+                self._seal(batch)
+                batch = None
+            leader = batch is None
+            if leader:
+                batch = _Batch()
+                if self._sending:
+                    self._open = batch
+                else:
+                    # Nothing in flight: no reason to make this call wait
+                    batch.sealed.set()
+            batch.items.append(item)
+            batch.futures.append(future)
+            batch.weight += weight
+            if len(batch.items) >= self.max_batch:
+                self._seal(batch)
+
+        if leader:
+            batch.sealed.wait(self.max_wait)
+            with self._lock:
+                self._seal(batch)
+            self._send(batch)
+
+        try:
+            return future.result(timeout=remaining_time())
+        except FutureTimeout:
+            mark_budget_exhausted()
+            raise DeadlineExceeded(f"{self.name} batch outlived the request time budget")
+
+    def _seal(self, batch: _Batch):
+        if self._open is batch:
+            self._open = None
+        batch.sealed.set()
+
+    def _send(self, batch: _Batch):
+        with self._lock:
+            self._sending += 1
+        batch_sizes.observe(len(batch.items), batcher=self.name)
+        try:
+            results = list(self.send_batch(batch.items))
+            if len(results) != len(batch.items):
+                raise ValueError(f"{self.name} batch returned {len(results)} results for {len(batch.items)} items")
+        except Exception as e:
+            logger.warning(f"{self.name} batch of {len(batch.items)} failed: {str(e)}")
+            batch_items.inc(len(batch.items), batcher=self.name, outcome='error')
+            for future in batch.futures:
+                future.set_exception(e)
+        else:
+            batch_items.inc(len(batch.items), batcher=self.name, outcome='sent')
+            for future, result in zip(batch.futures, results):
+                future.set_result(result)
+        finally:
+            with self._lock:
+                self._sending -= 1
@@ -0,0 +1,101 @@
+import hashlib
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Hashable, List, Set
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Lowercased word n-grams; a one-word edit only touches `size` shingles"""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """MinHash signatures whose per-position agreement estimates Jaccard similarity"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        self.num_perm = num_perm
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str, shingle_size: int = 3) -> np.ndarray:
+        tokens = shingles(text, shingle_size)
+        if not tokens:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little') for token in tokens),
+            dtype=np.uint64, count=len(tokens)
+        )
+        # Universal hashing (a*x + b) mod p, one row per permutation; uint64 overflow wraps as intended
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return np.bitwise_and(permuted, _MAX_HASH).min(axis=1)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        return float(np.count_nonzero(first == second)) / len(first)
+
+
+class LSHIndex:
+    """Banded locality-sensitive hashing over MinHash signatures.
+
+    Documents sharing any band bucket become candidates, so a query touches
+    only the buckets of its own bands instead of every stored signature.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[bytes, Set[Hashable]]] = [defaultdict(set) for _ in range(bands)]
+        self._keys: Dict[Hashable, List[bytes]] = {}
+        self._lock = threading.Lock()
+
+    def band_hashes(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            hashlib.blake2b(signature[i * self.rows:(i + 1) * self.rows].tobytes(), digest_size=8).digest()
+            for i in range(self.bands)
+        ]
+
+    def insert(self, key: Hashable, signature: np.ndarray):
+        band_hashes = self.band_hashes(signature)
+        with self._lock:
+            self._remove_locked(key)
+            for band, bucket in enumerate(band_hashes):
+                self._buckets[band][bucket].add(key)
+            self._keys[key] = band_hashes
+
+    def remove(self, key: Hashable):
+        with self._lock:
+            self._remove_locked(key)
+
+    def _remove_locked(self, key: Hashable):
+        for band, bucket in enumerate(self._keys.pop(key, [])):
+            members = self._buckets[band].get(bucket)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._buckets[band][bucket]
+
+    def query(self, signature: np.ndarray) -> Set[Hashable]:
+        candidates: Set[Hashable] = set()
+        band_hashes = self.band_hashes(signature)
+        with self._lock:
+            for band, bucket in enumerate(band_hashes):
+                candidates.update(self._buckets[band].get(bucket, ()))
+        return candidates
+
+    def __len__(self) -> int:
+        return len(self._keys)
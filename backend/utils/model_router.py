@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from utils.config import Config
+from utils.metrics import metrics
+from utils.request_context import remaining_time
+
+logger = logging.getLogger('unicompass.model_router')
+
+route_decisions = metrics.counter(
+    'unicompass_llm_route_decisions_total', 'LLM model routing decisions', ('caller', 'model', 'reason')
+)
+model_latency = metrics.histogram(
+    'unicompass_llm_model_latency_seconds', 'LLM call latency per model', ('provider', 'model')
+)
+
+# Per caller: model tiers in order of preference, the latency SLO in seconds and,
+# optionally, an input size below which the fast tier is good enough
+DEFAULT_ROUTES: Dict[str, Dict[str, Any]] = {
+    'resume.insights': {'tiers': ['fast', 'default'], 'slo': 5},
+    'resume.section': {'tiers': ['fast', 'default'], 'slo': 5},
+    'resume.parse': {'tiers': ['default', 'fast'], 'slo': 10, 'fast_below_tokens': 600},
+    'resume.analyze': {'tiers': ['default', 'fast'], 'slo': 12, 'fast_below_tokens': 600},
+    'sop.analyze': {'tiers': ['default', 'fast'], 'slo': 10},
+    'sop.analyze.batch': {'tiers': ['default', 'large'], 'slo': 15},
+    'sop.paragraphs': {'tiers': ['fast', 'default'], 'slo': 8},
+    'sop.enhance': {'tiers': ['large', 'default'], 'slo': 30},
+    'sop.enhance.section': {'tiers': ['large', 'default'], 'slo': 15},
+}
+
+
+class ModelRouter:
+    """Picks a model per LLM call from the caller's route, the input size, the
+    latency SLO (tightened by the request deadline) and recently observed
+    per-model latency.
+
+    Tiers that cannot fit the input in their context window are skipped;
+    of the rest, the first whose recent p95 latency fits the time budget
+    wins, otherwise the one with the lowest p95.
+    """
+
+    def __init__(self, config: Config):
+        self.tiers = {
+            'groq': {'fast': config.GROQ_FAST_MODEL, 'default': config.GROQ_MODEL, 'large': config.GROQ_LARGE_MODEL},
+            'gemini': {'fast': config.GEMINI_MODEL, 'default': config.GEMINI_MODEL, 'large': config.GEMINI_LARGE_MODEL},
+        }
+        self.routes = {**DEFAULT_ROUTES, **config.LLM_ROUTING_POLICY}
+        self.context_tokens = config.LLM_MODEL_CONTEXT_TOKENS
+        self.default_context_tokens = config.LLM_DEFAULT_CONTEXT_TOKENS
+        self.min_samples = config.LLM_ROUTING_MIN_SAMPLES
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=200))
+        self._lock = threading.Lock()
+
+    def p95(self, model: str) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies.get(model, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[int(0.95 * (len(samples) - 1))]
+
+    def route(self, caller: str, provider: str, input_tokens: int, output_tokens: int = 0) -> str:
+        policy = self.routes.get(caller, {'tiers': ['default']})
+        models: List[str] = []
+        tier_names = list(policy['tiers'])
+        if input_tokens < policy.get('fast_below_tokens', 0) and 'fast' in tier_names:
+            tier_names.remove('fast')
+            tier_names.insert(0, 'fast')
+        for tier in tier_names:
+            model = self.tiers[provider].get(tier)
+            if model and model not in models:
+                models.append(model)
+
+        fitting = [
+            m for m in models
+            if input_tokens + output_tokens <= self.context_tokens.get(m, self.default_context_tokens)
+        ]
+        if not fitting:
+            # Nothing fits: the largest context window is the best chance
+            model = max(models, key=lambda m: self.context_tokens.get(m, self.default_context_tokens))
+            return self._decide(caller, model, 'context_overflow')
+
+        budget = policy.get('slo')
+        remaining = remaining_time()
+        if remaining is not None:
+            budget = remaining if budget is None else min(budget, remaining)
+
+        reason = 'preferred' if fitting[0] == models[0] else 'context'
+        if input_tokens < policy.get('fast_below_tokens', 0) and fitting[0] == self.tiers[provider].get('fast'):
+            reason = 'small_input'
+        if budget is None:
+            return self._decide(caller, fitting[0], reason)
+
+        for model in fitting:
+            observed = self.p95(model)
+            if observed is None or observed <= budget:
+                return self._decide(caller, model, reason if model == fitting[0] else 'latency')
+
+        # Every candidate is too slow for the budget; take the fastest one seen
+        return self._decide(caller, min(fitting, key=lambda m: self.p95(m)), 'fastest')
+
+    def _decide(self, caller: str, model: str, reason: str) -> str:
+        route_decisions.inc(caller=caller, model=model, reason=reason)
+        logger.debug(f"Routed {caller} to {model} ({reason})")
+        return model
+
+    @contextmanager
+    def timed(self, provider: str, model: str):
+        """Record the latency of a call to model, including failed and timed-out
+        calls, so a slow model's p95 is not hidden by its errors"""
+        start = time.time()
+        try:
+            yield
+        finally:
+            elapsed = time.time() - start
+            with self._lock:
+                self._latencies[model].append(elapsed)
+            model_latency.observe(elapsed, provider=provider, model=model)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = list(self._latencies)
+        return {
+            "tiers": self.tiers,
+            "p95_latency": {model: self.p95(model) for model in models}
+        }
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_model_router(config: Config) -> ModelRouter:
+    """Process-wide router, so latency observations are shared by all services"""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(config)
+        return _router
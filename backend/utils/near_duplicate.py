@@ -0,0 +1,100 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from utils.metrics import metrics
+from utils.minhash import MinHasher, LSHIndex
+from utils.request_context import request_deadline, submit_in_context
+
+logger = logging.getLogger('unicompass.near_duplicate')
+
+semantic_lookups = metrics.counter(
+    'unicompass_semantic_cache_requests_total', 'Near-duplicate LLM analysis cache lookups', ('namespace', 'result')
+)
+
+
+class NearDuplicateCache:
+    """Reuses LLM analyses of recently seen documents that are near-duplicates
+    of the submitted one (e.g. a single typo fix), using MinHash-LSH locally.
+
+    Entries are scoped by namespace (caller, model, prompt options) and the
+    least recently stored ones are dropped beyond `capacity`.
+    """
+
+    def __init__(self, capacity: int = 2048, threshold: float = 0.9, num_perm: int = 128, bands: int = 32,
+                 refresh_workers: int = 2):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.index = LSHIndex(num_perm=num_perm, bands=bands)
+        self._entries: "OrderedDict[str, Tuple[str, Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='semantic-refresh')
+
+    @staticmethod
+    def _entry_key(namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}|{' '.join(text.split())}".encode('utf-8')).hexdigest()
+
+    def lookup(self, namespace: str, text: str) -> Optional[Tuple[Any, float, bool]]:
+        """Best cached value for a similar document: (value, similarity, exact)"""
+        key = self._entry_key(namespace, text)
+        signature = self.hasher.signature(text)
+
+        best: Optional[Tuple[Any, float, bool]] = None
+        with self._lock:
+            exact = self._entries.get(key)
+            if exact is not None:
+                best = (exact[2], 1.0, True)
+            else:
+                for candidate in self.index.query(signature):
+                    entry = self._entries.get(candidate)
+                    if entry is None or entry[0] != namespace:
+                        continue
+                    similarity = MinHasher.similarity(signature, entry[1])
+                    if similarity >= self.threshold and (best is None or similarity > best[1]):
+                        best = (entry[2], similarity, False)
+
+        result = 'miss' if best is None else ('exact' if best[2] else 'approximate')
+        semantic_lookups.inc(namespace=namespace.split('|')[0], result=result)
+        return best
+
+    def store(self, namespace: str, text: str, value: Any):
+        key = self._entry_key(namespace, text)
+        signature = self.hasher.signature(text)
+        with self._lock:
+            self._entries[key] = (namespace, signature, value)
+            self._entries.move_to_end(key)
+            self.index.insert(key, signature)
+            while len(self._entries) > self.capacity:
+                evicted, _ = self._entries.popitem(last=False)
+                self.index.remove(evicted)
+
+    def schedule_refresh(self, namespace: str, text: str, compute: Callable[[], Any]):
+        """Compute a fresh value for text in the background and store it"""
+        key = self._entry_key(namespace, text)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                # The refresh outlives the request, so it must not inherit its deadline
+                with request_deadline(None):
+                    value = compute()
+                if value is not None:
+                    self.store(namespace, text, value)
+            except Exception as e:
+                logger.warning(f"Background refresh for {namespace.split('|')[0]} failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        submit_in_context(self._refresh_executor, refresh)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "capacity": self.capacity, "threshold": self.threshold}
@@ -0,0 +1,160 @@
+import contextvars
+import logging
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from functools import lru_cache
+from typing import Any, Callable, Iterator, List, Sequence, Tuple
+
+from utils.request_context import mark_budget_exhausted, remaining_time
+
+logger = logging.getLogger('unicompass.prompt_budget')
+
+# Lines that carry no content for the model (page furniture, stock phrases)
+BOILERPLATE_PATTERNS = [
+    re.compile(r'^page\s+\d+(\s+of\s+\d+)?$', re.IGNORECASE),
+    re.compile(r'^-\s*\d+\s*-$'),
+    re.compile(r'^references\s+(are\s+)?available\s+(up)?on\s+request\.?$', re.IGNORECASE),
+    re.compile(r'^(curriculum\s+vitae|resume|résumé|statement\s+of\s+purpose)$', re.IGNORECASE),
+]
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_INLINE_SPACE = re.compile(r'[ \t\u00a0\u200b]+')
+_BULLETS = re.compile(r'^[\u2022\u25cf\u25aa\u25e6\u2023\u2043\u2219*\-\u2013\u2014>]+\s*')
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (~4 characters or ~0.75 words per token)"""
+    if not text:
+        return 0
+    return max(len(text) // 4, int(len(text.split()) * 1.33))
+
+
+def compact_text(text: str) -> str:
+    """Collapse whitespace, normalise bullets and drop boilerplate and page header/footer lines.
+
+    A header or footer is a short line found among the first or last two lines
+    of every page (pages separated by form feeds; the first page may lack it).
+    Only those page-edge occurrences are dropped: a line that merely repeats
+    in the body, such as a job title or "Present", is content.
+    """
+    pages = [[_INLINE_SPACE.sub(' ', line).strip() for line in page.splitlines()] for page in text.split('\f')]
+
+    def edges(page: List[str]) -> List[int]:
+        filled = [i for i, line in enumerate(page) if line]
+        return sorted(set(filled[:2] + filled[-2:]))
+
+    page_edges = [edges(page) for page in pages]
+    furniture = set()
+    if len(pages) >= 2:
+        counts = Counter(line for page, indexes in zip(pages, page_edges) for line in {page[i] for i in indexes})
+        furniture = {line for line, count in counts.items() if len(line) < 60 and count >= max(2, len(pages) - 1)}
+
+    compacted: List[str] = []
+    for page, indexes in zip(pages, page_edges):
+        for i, line in enumerate(page):
+            if (i in indexes and line in furniture) or any(pattern.match(line) for pattern in BOILERPLATE_PATTERNS):
+                continue
+            line = _BULLETS.sub('- ', line) if _BULLETS.match(line) else line
+            if not line and (not compacted or not compacted[-1]):
+                continue
+            compacted.append(line)
+
+    return '\n'.join(compacted).strip()
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """Split text into chunks of at most max_tokens, preferring paragraph then sentence boundaries"""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    pieces: List[str] = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        if estimate_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            if estimate_tokens(sentence) <= max_tokens:
+                pieces.append(sentence)
+                continue
+            words = sentence.split()
+            step = max(int(max_tokens / 1.33), 1)
+            pieces.extend(' '.join(words[i:i + step]) for i in range(0, len(words), step))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append('\n\n'.join(current))
+
+    return chunks
+
+
+def fit_to_budget(text: str, max_tokens: int) -> str:
+    """Compact text and, if still over budget, keep the leading chunk"""
+    compacted = compact_text(text)
+    return chunk_text(compacted, max_tokens)[0]
+
+
+@lru_cache(maxsize=32)
+def _compacted_chunks(text: str, max_tokens: int) -> Tuple[str, ...]:
+    return tuple(chunk_text(compact_text(text), max_tokens))
+
+
+def prepare_chunks(text: str, max_tokens: int, max_chunks: int) -> List[str]:
+    """Compact text and split it into at most max_chunks budget-sized chunks
+    (dropping the rest; see exceeds_chunk_limit)"""
+    chunks = list(_compacted_chunks(text, max_tokens))
+    if len(chunks) > max_chunks:
+        logger.warning(f"Input needs {len(chunks)} chunks of {max_tokens} tokens, keeping the first {max_chunks}")
+        chunks = chunks[:max_chunks]
+    return chunks
+
+
+def exceeds_chunk_limit(text: str, max_tokens: int, max_chunks: int) -> bool:
+    """True when prepare_chunks() drops the end of text, so a chunked analysis
+    covers only its beginning"""
+    return len(_compacted_chunks(text, max_tokens)) > max_chunks
+
+
+def map_chunks(fn: Callable[[str], Any], chunks: Sequence[str]) -> List[Any]:
+    """Apply fn to every chunk concurrently, preserving order.
+
+    Chunks still running when the request's time budget runs out are
+    abandoned and yield None, so callers reduce over the partial results.
+    """
+    if len(chunks) == 1:
+        return [fn(chunks[0])]
+
+    results: List[Any] = [None] * len(chunks)
+    for index, result in iter_chunks(fn, chunks):
+        results[index] = result
+    return results
+
+
+def iter_chunks(fn: Callable[[Any], Any], chunks: Sequence[Any]) -> Iterator[Tuple[int, Any]]:
+    """Apply fn to every chunk concurrently, yielding (index, result) as each one finishes.
+
+    Stops early when the request's time budget runs out, abandoning the
+    chunks still running.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(chunks), thread_name_prefix='llm-chunk')
+    try:
+        futures = {executor.submit(contextvars.copy_context().run, fn, chunk): i for i, chunk in enumerate(chunks)}
+        finished = 0
+        try:
+            for future in as_completed(futures, timeout=remaining_time()):
+                finished += 1
+                yield futures[future], future.result()
+        except FutureTimeout:
+            mark_budget_exhausted()
+            logger.warning(f"Request budget exhausted: abandoning {len(chunks) - finished} of {len(chunks)} chunks")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
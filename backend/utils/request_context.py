@@ -0,0 +1,124 @@
+import contextvars
+import time
+from concurrent.futures import Executor, Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+# Set when the user explicitly asked for a fresh generation (skip LLM caches)
+_fresh_generation = contextvars.ContextVar('fresh_generation', default=False)
+
+
+@contextmanager
+def fresh_generation(enabled: bool = True):
+    """Bypass LLM response caches for calls made inside this block"""
+    token = _fresh_generation.set(bool(enabled))
+    try:
+        yield
+    finally:
+        _fresh_generation.reset(token)
+
+
+def is_fresh_generation() -> bool:
+    return _fresh_generation.get()
+
+
+def submit_in_context(executor: Executor, fn: Callable[..., Any], *args, **kwargs) -> Future:
+    """executor.submit that carries the caller's request context into the worker thread"""
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
+
+
+# Scheduling class for upstream calls: "interactive" requests are admitted before "batch" work
+_request_priority = contextvars.ContextVar('request_priority', default='interactive')
+
+
+@contextmanager
+def request_priority(priority: str):
+    """Run upstream calls made inside this block under the given priority class"""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def get_request_priority() -> str:
+    return _request_priority.get()
+
+
+class _TimeBudget:
+    """Deadline of one request, shared (not copied) by every thread working on it"""
+    __slots__ = ('deadline', 'exhausted')
+
+    def __init__(self, deadline: Optional[float]):
+        self.deadline = deadline
+        self.exhausted = False
+
+
+_time_budget = contextvars.ContextVar('request_time_budget', default=_TimeBudget(None))
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out before this step could run"""
+
+
+@contextmanager
+def request_deadline(deadline: Optional[float]):
+    """Bound work inside this block by an absolute time.time() deadline (None removes any deadline)"""
+    token = _time_budget.set(_TimeBudget(deadline))
+    try:
+        yield
+    finally:
+        _time_budget.reset(token)
+
+
+def set_request_deadline(deadline: Optional[float]):
+    """Set the deadline for the rest of the current request (called once per request)"""
+    _time_budget.set(_TimeBudget(deadline))
+
+
+def get_deadline() -> Optional[float]:
+    return _time_budget.get().deadline
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left in the request's budget (never negative), or None without a deadline"""
+    deadline = _time_budget.get().deadline
+    return None if deadline is None else max(0.0, deadline - time.time())
+
+
+def mark_budget_exhausted():
+    """Record that work was skipped or abandoned because the budget ran out"""
+    budget = _time_budget.get()
+    if budget.deadline is not None:
+        budget.exhausted = True
+
+
+def deadline_exceeded() -> bool:
+    """True once the request's budget has run out or cut any step short"""
+    budget = _time_budget.get()
+    return budget.exhausted or (budget.deadline is not None and time.time() >= budget.deadline)
+
+
+def time_budget(limit: float, minimum: float = 0.0) -> float:
+    """A timeout for the next step: `limit` capped by the remaining budget.
+
+    Raises DeadlineExceeded when no more than `minimum` seconds are left.
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return limit
+    if remaining <= minimum:
+        mark_budget_exhausted()
+        raise DeadlineExceeded(f"{remaining:.2f}s left in the request budget")
+    return min(limit, remaining)
+
+
+def result_within_budget(future: Future, default: Any = None) -> Any:
+    """future.result() bounded by the remaining budget; default if the budget runs out first"""
+    try:
+        return future.result(timeout=remaining_time())
+    except FutureTimeout:
+        future.cancel()
+        mark_budget_exhausted()
+        return default
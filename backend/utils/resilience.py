@@ -0,0 +1,283 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from typing import Any, Callable, Dict, Optional
+
+from utils.admission import get_limiter, upstream_slot
+from utils.config import Config
+from utils.metrics import metrics
+from utils.request_context import (
+    DeadlineExceeded, deadline_exceeded, mark_budget_exhausted, remaining_time, submit_in_context
+)
+
+logger = logging.getLogger('unicompass.resilience')
+
+upstream_calls = metrics.counter(
+    'unicompass_upstream_calls_total', 'Upstream LLM calls by outcome', ('provider', 'outcome')
+)
+upstream_latency = metrics.histogram(
+    'unicompass_upstream_latency_seconds', 'Upstream LLM call latency', ('provider',)
+)
+circuit_state = metrics.gauge(
+    'unicompass_circuit_state', 'Circuit breaker state (0 closed, 1 half-open, 2 open)', ('provider',)
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Error-rate and slow-call-rate circuit breaker over a sliding time window.
+
+    The circuit opens when, with at least `min_calls` in the window, the
+    failure rate or the rate of calls slower than `slow_call_seconds`
+    crosses its threshold. After `open_seconds` one probe call is let
+    through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, window_seconds: float = 60, min_calls: int = 5, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 20, slow_call_rate: float = 0.8, open_seconds: float = 30):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self._calls = deque()  # (finished_at, succeeded, duration)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_owner: Optional[int] = None
+        self._lock = threading.Lock()
+        circuit_state.set(0, provider=name)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.time() - self._opened_at >= self.open_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def _transition(self, state: str):
+        if state != self._state:
+            logger.warning(f"Circuit for {self.name} is now {state}")
+        self._state = state
+        if state == self.OPEN:
+            self._opened_at = time.time()
+        circuit_state.set(self._STATE_VALUES[state], provider=self.name)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.time() - self._opened_at < self.open_seconds:
+                    return False
+                self._transition(self.HALF_OPEN)
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+                self._probe_owner = threading.get_ident()
+            return True
+
+    def release_probe(self):
+        """Give up this thread's half-open probe without an outcome (the call was
+        abandoned for reasons of our own), so the next call can probe instead"""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probe_owner == threading.get_ident():
+                self._probe_in_flight = False
+                self._probe_owner = None
+
+    def record(self, succeeded: bool, duration: float):
+        now = time.time()
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                self._probe_owner = None
+                self._calls.clear()
+                self._transition(self.CLOSED if succeeded and not slow else self.OPEN)
+                return
+
+            self._calls.append((now, succeeded, duration))
+            while self._calls and self._calls[0][0] < now - self.window_seconds:
+                self._calls.popleft()
+
+            total = len(self._calls)
+            if self._state != self.CLOSED or total < self.min_calls:
+                return
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            slow_calls = sum(1 for _, _, took in self._calls if took >= self.slow_call_seconds)
+            if failures / total >= self.failure_rate or slow_calls / total >= self.slow_call_rate:
+                self._transition(self.OPEN)
+
+
+class ProviderGuard:
+    """Resilience wrapper for one LLM provider: concurrency limit, circuit
+    breaker and optional hedging.
+
+    While the circuit is open calls fail immediately with CircuitOpenError so
+    callers drop to their local fallbacks instead of holding a worker. With
+    hedging on, a second identical request is sent once the first has been
+    outstanding longer than the provider's recent p95 latency.
+    """
+
+    def __init__(self, provider: str, config: Config):
+        self.provider = provider
+        self.config = config
+        self.breaker = CircuitBreaker(
+            provider,
+            window_seconds=config.CIRCUIT_WINDOW_SECONDS,
+            min_calls=config.CIRCUIT_MIN_CALLS,
+            failure_rate=config.CIRCUIT_FAILURE_RATE,
+            slow_call_seconds=config.CIRCUIT_SLOW_CALL_SECONDS,
+            slow_call_rate=config.CIRCUIT_SLOW_CALL_RATE,
+            open_seconds=config.CIRCUIT_OPEN_SECONDS
+        )
+        self.breaker_enabled = config.CIRCUIT_BREAKER_ENABLED
+        self.hedge_enabled = config.LLM_HEDGE_ENABLED
+        self.hedge_min_delay = config.LLM_HEDGE_MIN_DELAY
+        self.hedge_min_samples = config.LLM_HEDGE_MIN_SAMPLES
+        self._latencies = deque(maxlen=256)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix=f'{self.provider}-hedge')
+            return self._executor
+
+    def hedge_delay(self) -> Optional[float]:
+        """Recent p95 latency once enough samples exist, floored at the minimum hedge delay"""
+        samples = sorted(self._latencies)
+        if len(samples) < self.hedge_min_samples:
+            return None
+        return max(samples[int(0.95 * (len(samples) - 1))], self.hedge_min_delay)
+
+    def call(self, fn: Callable[[], Any], hedge: bool = True) -> Any:
+        """Run fn under the provider's concurrency limit and circuit breaker
+        (hedge=False for calls with side effects, such as streaming to a client)"""
+        # An open circuit fails fast without queueing for a concurrency slot
+        if self.breaker_enabled and self.breaker.state == CircuitBreaker.OPEN:
+            self._short_circuit()
+        with upstream_slot(self.config, self.provider):
+            return self._call_guarded(fn, hedge)
+
+    def _short_circuit(self):
+        upstream_calls.inc(provider=self.provider, outcome='short_circuited')
+        raise CircuitOpenError(f"{self.provider} circuit is open")
+
+    def _call_guarded(self, fn: Callable[[], Any], hedge: bool = True) -> Any:
+        if self.breaker_enabled and not self.breaker.allow():
+            self._short_circuit()
+
+        start = time.time()
+        try:
+            result = self._call_hedged(fn) if self.hedge_enabled and hedge else fn()
+        except Exception as e:
+            duration = time.time() - start
+            if isinstance(e, DeadlineExceeded) or deadline_exceeded():
+                # Our own request budget ran out; that says nothing about the provider
+                self.breaker.release_probe()
+                upstream_calls.inc(provider=self.provider, outcome='deadline')
+                raise
+            self.breaker.record(False, duration)
+            upstream_calls.inc(provider=self.provider, outcome='error')
+            upstream_latency.observe(duration, provider=self.provider)
+            raise
+
+        duration = time.time() - start
+        self.breaker.record(True, duration)
+        self._latencies.append(duration)
+        upstream_calls.inc(provider=self.provider, outcome='success')
+        upstream_latency.observe(duration, provider=self.provider)
+        return result
+
+    def _call_hedged(self, fn: Callable[[], Any]) -> Any:
+        delay = self.hedge_delay()
+        if delay is None:
+            return fn()
+
+        primary = submit_in_context(self.executor, fn)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            if primary.done():
+                raise  # fn itself raised a TimeoutError
+
+        # The backup is a second upstream request, so it needs a concurrency slot of its own;
+        # with none free, keep waiting on the primary instead of exceeding the limit
+        limiter = get_limiter(self.config, self.provider)
+        acquired = limiter.try_acquire()
+        if acquired is None:
+            upstream_calls.inc(provider=self.provider, outcome='hedge_skipped')
+            return self._result_within_budget(primary)
+
+        def backup_call() -> Any:
+            try:
+                return fn()
+            finally:
+                limiter.release(acquired)
+
+        upstream_calls.inc(provider=self.provider, outcome='hedged')
+        backup = submit_in_context(self.executor, backup_call)
+        done, _ = wait([primary, backup], timeout=remaining_time(), return_when=FIRST_COMPLETED)
+        if not done:
+            self._deadline_exceeded()
+        first = done.pop()
+        if first.exception() is None:
+            return first.result()
+        # The first finisher failed; the other request may still succeed
+        return self._result_within_budget(backup if first is primary else primary)
+
+    def _result_within_budget(self, future) -> Any:
+        try:
+            return future.result(timeout=remaining_time())
+        except FutureTimeout:
+            if future.done():
+                raise
+            self._deadline_exceeded()
+
+    def _deadline_exceeded(self):
+        mark_budget_exhausted()
+        raise DeadlineExceeded(f"{self.provider} call outlived the request time budget")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.state if self.breaker_enabled else "disabled",
+            "hedging": self.hedge_enabled,
+            "hedge_delay": self.hedge_delay(),
+            "concurrency": get_limiter(self.config, self.provider).get_stats()
+        }
+
+
+_guards: Dict[str, ProviderGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    global _guards_lock
+    _guards.clear()
+    _guards_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_provider_guard(config: Config, provider: str) -> ProviderGuard:
+    """Process-wide guard for a provider, shared by every service calling it"""
+    with _guards_lock:
+        if provider not in _guards:
+            _guards[provider] = ProviderGuard(provider, config)
+        return _guards[provider]
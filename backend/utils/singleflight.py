@@ -0,0 +1,177 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from utils.metrics import metrics
+from utils.request_context import deadline_exceeded, mark_budget_exhausted, remaining_time
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-worker coalescing is unavailable
+    fcntl = None
+
+logger = logging.getLogger('unicompass.singleflight')
+
+coalesced_calls = metrics.counter(
+    'unicompass_singleflight_total', 'Service calls by whether they led or joined an identical in-flight call',
+    ('operation', 'role')
+)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def request_key(operation: str, *args, **kwargs) -> str:
+    """Hash of an operation and its arguments with whitespace in strings normalized"""
+    material = json.dumps([operation, _normalize(list(args)), _normalize(kwargs)], sort_keys=True, default=str)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'followers', 'partial')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+        self.partial = False
+
+
+def _is_partial(result: Any) -> bool:
+    return isinstance(result, dict) and result.get('partial') is True
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait and receive a copy of its result (or its exception). The
+    leader's result is copied before the leader gets it back, so what it does
+    with it never reaches the followers. A result cut short by the leader's
+    own deadline is not shared: each follower runs the call on its own budget.
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any], lock_dir: str = '', lock_timeout: float = 30) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+
+        if not leader:
+            coalesced_calls.inc(operation=self.operation, role='follower')
+            if not flight.done.wait(remaining_time()):
+                mark_budget_exhausted()
+                # Our time budget ran out first; answer on our own, which falls back locally
+                return fn()
+            if flight.partial:
+                coalesced_calls.inc(operation=self.operation, role='partial_rerun')
+                return fn()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        coalesced_calls.inc(operation=self.operation, role='leader')
+        result = None
+        try:
+            with worker_lock(lock_dir, key, lock_timeout):
+                result = fn()
+            return result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                followers = flight.followers
+            if followers:
+                flight.partial = deadline_exceeded() or _is_partial(result)
+                if flight.error is None and not flight.partial:
+                    flight.result = copy.deepcopy(result)
+            flight.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+@contextmanager
+def worker_lock(lock_dir: str, key: str, timeout: float):
+    """Serialize identical calls across worker processes with an advisory file lock.
+
+    The worker that waited then repeats the call, which is answered by the
+    shared LLM response cache the first worker has just filled. Keys share
+    4096 lock files, so unrelated calls rarely contend. Waiting gives up
+    after `timeout` seconds and the call proceeds unserialized.
+    """
+    if not lock_dir or fcntl is None:
+        yield
+        return
+
+    os.makedirs(lock_dir, exist_ok=True)
+    with open(os.path.join(lock_dir, f"{key[:3]}.lock"), 'a+') as handle:
+        budget = remaining_time()
+        deadline = time.time() + (timeout if budget is None else min(timeout, budget))
+        locked = False
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                locked = True
+                break
+            except BlockingIOError:
+                if time.time() >= deadline:
+                    logger.warning(f"Timed out waiting for cross-worker lock {key[:12]}")
+                    break
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if locked:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def coalesce(operation: str):
+    """Service method decorator: identical concurrent calls share one execution.
+
+    Coalescing is configured through the instance's `config`
+    (SINGLEFLIGHT_ENABLED, SINGLEFLIGHT_LOCK_DIR, SINGLEFLIGHT_LOCK_TIMEOUT).
+    """
+    group = SingleFlight(operation)
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            config = self.config
+            if not config.SINGLEFLIGHT_ENABLED:
+                return method(self, *args, **kwargs)
+            return group.do(
+                request_key(operation, *args, **kwargs),
+                lambda: method(self, *args, **kwargs),
+                lock_dir=config.SINGLEFLIGHT_LOCK_DIR,
+                lock_timeout=config.SINGLEFLIGHT_LOCK_TIMEOUT
+            )
+        wrapper.singleflight = group
+        return wrapper
+    return decorator
@@ -0,0 +1,285 @@
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models.data_models import Skill, SkillCategory
+
+logger = logging.getLogger('unicompass.skill_taxonomy')
+
+# Canonical skill name -> aliases. Aliases are matched case-insensitively on
+# token boundaries; the canonical name is always an alias of itself.
+DEFAULT_TAXONOMY: Dict[SkillCategory, Dict[str, List[str]]] = {
+    SkillCategory.LANGUAGE: {
+        "Python": ["python3", "py"],
+        "Java": [],
+        "JavaScript": ["js", "ecmascript", "es6"],
+        "TypeScript": ["ts"],
+        "C": [],
+        "C++": ["cpp", "c plus plus"],
+        "C#": ["c sharp", "csharp"],
+        "Go": ["golang"],
+        "Rust": [],
+        "Ruby": [],
+        "PHP": [],
+        "Swift": [],
+        "Kotlin": [],
+        "Scala": [],
+        "R": [],
+        "MATLAB": [],
+        "Perl": [],
+        "Dart": [],
+        "Haskell": [],
+        "SQL": [],
+        "Bash": ["shell scripting", "shell"],
+        "HTML": ["html5"],
+        "CSS": ["css3"],
+        "Solidity": [],
+        "Verilog": [],
+        "VHDL": [],
+        "Assembly": [],
+    },
+    SkillCategory.TECHNICAL: {
+        "Machine Learning": ["ml"],
+        "Deep Learning": [],
+        "Artificial Intelligence": ["ai"],
+        "Natural Language Processing": ["nlp"],
+        "Computer Vision": [],
+        "Reinforcement Learning": ["rl"],
+        "Large Language Models": ["llm", "llms"],
+        "Data Science": [],
+        "Data Analysis": ["data analytics"],
+        "Data Engineering": [],
+        "Data Visualization": [],
+        "Statistics": ["statistical analysis"],
+        "Big Data": [],
+        "Web Development": [],
+        "Frontend Development": ["front end development", "front-end development"],
+        "Backend Development": ["back end development", "back-end development"],
+        "Full Stack Development": ["full stack", "full-stack", "fullstack"],
+        "Mobile Development": [],
+        "REST APIs": ["rest api", "restful api", "restful apis", "rest"],
+        "GraphQL": [],
+        "Microservices": ["microservice"],
+        "Distributed Systems": [],
+        "Cloud Computing": [],
+        "DevOps": [],
+        "CI/CD": ["ci cd", "continuous integration", "continuous deployment"],
+        "Cybersecurity": ["cyber security", "information security", "infosec"],
+        "Networking": ["computer networks"],
+        "Operating Systems": [],
+        "Embedded Systems": [],
+        "Internet of Things": ["iot"],
+        "Blockchain": [],
+        "Algorithms": ["data structures and algorithms", "dsa"],
+        "Data Structures": [],
+        "Object-Oriented Programming": ["oop", "object oriented programming"],
+        "Database Design": [],
+        "System Design": [],
+        "Unit Testing": [],
+        "Signal Processing": [],
+        "Robotics": [],
+        "Bioinformatics": [],
+        "Quantum Computing": [],
+    },
+    SkillCategory.TOOL: {
+        "Node.js": ["nodejs", "node js", "node"],
+        "React": ["react.js", "reactjs", "react js"],
+        "Next.js": ["nextjs", "next js"],
+        "Angular": ["angularjs", "angular.js"],
+        "Vue.js": ["vue", "vuejs", "vue js"],
+        "Express.js": ["express", "expressjs"],
+        "Django": [],
+        "Flask": [],
+        "FastAPI": [],
+        "Spring Boot": ["spring", "springboot"],
+        ".NET": ["dotnet", "dot net", "asp.net"],
+        "TensorFlow": ["tensor flow"],
+        "PyTorch": ["torch"],
+        "Keras": [],
+        "scikit-learn": ["sklearn", "scikit learn"],
+        "Pandas": [],
+        "NumPy": [],
+        "SciPy": [],
+        "Matplotlib": [],
+        "Hugging Face": ["huggingface"],
+        "OpenCV": [],
+        "Apache Spark": ["spark", "pyspark"],
+        "Hadoop": [],
+        "Kafka": ["apache kafka"],
+        "Airflow": ["apache airflow"],
+        "Tableau": [],
+        "Power BI": ["powerbi"],
+        "Excel": ["microsoft excel", "ms excel"],
+        "MySQL": [],
+        "PostgreSQL": ["postgres"],
+        "SQLite": [],
+        "MongoDB": ["mongo"],
+        "Redis": [],
+        "Elasticsearch": ["elastic search"],
+        "Firebase": [],
+        "AWS": ["amazon web services"],
+        "Microsoft Azure": ["azure"],
+        "Google Cloud Platform": ["gcp", "google cloud"],
+        "Docker": [],
+        "Kubernetes": ["k8s"],
+        "Terraform": [],
+        "Ansible": [],
+        "Jenkins": [],
+        "GitHub Actions": [],
+        "Git": [],
+        "GitHub": [],
+        "GitLab": [],
+        "Linux": ["unix"],
+        "Jira": [],
+        "Figma": [],
+        "Postman": [],
+        "Selenium": [],
+        "Jupyter": ["jupyter notebook", "jupyter notebooks"],
+        "Unity": [],
+        "Android Studio": [],
+        "Flutter": [],
+        "React Native": [],
+        "Tailwind CSS": ["tailwind", "tailwindcss"],
+        "LaTeX": [],
+        "SolidWorks": [],
+        "AutoCAD": [],
+        "Arduino": [],
+        "Raspberry Pi": [],
+    },
+    SkillCategory.SOFT: {
+        "Leadership": ["team leadership"],
+        "Teamwork": ["team player", "collaboration", "collaborative"],
+        "Communication": ["communication skills", "verbal communication", "written communication"],
+        "Problem Solving": ["problem-solving", "problem solver"],
+        "Critical Thinking": [],
+        "Project Management": [],
+        "Time Management": [],
+        "Public Speaking": [],
+        "Mentoring": ["mentorship"],
+        "Adaptability": [],
+        "Creativity": [],
+        "Attention to Detail": ["detail oriented", "detail-oriented"],
+        "Analytical Skills": ["analytical thinking", "analytical"],
+        "Negotiation": [],
+        "Research": ["research skills"],
+        "Technical Writing": [],
+        "Agile": ["scrum", "agile methodologies"],
+    },
+}
+
+# Aliases that are ordinary English words (or single letters) only count when
+# they are capitalised in the source text, e.g. "Go" but not "go".
+CAPITALISED_ALIASES = {
+    "c", "r", "go", "rust", "swift", "dart", "ruby", "assembly", "node", "spring", "express",
+    "react", "unity", "excel", "spark", "flask", "research", "agile", "shell", "ai", "ml",
+    "rl", "ts", "js", "py", "rest", "angular", "vue", "torch", "mongo", "keras", "scala",
+}
+
+_TOKEN_PATTERN = re.compile(r"(?<![\w.])\.?[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9][a-z0-9+#]*)*", re.IGNORECASE)
+_SPLIT_PATTERN = re.compile(r"[\s\-/_]+")
+
+_TERMINAL = "$"
+
+
+def _tokenize_alias(alias: str) -> List[str]:
+    """Split a taxonomy alias into the lowercase tokens used as trie keys"""
+    tokens = []
+    for part in _SPLIT_PATTERN.split(alias.strip()):
+        tokens.extend(match.group().lower() for match in _TOKEN_PATTERN.finditer(part))
+    return tokens
+
+
+class SkillTrie:
+    """Token-level trie mapping every skill alias to its canonical Skill.
+
+    Matching walks the resume tokens once, taking the longest alias that
+    starts at each position, so the cost is linear in the text length and
+    independent of the taxonomy size.
+    """
+
+    def __init__(self):
+        self.root: Dict[str, dict] = {}
+        self.size = 0
+        self.max_depth = 0
+
+    @classmethod
+    def from_taxonomy(cls, taxonomy: Dict[SkillCategory, Dict[str, List[str]]]) -> 'SkillTrie':
+        trie = cls()
+        for category, skills in taxonomy.items():
+            for canonical, aliases in skills.items():
+                trie.add(canonical, SkillCategory(category), aliases)
+        return trie
+
+    @classmethod
+    def from_file(cls, path: str, base: Optional[Dict[SkillCategory, Dict[str, List[str]]]] = None) -> 'SkillTrie':
+        """Build a trie from a JSON taxonomy file ({category: {canonical: [aliases]}})"""
+        with open(path, 'r', encoding='utf-8') as f:
+            extra = json.load(f)
+
+        trie = cls.from_taxonomy(base or {})
+        for category, skills in extra.items():
+            for canonical, aliases in skills.items():
+                trie.add(canonical, SkillCategory(category), aliases)
+        return trie
+
+    def add(self, canonical: str, category: SkillCategory, aliases: Iterable[str] = ()):
+        """Register a canonical skill and its aliases"""
+        for alias in {canonical, *aliases}:
+            tokens = _tokenize_alias(alias)
+            if not tokens:
+                continue
+
+            node = self.root
+            for token in tokens:
+                node = node.setdefault(token, {})
+
+            capitalised = alias.lower() in CAPITALISED_ALIASES
+            node[_TERMINAL] = (canonical, category, capitalised)
+            self.size += 1
+            self.max_depth = max(self.max_depth, len(tokens))
+
+    def extract(self, text: str) -> List[Skill]:
+        """Return canonical skills found in text, in order of first appearance"""
+        tokens: List[Tuple[str, int, int]] = [
+            (match.group().lower(), match.start(), match.end())
+            for match in _TOKEN_PATTERN.finditer(text)
+        ]
+
+        found: Dict[str, Skill] = {}
+        i = 0
+        while i < len(tokens):
+            node = self.root
+            best = None
+            j = i
+            while j < len(tokens) and tokens[j][0] in node:
+                node = node[tokens[j][0]]
+                j += 1
+                terminal = node.get(_TERMINAL)
+                if terminal and (not terminal[2] or text[tokens[i][1]].isupper()):
+                    best = (terminal, j)
+
+            if best:
+                (canonical, category, _), end = best
+                if canonical not in found:
+                    found[canonical] = Skill(name=canonical, category=category)
+                i = end
+            else:
+                i += 1
+
+        return list(found.values())
+
+
+@lru_cache(maxsize=None)
+def get_skill_trie(taxonomy_path: Optional[str] = None) -> SkillTrie:
+    """Compiled trie for the built-in taxonomy, optionally extended from a JSON file"""
+    if taxonomy_path:
+        try:
+            trie = SkillTrie.from_file(taxonomy_path, base=DEFAULT_TAXONOMY)
+            logger.info(f"Loaded skill taxonomy with {trie.size} aliases from {taxonomy_path}")
+            return trie
+        except Exception as e:
+            logger.warning(f"Failed to load skill taxonomy from {taxonomy_path}: {str(e)}")
+
+    return SkillTrie.from_taxonomy(DEFAULT_TAXONOMY)
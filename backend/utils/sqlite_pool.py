@@ -0,0 +1,79 @@
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict
+
+logger = logging.getLogger('unicompass.sqlite_pool')
+
+
+class SQLitePool:
+    """Per-thread SQLite connections, tuned for concurrent gunicorn workers.
+
+    Each thread of each process keeps one connection (connections never cross
+    a fork), opened in autocommit mode with WAL journaling, the configured
+    `synchronous` level and a busy timeout, and a prepared-statement cache of
+    `statement_cache` entries. Writes go through `transaction()`, which takes
+    the write lock up front (BEGIN IMMEDIATE) so concurrent writers queue on
+    the busy timeout instead of failing on a lock upgrade.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000, synchronous: str = 'NORMAL',
+                 statement_cache: int = 128):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self.statement_cache = statement_cache
+        self._local = threading.local()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            isolation_level=None,
+            cached_statements=self.statement_cache
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        with self._lock:
+            self._opened += 1
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction on this thread's connection, committed on success"""
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def data_version(self) -> int:
+        """Changes whenever another connection commits to the database"""
+        return self.connection().execute('PRAGMA data_version').fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "connections_opened": self._opened,
+            "journal_mode": self.connection().execute('PRAGMA journal_mode').fetchone()[0],
+            "synchronous": self.synchronous,
+            "busy_timeout_ms": self.busy_timeout_ms
+        }
@@ -0,0 +1,249 @@
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+# Words (with inner apostrophes/hyphens), runs of whitespace and single punctuation marks;
+# joining the tokens gives back the text exactly
+_TOKEN = re.compile(r"\w+(?:['’-]\w+)*|\s+|[^\w\s]")
+
+# Regions whose edit distance exceeds this are reported as one replacement instead of
+# being aligned word by word (bounds the O((N+M)·D) Myers search on unrelated text)
+MAX_EDIT_COST = 500
+
+Opcode = Tuple[str, int, int, int, int]  # (tag, a_start, a_end, b_start, b_end); tag is '=', '-', '+'
+Op = List[Union[str, int]]
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text)
+
+
+def diff_tokens(a: Sequence[str], b: Sequence[str], max_edit_cost: int = MAX_EDIT_COST) -> List[Opcode]:
+    """Minimal-ish edit script between two token sequences.
+
+    Patience diff first: tokens occurring exactly once on both sides are matched
+    along their longest increasing subsequence and become anchors, which keeps
+    rewritten prose aligned on its distinctive words. The gaps between anchors
+    are aligned with Myers' linear-space (middle snake) algorithm.
+    """
+    opcodes: List[Opcode] = []
+    _patience(a, 0, len(a), b, 0, len(b), opcodes, max_edit_cost)
+    return _merge(opcodes)
+
+
+def _emit(opcodes: List[Opcode], tag: str, alo: int, ahi: int, blo: int, bhi: int):
+    if ahi > alo or bhi > blo:
+        opcodes.append((tag, alo, ahi, blo, bhi))
+
+
+def _patience(a, alo, ahi, b, blo, bhi, opcodes, max_edit_cost):
+    start = alo
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        alo += 1
+        blo += 1
+    _emit(opcodes, '=', start, alo, blo - (alo - start), blo)
+    suffix = 0
+    while ahi - suffix > alo and bhi - suffix > blo and a[ahi - suffix - 1] == b[bhi - suffix - 1]:
+        suffix += 1
+    ahi, bhi = ahi - suffix, bhi - suffix
+
+    anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+    if not anchors:
+        _myers(a, alo, ahi, b, blo, bhi, opcodes, max_edit_cost)
+    else:
+        for i, j in anchors:
+            _patience(a, alo, i, b, blo, j, opcodes, max_edit_cost)
+            _emit(opcodes, '=', i, i + 1, j, j + 1)
+            alo, blo = i + 1, j + 1
+        _patience(a, alo, ahi, b, blo, bhi, opcodes, max_edit_cost)
+    _emit(opcodes, '=', ahi, ahi + suffix, bhi, bhi + suffix)
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi) -> List[Tuple[int, int]]:
+    """Longest increasing run of (i, j) pairs whose token is unique in both ranges"""
+    counts_a = Counter(a[alo:ahi])
+    counts_b = Counter(b[blo:bhi])
+    positions_b = {b[j]: j for j in range(blo, bhi) if counts_b[b[j]] == 1 and counts_a.get(b[j]) == 1}
+    pairs = [(i, positions_b[a[i]]) for i in range(alo, ahi) if a[i] in positions_b]
+    if not pairs:
+        return []
+
+    # Patience sorting over the b positions (already in a order)
+    tails: List[int] = []
+    tail_index: List[int] = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        pile = bisect_left(tails, j)
+        if pile == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[pile] = j
+            tail_index[pile] = index
+        previous[index] = tail_index[pile - 1] if pile else -1
+
+    chain = []
+    index = tail_index[-1]
+    while index >= 0:
+        chain.append(pairs[index])
+        index = previous[index]
+    return chain[::-1]
+
+
+def _myers(a, alo, ahi, b, blo, bhi, opcodes, max_edit_cost):
+    while True:
+        # Trimming the common ends leaves every split strictly smaller (a one-edit
+        # region becomes one empty side)
+        start = alo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        _emit(opcodes, '=', start, alo, blo - (alo - start), blo)
+        suffix = 0
+        while ahi - suffix > alo and bhi - suffix > blo and a[ahi - suffix - 1] == b[bhi - suffix - 1]:
+            suffix += 1
+        if suffix:
+            # Emitted after the region: recurse on the remainder and close with the suffix
+            _myers(a, alo, ahi - suffix, b, blo, bhi - suffix, opcodes, max_edit_cost)
+            _emit(opcodes, '=', ahi - suffix, ahi, bhi - suffix, bhi)
+            return
+        if alo == ahi or blo == bhi:
+            _emit(opcodes, '-', alo, ahi, blo, blo)
+            _emit(opcodes, '+', ahi, ahi, blo, bhi)
+            return
+        snake = _middle_snake(a, alo, ahi, b, blo, bhi, max_edit_cost)
+        if snake is None:
+            _emit(opcodes, '-', alo, ahi, blo, blo)
+            _emit(opcodes, '+', ahi, ahi, blo, bhi)
+            return
+        x0, y0, x1, y1 = snake
+        _myers(a, alo, x0, b, blo, y0, opcodes, max_edit_cost)
+        _emit(opcodes, '=', x0, x1, y0, y1)
+        # Tail call on the right half, iteratively
+        alo, blo = x1, y1
+
+
+def _middle_snake(a, alo, ahi, b, blo, bhi, max_edit_cost):
+    """The middle snake (x0, y0, x1, y1) of an optimal path through a[alo:ahi] vs
+    b[blo:bhi], found by running the greedy search from both ends until the
+    frontiers overlap; None when the edit distance exceeds max_edit_cost"""
+    n, m = ahi - alo, bhi - blo
+    delta = n - m
+    odd = delta & 1
+    limit = min((n + m + 1) // 2, (max_edit_cost + 1) // 2)
+    offset = limit + 1
+    forward = [0] * (2 * limit + 3)
+    backward = [0] * (2 * limit + 3)
+
+    for d in range(limit + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if odd and delta - (d - 1) <= k <= delta + (d - 1) and x + backward[offset + delta - k] >= n:
+                return alo + x0, blo + y0, alo + x, blo + y
+
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if not odd and -d <= delta - k <= d and x + forward[offset + delta - k] >= n:
+                return ahi - x, bhi - y, ahi - x0, bhi - y0
+    return None
+
+
+def _merge(opcodes: List[Opcode]) -> List[Opcode]:
+    merged: List[Opcode] = []
+    for tag, alo, ahi, blo, bhi in opcodes:
+        if merged and merged[-1][0] == tag:
+            merged[-1] = (tag, merged[-1][1], ahi, merged[-1][3], bhi)
+        else:
+            merged.append((tag, alo, ahi, blo, bhi))
+    return merged
+
+
+def diff_text(original: str, revised: str, max_edit_cost: int = MAX_EDIT_COST) -> Dict[str, Any]:
+    """Word-level diff of two texts as compact operations over the original.
+
+    `ops` is a list of ["=", n] (keep the next n characters of the original),
+    ["-", n] (drop the next n characters) and ["+", text] (insert text); within
+    a change the deletion comes first. Whitespace-only runs between two changes
+    are folded into them so a rewritten phrase reads as one replacement.
+    `stats` counts inserted, deleted and unchanged words.
+    """
+    a, b = tokenize(original), tokenize(revised)
+    blocks: List[List[Any]] = []  # ['=', a tokens] or ['~', a tokens, b tokens]
+    for tag, alo, ahi, blo, bhi in diff_tokens(a, b, max_edit_cost):
+        if tag == '=':
+            blocks.append(['=', a[alo:ahi]])
+        elif blocks and blocks[-1][0] == '~':
+            blocks[-1][1].extend(a[alo:ahi])
+            blocks[-1][2].extend(b[blo:bhi])
+        else:
+            blocks.append(['~', a[alo:ahi], b[blo:bhi]])
+
+    # Fold whitespace-only equalities sandwiched between changes
+    folded: List[List[Any]] = []
+    for index, block in enumerate(blocks):
+        between_changes = 0 < index < len(blocks) - 1 and folded and folded[-1][0] == '~' and blocks[index + 1][0] == '~'
+        if block[0] == '=' and between_changes and all(token.isspace() for token in block[1]):
+            folded[-1][1].extend(block[1])
+            folded[-1][2].extend(block[1])
+        elif block[0] == '~' and folded and folded[-1][0] == '~':
+            folded[-1][1].extend(block[1])
+            folded[-1][2].extend(block[2])
+        else:
+            folded.append(block)
+
+    ops: List[Op] = []
+    stats = {"inserted_words": 0, "deleted_words": 0, "unchanged_words": 0}
+    for block in folded:
+        if block[0] == '=':
+            ops.append(['=', sum(len(token) for token in block[1])])
+            stats["unchanged_words"] += _word_count(block[1])
+        else:
+            deleted, inserted = ''.join(block[1]), ''.join(block[2])
+            if deleted:
+                ops.append(['-', len(deleted)])
+            if inserted:
+                ops.append(['+', inserted])
+            stats["deleted_words"] += _word_count(block[1])
+            stats["inserted_words"] += _word_count(block[2])
+
+    total = stats["unchanged_words"] + max(stats["deleted_words"], stats["inserted_words"])
+    stats["similarity"] = round(stats["unchanged_words"] / total, 3) if total else 1.0
+    return {"ops": ops, "stats": stats}
+
+
+def _word_count(tokens: Sequence[str]) -> int:
+    return sum(1 for token in tokens if token[0].isalnum() or token[0] == '_')
+
+
+def apply_ops(original: str, ops: Sequence[Op]) -> str:
+    """Rebuild the revised text from the original and diff_text() ops"""
+    parts: List[str] = []
+    position = 0
+    for tag, value in ops:
+        if tag == '=':
+            parts.append(original[position:position + value])
+            position += value
+        elif tag == '-':
+            position += value
+        else:
+            parts.append(value)
+    return ''.join(parts)
@@ -0,0 +1,199 @@
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+# Words that never count towards repetition or keyword statistics
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her
+here hers herself him himself his how i if in into is it its itself just me more most my myself no nor not
+now of off on once only or other our ours ourselves out over own same she should so some such than that the
+their theirs them themselves then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours yourself yourselves also well many
+much one two three may might must shall us
+""".split())
+
+POSITIVE_WORDS = frozenset("""
+passion passionate excited exciting enthusiastic enthusiasm motivated motivation dedicated dedication committed
+commitment eager inspire inspired inspiring dream love loved enjoy enjoyed curious curiosity fascinated
+fascinating thrilled proud accomplish accomplished achievement achieve achieved success successful succeed
+confident determined rewarding fulfilling excellent outstanding strong strength opportunity grateful
+privilege innovative creative impact meaningful excel excelled thrive aspire aspiration eagerly delighted
+""".split())
+
+NEGATIVE_WORDS = frozenset("""
+fail failed failure struggle struggled struggling difficult difficulty problem problems poor weak weakness
+unfortunately hard hardship lack lacked lacking bad worse worst afraid fear anxious doubt doubted unable
+frustrated frustrating disappointed disappointing mistake mistakes regret boring bored lost reject rejected
+""".split())
+
+NEGATIONS = frozenset("not no never neither nor without hardly barely n't".split())
+
+# Statement-of-purpose topics and the words that show a paragraph covers them
+SOP_KEYWORDS: Dict[str, frozenset] = {
+    "research": frozenset("research researched lab laboratory experiment experiments thesis publication "
+                          "published paper papers hypothesis investigated methodology".split()),
+    "academics": frozenset("coursework course courses gpa degree undergraduate bachelor major curriculum "
+                           "academic grades semester".split()),
+    "experience": frozenset("experience internship intern project projects worked developed built led "
+                            "managed implemented".split()),
+    "goals": frozenset("goal goals future career aspire aspiration plan plans aim pursue long-term".split()),
+    "motivation": frozenset("passion passionate motivated motivation curious curiosity inspired fascinated "
+                            "interest interested".split()),
+    "program_fit": frozenset("program faculty professor professors department university curriculum "
+                             "opportunity resources".split()),
+    "skills": frozenset("skill skills proficient programming analysis analytical technical leadership "
+                        "communication teamwork".split()),
+}
+
+_KEYWORD_TOPICS: Dict[str, List[str]] = {}
+for _topic, _keywords in SOP_KEYWORDS.items():
+    for _keyword in _keywords:
+        _KEYWORD_TOPICS.setdefault(_keyword, []).append(_topic)
+
+_TOKEN = re.compile(r"[A-Za-z]+(?:['’-][A-Za-z]+)*|\d+(?:[.,]\d+)*|[.!?]+")
+_VOWEL_GROUPS = re.compile(r'[aeiouy]+')
+_BE_VERBS = frozenset("am is are was were be been being".split())
+_IRREGULAR_PARTICIPLES = frozenset("""
+built done given taken made written known shown seen chosen driven begun drawn grown held kept led left lost
+met paid read run said sent set spent taught thought told understood won brought bought caught found heard
+""".split())
+LONG_SENTENCE_WORDS = 30
+
+
+def count_syllables(word: str) -> int:
+    """Heuristic English syllable count (vowel groups, silent trailing e)"""
+    word = word.lower().strip("'’")
+    if len(word) <= 3:
+        return 1
+    if word.endswith('e') and not word.endswith(('le', 'ee', 'ye')):
+        word = word[:-1]
+    return max(1, len(_VOWEL_GROUPS.findall(word)))
+
+
+def _is_participle(word: str) -> bool:
+    return word in _IRREGULAR_PARTICIPLES or (len(word) > 3 and word.endswith(('ed', 'en')))
+
+
+def _percentile(values: List[int], fraction: float) -> float:
+    ordered = sorted(values)
+    return float(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))])
+
+
+def analyze_text(text: str) -> Dict[str, Any]:
+    """Readability, sentence-length, passive-voice, repetition, sentiment and
+    keyword-coverage metrics for a piece of prose, from one pass over its tokens.
+
+    Readability indices follow their standard formulas (Flesch reading ease,
+    Flesch-Kincaid grade, Gunning fog, SMOG, Coleman-Liau, ARI) over heuristic
+    syllable counts. Sentiment is lexicon-based in [0, 1] (0.5 neutral), with a
+    negation in the three preceding words flipping a term's polarity.
+    """
+    sentence_lengths: List[int] = []
+    content_counts: Counter = Counter()
+    sentence_starts: Counter = Counter()
+    keyword_hits: Counter = Counter()
+    words = letters = syllables = complex_words = passive_sentences = 0
+    positive = negative = 0
+    current = 0
+    sentence_passive = False
+    previous: List[str] = []
+
+    for match in _TOKEN.finditer(text):
+        token = match.group()
+        if token[0] in '.!?':
+            if current:
+                sentence_lengths.append(current)
+                passive_sentences += sentence_passive
+            current, sentence_passive, previous = 0, False, []
+            continue
+
+        lower = token.lower()
+        words += 1
+        current += 1
+        if lower[0].isalpha():
+            letters += sum(c.isalpha() for c in token)
+            word_syllables = count_syllables(lower)
+            syllables += word_syllables
+            complex_words += word_syllables >= 3 and '-' not in lower
+        else:
+            letters += len(token)
+            syllables += 1
+
+        if current == 1:
+            sentence_starts[lower] += 1
+        if lower not in STOPWORDS and len(lower) > 2:
+            content_counts[lower] += 1
+        for topic in _KEYWORD_TOPICS.get(lower, ()):
+            keyword_hits[topic] += 1
+
+        if _is_participle(lower) and (
+            (previous and previous[-1] in _BE_VERBS) or
+            (len(previous) > 1 and previous[-2] in _BE_VERBS and previous[-1].endswith('ly'))
+        ):
+            sentence_passive = True
+
+        polarity = 1 if lower in POSITIVE_WORDS else -1 if lower in NEGATIVE_WORDS else 0
+        if polarity and any(w in NEGATIONS or w.endswith("n't") for w in previous[-3:]):
+            polarity = -polarity
+        positive += polarity > 0
+        negative += polarity < 0
+        previous.append(lower)
+
+    if current:
+        sentence_lengths.append(current)
+        passive_sentences += sentence_passive
+
+    sentences = len(sentence_lengths)
+    if not words or not sentences:
+        return {"word_count": 0, "sentence_count": 0, "readability": {}, "sentence_length": {},
+                "passive_voice_ratio": 0.0, "repetition": {}, "sentiment": 0.5, "keyword_coverage": {}}
+
+    words_per_sentence = words / sentences
+    syllables_per_word = syllables / words
+    letters_per_100 = letters / words * 100
+    sentences_per_100 = sentences / words * 100
+    mean_length = words / sentences
+    variance = sum((n - mean_length) ** 2 for n in sentence_lengths) / sentences
+    content_total = sum(content_counts.values())
+    overused = [
+        {"word": word, "count": count}
+        for word, count in content_counts.most_common(10)
+        if count >= 3 and count / max(content_total, 1) >= 0.015
+    ][:5]
+
+    return {
+        "word_count": words,
+        "sentence_count": sentences,
+        "readability": {
+            "flesch_reading_ease": round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 1),
+            "flesch_kincaid_grade": round(0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 1),
+            "gunning_fog": round(0.4 * (words_per_sentence + 100 * complex_words / words), 1),
+            "smog": round(1.043 * math.sqrt(complex_words * 30 / sentences) + 3.1291, 1),
+            "coleman_liau": round(0.0588 * letters_per_100 - 0.296 * sentences_per_100 - 15.8, 1),
+            "automated_readability": round(4.71 * letters / words + 0.5 * words_per_sentence - 21.43, 1),
+        },
+        "sentence_length": {
+            "mean": round(mean_length, 1),
+            "median": _percentile(sentence_lengths, 0.5),
+            "stdev": round(math.sqrt(variance), 1),
+            "p90": _percentile(sentence_lengths, 0.9),
+            "max": max(sentence_lengths),
+            "long_sentence_ratio": round(sum(n > LONG_SENTENCE_WORDS for n in sentence_lengths) / sentences, 3),
+        },
+        "passive_voice_ratio": round(passive_sentences / sentences, 3),
+        "repetition": {
+            "lexical_diversity": round(len(content_counts) / max(content_total, 1), 3),
+            "overused_words": overused,
+            "repeated_openers": [
+                word for word, count in sentence_starts.most_common(3) if count >= 3 and count / sentences >= 0.2
+            ],
+        },
+        "sentiment": round(0.5 + 0.5 * (positive - negative) / (positive + negative), 3) if positive + negative else 0.5,
+        "keyword_coverage": {
+            "covered": [topic for topic in SOP_KEYWORDS if keyword_hits[topic]],
+            "missing": [topic for topic in SOP_KEYWORDS if not keyword_hits[topic]],
+            "ratio": round(sum(1 for topic in SOP_KEYWORDS if keyword_hits[topic]) / len(SOP_KEYWORDS), 3),
+        },
+    }
@@ -0,0 +1,131 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import google.generativeai as genai
+import httpx
+import requests
+from azure.ai.formrecognizer import DocumentAnalysisClient
+from azure.core.credentials import AzureKeyCredential
+from azure.core.pipeline.transport import RequestsTransport
+from groq import Groq
+from requests.adapters import HTTPAdapter
+
+from utils.config import Config
+from utils.request_context import time_budget
+
+logger = logging.getLogger('unicompass.upstream')
+
+# One pooled client per upstream per process; never shared across a fork
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+# A client whose initialization raised is retried after this many seconds
+INIT_RETRY_SECONDS = 30
+_failed_at: Dict[str, float] = {}
+
+
+def _reset_after_fork():
+    global _clients_lock
+    _clients.clear()
+    _failed_at.clear()
+    _clients_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _get_or_create(name: str, factory: Callable[[], Any]) -> Any:
+    """The cached client, creating it on first use. A factory that raises (DNS,
+    a transient startup error) caches nothing: the provider is unavailable
+    until the next attempt, at most every INIT_RETRY_SECONDS."""
+    if name in _clients:
+        return _clients[name]
+    with _clients_lock:
+        if name in _clients:
+            return _clients[name]
+        if time.time() - _failed_at.get(name, 0.0) < INIT_RETRY_SECONDS:
+            return None
+        try:
+            client = factory()
+        except Exception as e:
+            logger.error(f"Failed to initialize {name} client, retrying in {INIT_RETRY_SECONDS}s: {str(e)}")
+            _failed_at[name] = time.time()
+            return None
+        _failed_at.pop(name, None)
+        _clients[name] = client
+        if client is not None:
+            logger.info(f"{name} client initialized (pid {os.getpid()})")
+        return client
+
+
+def get_groq_client(config: Config) -> Optional[Groq]:
+    """Groq client over a keep-alive httpx connection pool"""
+    def factory():
+        if not config.GROQ_API_KEY:
+            logger.warning("Groq API key not provided")
+            return None
+        http_client = httpx.Client(
+            timeout=httpx.Timeout(config.LLM_READ_TIMEOUT, connect=config.LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=config.UPSTREAM_POOL_SIZE,
+                max_keepalive_connections=config.UPSTREAM_POOL_SIZE,
+                keepalive_expiry=config.UPSTREAM_KEEPALIVE
+            )
+        )
+        return Groq(
+            api_key=config.GROQ_API_KEY,
+            timeout=httpx.Timeout(config.LLM_READ_TIMEOUT, connect=config.LLM_CONNECT_TIMEOUT),
+            max_retries=config.LLM_MAX_RETRIES,
+            http_client=http_client
+        )
+    return _get_or_create('groq', factory)
+
+
+def get_gemini_model(config: Config, model_name: str) -> Optional[genai.GenerativeModel]:
+    """Gemini model bound to a client configured in this process"""
+    def factory():
+        if not config.GEMINI_API_KEY:
+            logger.warning("Gemini API key not provided")
+            return None
+        # configure() drops any channel inherited from a parent process
+        genai.configure(
+            api_key=config.GEMINI_API_KEY,
+            transport=config.GEMINI_TRANSPORT or None,
+            client_options={"api_endpoint": config.GEMINI_API_ENDPOINT} if config.GEMINI_API_ENDPOINT else None
+        )
+        return genai.GenerativeModel(model_name)
+    return _get_or_create(f'gemini:{model_name}', factory)
+
+
+def gemini_request_options(config: Config) -> Dict[str, Any]:
+    """Per-call options carrying the read timeout (the Gemini SDK has no client-level timeout),
+    capped by the request's remaining time budget"""
+    return {"timeout": time_budget(config.LLM_READ_TIMEOUT, config.LLM_MIN_BUDGET)}
+
+
+def get_document_analysis_client(config: Config) -> Optional[DocumentAnalysisClient]:
+    """Azure Document Intelligence client over a pooled requests session"""
+    def factory():
+        if not (config.AZURE_DOC_INTELLIGENCE_KEY and config.AZURE_DOC_INTELLIGENCE_ENDPOINT):
+            return None
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=config.UPSTREAM_POOL_SIZE)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        transport = RequestsTransport(
+            session=session,
+            session_owner=False,
+            connection_timeout=config.LLM_CONNECT_TIMEOUT,
+            read_timeout=config.AZURE_READ_TIMEOUT
+        )
+        return DocumentAnalysisClient(
+            endpoint=config.AZURE_DOC_INTELLIGENCE_ENDPOINT,
+            credential=AzureKeyCredential(config.AZURE_DOC_INTELLIGENCE_KEY),
+            transport=transport
+        )
+    return _get_or_create('azure_document_intelligence', factory)
+
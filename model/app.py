@@ -2,6 +2,7 @@
 from flask import Flask, request, jsonify
 from llmresumeenhancer import enhance_resume
 from llmenhancer import compute_adjusted_recommendations, _assert_univ_input
+from llm_cache import cache_stats
 import pandas as pd
 import pickle
 
@@ -37,7 +38,7 @@ def enhance_resume_endpoint():
         data = request.get_json()
         raw_resume_api = data.get('raw_resume_api', {})
         resume_analyser_api = data.get('resume_analyser_api', {})
-        result = enhance_resume(raw_resume_api, resume_analyser_api)
+        result = enhance_resume(raw_resume_api, resume_analyser_api, fresh=bool(data.get('fresh', False)))
         return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -49,10 +50,15 @@ def adjust_recommendations_endpoint():
         univ_payload = _assert_univ_input(data.get('university_recommendations', []))
         resume_payload = data.get('resume_analyzer', {})
         temperature = float(data.get('temperature', 0.2))
-        result = compute_adjusted_recommendations(univ_payload, resume_payload, temperature=temperature)
+        fresh = bool(data.get('fresh', False))
+        result = compute_adjusted_recommendations(univ_payload, resume_payload, temperature=temperature, fresh=fresh)
         return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats_endpoint():
+    return jsonify(cache_stats())
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,74 @@
+"""
+Process-wide pooled Groq client for the model service.
+
+One client (and so one keep-alive connection pool) is built lazily per
+process and rebuilt in forked workers, with explicit connect/read timeouts.
+`route_model` picks the model for a call from the size of its prompt.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import httpx
+from groq import Groq
+
+LLM_CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", 5))
+LLM_READ_TIMEOUT = float(os.environ.get("LLM_READ_TIMEOUT", 60))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", 2))
+UPSTREAM_POOL_SIZE = int(os.environ.get("UPSTREAM_POOL_SIZE", 20))
+UPSTREAM_KEEPALIVE = float(os.environ.get("UPSTREAM_KEEPALIVE", 60))
+
+# Model routing: short prompts go to the fast model, everything else to the default
+GROQ_MODEL = os.environ.get("GROQ_MODEL", "openai/gpt-oss-20b")
+GROQ_FAST_MODEL = os.environ.get("GROQ_FAST_MODEL", GROQ_MODEL)
+GROQ_FAST_BELOW_TOKENS = int(os.environ.get("GROQ_FAST_BELOW_TOKENS", 1500))
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[Groq] = None
+_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _client, _lock
+    _client = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_groq_client() -> Groq:
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                api_key = os.environ.get("GROQ_API_KEY")
+                if not api_key:
+                    raise RuntimeError("GROQ_API_KEY is not set.")
+                timeout = httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+                _client = Groq(
+                    api_key=api_key,
+                    timeout=timeout,
+                    max_retries=LLM_MAX_RETRIES,
+                    http_client=httpx.Client(
+                        timeout=timeout,
+                        limits=httpx.Limits(
+                            max_connections=UPSTREAM_POOL_SIZE,
+                            max_keepalive_connections=UPSTREAM_POOL_SIZE,
+                            keepalive_expiry=UPSTREAM_KEEPALIVE,
+                        ),
+                    ),
+                )
+    return _client
+
+
+def route_model(messages: List[Dict[str, Any]]) -> str:
+    """Fast model for prompts under GROQ_FAST_BELOW_TOKENS (~4 chars per token), else the default."""
+    tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+    model = GROQ_FAST_MODEL if tokens < GROQ_FAST_BELOW_TOKENS else GROQ_MODEL
+    logger.debug("Routed %d-token prompt to %s", tokens, model)
+    return model
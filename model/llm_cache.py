@@ -0,0 +1,133 @@
+"""
+Persistent LLM response cache for the model service.
+
+Uses the same SQLite schema and key derivation as the backend cache
+(backend/utils/llm_cache.py), so both services can share one cache file by
+pointing LLM_CACHE_PATH at the same location.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "llm_cache.db")
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", 7 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 20000))
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+
+PRUNE_INTERVAL = 50
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hit": 0, "miss": 0, "bypass": 0})
+_writes = 0
+
+
+def _connection() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "pid", None) != os.getpid():
+        conn = sqlite3.connect(LLM_CACHE_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                caller TEXT,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+
+def make_cache_key(provider: str, model: str, temperature: Optional[float], prompt: Any) -> str:
+    if not isinstance(prompt, str):
+        prompt = json.dumps(prompt, sort_keys=True, ensure_ascii=False)
+    material = f"{provider}|{model}|{temperature}|{' '.join(prompt.split())}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _record(caller: str, result: str) -> None:
+    with _stats_lock:
+        _stats[caller][result] += 1
+
+
+def _store(key: str, response: str, provider: str, model: str, caller: str) -> None:
+    global _writes
+    conn = _connection()
+    now = time.time()
+    conn.execute(
+        "INSERT OR REPLACE INTO llm_cache "
+        "(key, provider, model, caller, response, size, created_at, expires_at, last_access) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (key, provider, model, caller, response, len(response.encode("utf-8")), now, now + LLM_CACHE_TTL, now),
+    )
+    with _stats_lock:
+        _writes += 1
+        prune = _writes % PRUNE_INTERVAL == 0
+    if prune:
+        conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "  SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?"
+            ")",
+            (LLM_CACHE_MAX_ENTRIES,),
+        )
+
+
+def cached_completion(
+    caller: str,
+    provider: str,
+    model: str,
+    temperature: Optional[float],
+    prompt: Any,
+    call: Callable[[], str],
+    fresh: bool = False,
+    validate: Optional[Callable[[str], bool]] = None,
+) -> str:
+    """Return a cached response for this prompt, or call the LLM and cache a valid result."""
+    if not LLM_CACHE_ENABLED:
+        return call()
+
+    key = make_cache_key(provider, model, temperature, prompt)
+    if fresh:
+        _record(caller, "bypass")
+    else:
+        try:
+            now = time.time()
+            conn = _connection()
+            row = conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row:
+                conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                _record(caller, "hit")
+                return row[0]
+        except sqlite3.Error:
+            pass
+        _record(caller, "miss")
+
+    response = call()
+    if response and (validate is None or validate(response)):
+        try:
+            _store(key, response, provider, model, caller)
+        except sqlite3.Error:
+            pass
+    return response
+
+
+def cache_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        return {"enabled": LLM_CACHE_ENABLED, "path": LLM_CACHE_PATH, "callers": {k: dict(v) for k, v in _stats.items()}}
@@ -7,11 +7,10 @@ import sys
 from typing import Any, Dict, List, Tuple
 
 
-# pip install groq
-from groq import Groq
+from groq_client import get_groq_client, route_model
+from llm_cache import cached_completion
 
 
-MODEL = "openai/gpt-oss-20b"
 MAX_P_INCREASE = 0.20
 MIN_P_INCREASE = 0.00
 
@@ -85,23 +84,38 @@ def _assert_univ_input(univs: Any) -> List[Dict[str, Any]]:
     return cleaned
 
 
-def _call_groq(system_prompt: str, user_prompt: str, temperature: float = 0.2) -> str:
-    api_key = os.environ.get("GROQ_API_KEY")
-    if not api_key:
+def _call_groq(system_prompt: str, user_prompt: str, temperature: float = 0.2, fresh: bool = False) -> str:
+    if not os.environ.get("GROQ_API_KEY"):
         raise RuntimeError("GROQ_API_KEY is not set.")
-    client = Groq(api_key=api_key)
-    resp = client.chat.completions.create(
-        model=MODEL,
-        temperature=temperature,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        response_format={"type": "json_object"},  # The model will respond with JSON, but we want an array.
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+    model = route_model(messages)
+
+    def call() -> str:
+        resp = get_groq_client().chat.completions.create(
+            model=model,
+            temperature=temperature,
+            messages=messages,
+            response_format={"type": "json_object"},  # The model will respond with JSON, but we want an array.
+        )
+        # Some models wrap arrays in an object when response_format is json_object.
+        # We will handle both a raw array and an object containing an array.
+        return resp.choices[0].message.content
+
+    return cached_completion(
+        "adjust_recommendations", "groq", model, temperature, messages, call,
+        fresh=fresh, validate=_is_json,
     )
-    # Some models wrap arrays in an object when response_format is json_object.
-    # We will handle both a raw array and an object containing an array.
-    return resp.choices[0].message.content
+
+
+def _is_json(text: str) -> bool:
+    try:
+        json.loads(text)
+        return True
+    except json.JSONDecodeError:
+        return False
 
 
 def _try_parse_json_array(text: str) -> Any:
@@ -204,9 +218,10 @@ def compute_adjusted_recommendations(
     univ_payload: List[Dict[str, Any]],
     resume_payload: Any,
     temperature: float = 0.2,
+    fresh: bool = False,
 ) -> List[Dict[str, Any]]:
     user_prompt = build_user_prompt(univ_payload, resume_payload)
-    raw = _call_groq(SYSTEM_PROMPT, user_prompt, temperature=temperature)
+    raw = _call_groq(SYSTEM_PROMPT, user_prompt, temperature=temperature, fresh=fresh)
     parsed = _try_parse_json_array(raw)
     result = _validate_and_align(univ_payload, parsed)
     return result
@@ -217,12 +232,15 @@ def main(argv: List[str]) -> int:
     parser.add_argument("--univ", required=True, help="Path to Top-10 University API JSON file.")
     parser.add_argument("--resume", required=True, help="Path to Resume Analyzer API JSON file.")
     parser.add_argument("--temperature", type=float, default=0.2, help="Sampling temperature.")
+    parser.add_argument("--fresh", action="store_true", help="Bypass the LLM response cache.")
     args = parser.parse_args(argv)
 
     try:
         univ_payload = _assert_univ_input(_load_json_file(args.univ))
         resume_payload = _load_json_file(args.resume)
-        enriched = compute_adjusted_recommendations(univ_payload, resume_payload, temperature=args.temperature)
+        enriched = compute_adjusted_recommendations(
+            univ_payload, resume_payload, temperature=args.temperature, fresh=args.fresh
+        )
         json.dump(enriched, sys.stdout, ensure_ascii=False, indent=2)
         print()
         return 0
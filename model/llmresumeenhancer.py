@@ -1,11 +1,9 @@
 import json
-import os
-from groq import Groq
 
-# Initialize Groq client (fetch API key from environment variable GROQ_API_KEY)
-client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+from groq_client import get_groq_client, route_model
+from llm_cache import cached_completion
 
-def enhance_resume(raw_resume_api: dict, resume_analyser_api: dict) -> dict:
+def enhance_resume(raw_resume_api: dict, resume_analyser_api: dict, fresh: bool = False) -> dict:
     """
     Takes Raw Resume API output and Resume Analyzer API output (with llm_insights),
     then returns an enhanced resume JSON of 700–800 words using Groq LLM.
@@ -42,18 +40,23 @@ def enhance_resume(raw_resume_api: dict, resume_analyser_api: dict) -> dict:
     }}
     """
 
-    # Call Groq LLM
-    response = client.chat.completions.create(
-        model="openai/gpt-oss-20b",  # You can switch to llama3-70b or other available models
-        messages=[
-            {"role": "system", "content": "You are a professional resume writer."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.7
-    )
+    messages = [
+        {"role": "system", "content": "You are a professional resume writer."},
+        {"role": "user", "content": prompt}
+    ]
+    model = route_model(messages)
+
+    # Call Groq LLM (through the shared response cache)
+    def call():
+        response = get_groq_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.7
+        )
+        return response.choices[0].message.content
 
     # Extract response text
-    output_text = response.choices[0].message.content.strip()
+    output_text = cached_completion("enhance_resume", "groq", model, 0.7, messages, call, fresh=fresh).strip()
 
     # Try parsing JSON
     try: